@@ -14,8 +14,11 @@ from modules.certifications import certifications_bp
 from modules.sponsors import sponsors_bp
 from modules.volunteers import volunteers_bp
 from modules.assignments import assignments_bp
-from sparql_utils import sparql_utils
+from sparql_utils import sparql_utils, async_sparql_utils
+from class_hierarchy import ECO, class_hierarchy
+from entity_projections import projections
 from modules.reviews import reviews_bp
+from modules.batch import batch_bp
 
 
 app = Flask(__name__)
@@ -40,6 +43,7 @@ app.register_blueprint(assignments_bp, url_prefix='/api')
 
 app.register_blueprint(blogs_bp, url_prefix='/api')
 app.register_blueprint(reviews_bp, url_prefix='/api')
+app.register_blueprint(batch_bp, url_prefix='/api')
 
 
 
@@ -55,8 +59,16 @@ def health_check():
     return jsonify({"status": "OK", "message": "API fonctionnelle"})
 
 
+@app.route('/api/sparql/stats', methods=['GET'])
+def sparql_stats():
+    """Statistiques du client SPARQL (cache de requêtes, coalescence, réplique locale) et des projections d'entités"""
+    stats = sparql_utils.stats()
+    stats["projections"] = {projection.key: projection.stats() for projection in projections}
+    return jsonify(stats)
+
+
 @app.route('/api/test', methods=['GET'])
-def test_connection():
+async def test_connection():
     """Test de connexion à Fuseki et aux données"""
     try:
         if not sparql_utils:
@@ -67,7 +79,6 @@ def test_connection():
             
         # Test simple de comptage
         query = "SELECT (COUNT(*) as ?count) WHERE { ?s ?p ?o }"
-        results = sparql_utils.execute_query(query)
         
         # Test des événements
         events_query = """
@@ -76,7 +87,6 @@ def test_connection():
             ?event a eco:Event .
         }
         """
-        events_results = sparql_utils.execute_query(events_query)
         
         # Test des locations
         locations_query = """
@@ -85,7 +95,6 @@ def test_connection():
             ?location a eco:Location .
         }
         """
-        locations_results = sparql_utils.execute_query(locations_query)
         
         # Test des utilisateurs
         users_query = """
@@ -94,7 +103,12 @@ def test_connection():
             ?user a eco:User .
         }
         """
-        users_results = sparql_utils.execute_query(users_query)
+        
+        # Requêtes indépendantes : exécutées en parallèle
+        # Lignes typées : les COUNT arrivent déjà en int
+        results, events_results, locations_results, users_results = await async_sparql_utils.gather_rows(
+            query, events_query, locations_query, users_query
+        )
         
         return jsonify({
             "status": "success",
@@ -118,7 +132,7 @@ def test_connection():
 
 
 @app.route('/api/ontology-stats', methods=['GET'])
-def get_ontology_stats():
+async def get_ontology_stats():
     """Récupère les statistiques de l'ontologie pour affichage dans la navbar"""
     try:
         if not sparql_utils:
@@ -154,8 +168,6 @@ def get_ontology_stats():
         }
         """
         
-        results = sparql_utils.execute_query(stats_query)
-        
         # Requête pour compter les instances par type
         instances_query = """
         PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
@@ -181,11 +193,10 @@ def get_ontology_stats():
         }
         """
         
-        instances_results = sparql_utils.execute_query(instances_query)
-        
         # Requête pour obtenir les informations de l'ontologie
         ontology_info_query = """
         PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
+        PREFIX owl: <http://www.w3.org/2002/07/owl#>
         PREFIX terms: <http://purl.org/dc/terms/>
         
         SELECT ?title ?description ?version ?creator ?created
@@ -199,13 +210,16 @@ def get_ontology_stats():
         }
         """
         
-        ontology_info = sparql_utils.execute_query(ontology_info_query)
+        # Requêtes indépendantes : exécutées en parallèle
+        results, instances_results, ontology_info = await async_sparql_utils.gather_rows(
+            stats_query, instances_query, ontology_info_query
+        )
         
         return jsonify({
             "status": "success",
-            "ontology_info": ontology_info[0] if ontology_info else {},
-            "statistics": results[0] if results else {},
-            "instances": instances_results[0] if instances_results else {}
+            "ontology_info": ontology_info[0].to_dict() if ontology_info else {},
+            "statistics": results[0].to_dict() if results else {},
+            "instances": instances_results[0].to_dict() if instances_results else {}
         })
         
     except Exception as e:
@@ -228,8 +242,7 @@ def get_ontology_graph():
                         SELECT DISTINCT ?s ?sLabel ?type ?p ?pLabel ?o ?oLabel WHERE {
                             ?s a ?type .
                             # include types that are the class itself or subclasses (captures FinancialDonation, etc.)
-                            ?type rdfs:subClassOf* ?superType .
-                            VALUES ?superType { eco:Sponsor eco:Donation eco:Event }
+                            VALUES ?type { %s }
           OPTIONAL { ?s rdfs:label ?sLabel }
           OPTIONAL {
             ?s ?p ?o .
@@ -238,15 +251,13 @@ def get_ontology_graph():
           }
         }
         LIMIT 2000
-        '''
-
-        sparql_utils.sparql.setQuery(query)
-        results = sparql_utils.sparql.query().convert()
+        ''' % class_hierarchy.subclass_values(ECO + 'Sponsor', ECO + 'Donation', ECO + 'Event')
 
         nodes = {}
         edges = []
 
-        for b in results.get('results', {}).get('bindings', []):
+        # Agrégation au fil du flux : le document SPARQL complet n'est jamais chargé
+        for b in sparql_utils.iter_bindings(query):
             s = b.get('s', {}).get('value')
             t = b.get('type', {}).get('value')
             if not s:
@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from sparql_utils import sparql_utils
+
+ECO = 'http://www.semanticweb.org/eco-ontology#'
+
+SUBCLASS_QUERY = """
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+SELECT ?subClass ?superClass WHERE {
+    ?subClass rdfs:subClassOf ?superClass .
+    FILTER(isIRI(?subClass) && isIRI(?superClass))
+}
+"""
+
+
+class ClassHierarchy:
+    """
+    Fermeture transitive de rdfs:subClassOf, calculée à partir des seules arêtes
+    directes puis gardée en mémoire. Les requêtes l'utilisent sous forme de liste
+    VALUES au lieu de parcourir `rdfs:subClassOf*` à chaque appel.
+
+    Recalculée après une écriture touchant rdfs:subClassOf, et au plus tard
+    après `ttl` secondes (rechargements externes du dataset).
+    """
+
+    def __init__(self, utils, ttl=600.0):
+        self.utils = utils
+        self.ttl = ttl
+        self._descendants = None  # classe -> frozenset(classe et toutes ses sous-classes)
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        utils.add_update_listener(self._on_update)
+
+    def _on_update(self, update_query):
+        if 'subClassOf' in update_query:
+            self.invalidate()
+
+    def invalidate(self):
+        with self._lock:
+            self._descendants = None
+
+    def _closure(self):
+        with self._lock:
+            expired = self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+            if self._descendants is not None and not expired:
+                return self._descendants
+
+            try:
+                results = self.utils.execute_raw_query(SUBCLASS_QUERY)
+            except Exception as e:
+                # Dernière hiérarchie connue (à défaut, chaque classe ne couvre qu'elle-même) ; nouvel essai au prochain appel
+                print(f"Erreur chargement hiérarchie de classes: {str(e)}")
+                return self._descendants or {}
+
+            children = {}
+            for binding in results["results"]["bindings"]:
+                children.setdefault(binding['superClass']['value'], set()).add(binding['subClass']['value'])
+
+            descendants = {}
+            for cls in children:
+                # Parcours des descendants (robuste aux cycles d'équivalence A ⊑ B ⊑ A)
+                seen = {cls}
+                stack = [cls]
+                while stack:
+                    for child in children.get(stack.pop(), ()):
+                        if child not in seen:
+                            seen.add(child)
+                            stack.append(child)
+                descendants[cls] = frozenset(seen)
+
+            self._descendants = descendants
+            self._loaded_at = time.monotonic()
+            return descendants
+
+    def subclasses(self, class_iri):
+        """La classe et toutes ses sous-classes (équivalent de `?c rdfs:subClassOf* <class_iri>`)"""
+        return self._closure().get(class_iri, frozenset((class_iri,)))
+
+    def subclass_values(self, *class_iris):
+        """Contenu d'une clause VALUES : IRIs des classes données et de leurs sous-classes"""
+        classes = set()
+        for class_iri in class_iris:
+            classes |= self.subclasses(class_iri)
+        return ' '.join(f'<{cls}>' for cls in sorted(classes))
+
+    def stats(self):
+        descendants = self._descendants
+        return {
+            "classes": len(descendants) if descendants is not None else None,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+        }
+
+
+# Instance globale
+class_hierarchy = ClassHierarchy(sparql_utils, ttl=float(os.getenv('CLASS_HIERARCHY_TTL', '600')))
@@ -0,0 +1,51 @@
+import os
+import re
+from flask import jsonify, request
+
+MAX_BATCH_IDS = int(os.getenv('BATCH_MAX_IDS', '200'))
+
+# IRI insérable telle quelle entre <> dans une requête SPARQL
+_IRI_RE = re.compile(r'^[^\s<>"{}|^`\\]+$')
+
+
+def read_ids():
+    """IRIs demandées dans le corps JSON {"ids": [...]}, dédoublonnées dans l'ordre"""
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids') if isinstance(data, dict) else None
+    if not isinstance(ids, list) or not ids:
+        raise ValueError('Corps attendu: {"ids": ["<iri>", ...]}')
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f"Au plus {MAX_BATCH_IDS} identifiants par lot")
+    return list(dict.fromkeys(str(iri) for iri in ids))
+
+
+def values_clause(ids):
+    """Contenu d'une clause VALUES pour des IRIs déjà validées"""
+    return ' '.join(f'<{iri}>' for iri in ids)
+
+
+def batch_response(fetch):
+    """
+    Réponse d'une route de lecture par lot. `fetch(ids)` reçoit les IRIs valides
+    et retourne {iri: ligne} en une seule requête. Chaque IRI se retrouve dans
+    "results", "missing" (inexistante) ou "errors" (IRI invalide, échec SPARQL),
+    sans que l'échec d'une partie n'annule le reste du lot.
+    """
+    try:
+        ids = read_ids()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    valid = [iri for iri in ids if _IRI_RE.match(iri)]
+    errors = {iri: "IRI invalide" for iri in ids if not _IRI_RE.match(iri)}
+
+    results = {}
+    if valid:
+        try:
+            results = fetch(valid)
+        except Exception as e:
+            print(f"Erreur SPARQL: {str(e)}")
+            errors.update((iri, f"Erreur SPARQL: {str(e)}") for iri in valid)
+
+    missing = [iri for iri in valid if iri not in results and iri not in errors]
+    return jsonify({"results": results, "missing": missing, "errors": errors})
@@ -0,0 +1,455 @@
+import bisect
+import itertools
+import os
+import re
+import threading
+import time
+from sparql_cache import RDF_TYPE, extract_iris, update_footprint
+from sparql_rows import IRI
+from sparql_utils import clean_value, sparql_utils
+
+ECO = 'http://www.semanticweb.org/eco-ontology#'
+WEBPROTEGE = 'http://webprotege.stanford.edu/'
+RDFS_LABEL = 'http://www.w3.org/2000/01/rdf-schema#label'
+
+# Au-delà, une écriture déclenche un rechargement complet plutôt que ciblé
+MAX_PARTIAL_RELOAD = 100
+
+
+class EntityRecord:
+    """Base des enregistrements : un tuple de valeurs par champ (vide si non renseigné)"""
+    __slots__ = ('id',)
+
+    def values(self, field):
+        return getattr(self, field)
+
+
+def make_record_type(name, fields):
+    return type(name, (EntityRecord,), {'__slots__': tuple(fields)})
+
+
+def _sort_key(value):
+    """Clé de tri/comparaison : nombres comparés numériquement, le reste lexicalement"""
+    try:
+        return (0, float(value))
+    except (TypeError, ValueError):
+        return (1, str(value))
+
+
+def is_unset(values):
+    """Équivalent de `!BOUND(?x) || ?x = false` pour un booléen optionnel"""
+    return not values or any(value in ('false', '0') for value in values)
+
+
+class ValueIndex:
+    """Valeur exacte -> identifiants ; un REGEX parcourt les valeurs distinctes et non les entités"""
+
+    def __init__(self):
+        self.ids = {}
+
+    def add(self, record_id, values):
+        for value in values:
+            self.ids.setdefault(value, set()).add(record_id)
+
+    def remove(self, record_id, values):
+        for value in values:
+            ids = self.ids.get(value)
+            if ids is not None:
+                ids.discard(record_id)
+                if not ids:
+                    del self.ids[value]
+
+    def lookup(self, test):
+        found = set()
+        for value, ids in self.ids.items():
+            if test(value):
+                found |= ids
+        return found
+
+
+class RangeIndex:
+    """Liste triée (clé, identifiant) pour les bornes numériques ou de date"""
+
+    def __init__(self):
+        self.entries = []
+
+    def add(self, record_id, values):
+        for value in values:
+            bisect.insort(self.entries, (_sort_key(value), record_id))
+
+    def remove(self, record_id, values):
+        for value in values:
+            entry = (_sort_key(value), record_id)
+            position = bisect.bisect_left(self.entries, entry)
+            if position < len(self.entries) and self.entries[position] == entry:
+                del self.entries[position]
+
+    def between(self, low=None, high=None):
+        start = 0 if low is None else bisect.bisect_left(self.entries, (_sort_key(low), ''))
+        entries = self.entries[start:]
+        if high is not None:
+            high_key = _sort_key(high)
+            entries = entries[:bisect.bisect_left(entries, (high_key, '\U0010ffff'))]
+        # Même règle que SPARQL : un nombre ne se compare qu'à un nombre
+        kind = _sort_key(low if low is not None else high)[0]
+        return {record_id for key, record_id in entries if key[0] == kind}
+
+
+class EntityProjection:
+    """
+    Projection en mémoire d'un type d'entité : un enregistrement à `__slots__` par
+    instance de `class_iri`, un tuple de valeurs par champ, et des index
+    secondaires (valeur exacte ou intervalle) pour les routes de recherche.
+
+    Les champs sont des prédicats ou des chemins (tuple d'IRIs). Après une
+    écriture, seules les entités touchées sont rechargées (VALUES) ; un
+    rechargement complet a lieu après `ttl` secondes pour suivre les
+    modifications externes (scripts/load_data.py).
+    """
+
+    def __init__(self, utils, name, class_iri, key, fields, indexes=None, ttl=300.0):
+        self.utils = utils
+        self.name = name
+        self.class_iri = class_iri
+        self.key = key
+        self.fields = fields
+        self.ttl = ttl
+        self.record_type = make_record_type(name, fields)
+        self.index_kinds = indexes or {}
+
+        self.vocabulary = {class_iri, RDF_TYPE}
+        for path in fields.values():
+            self.vocabulary.update((path,) if isinstance(path, str) else path)
+
+        self._records = None
+        self._indexes = {}
+        self._loaded_at = None
+        self._pending = set()  # entités à recharger au prochain accès
+        self._lock = threading.RLock()
+
+        self.full_reloads = 0
+        self.partial_reloads = 0
+        utils.add_update_listener(self._on_update)
+
+    # Chargement
+
+    def _build_query(self, ids=None):
+        branches = ['{ }']  # garantit une ligne par entité, même sans aucun champ renseigné
+        for field, path in self.fields.items():
+            path = path if isinstance(path, tuple) else (path,)
+            predicate = '/'.join(f'<{iri}>' for iri in path)
+            branches.append(f'{{ ?id {predicate} ?value . BIND("{field}" AS ?field) }}')
+        values = ''
+        if ids is not None:
+            values = 'VALUES ?id { %s }\n    ' % ' '.join(f'<{record_id}>' for record_id in sorted(ids))
+        return f"""
+SELECT ?id ?field ?value WHERE {{
+    {values}?id a <{self.class_iri}> .
+    {' UNION '.join(branches)}
+}}
+"""
+
+    def _fetch(self, ids=None):
+        """Enregistrements lus depuis Fuseki (toutes les entités, ou celles de `ids`)"""
+        collected = {}
+        for binding in self.utils.execute_bindings(self._build_query(ids)):
+            cell = binding.get('id')
+            if cell is None or cell['type'] != 'uri':
+                continue
+            fields = collected.setdefault(cell['value'], {})
+            if 'field' in binding and 'value' in binding:
+                value = binding['value']
+                value = IRI(value['value']) if value['type'] == 'uri' else value['value']
+                values = fields.setdefault(binding['field']['value'], [])
+                if value not in values:
+                    values.append(value)
+
+        records = {}
+        for record_id, fields in collected.items():
+            record = self.record_type()
+            record.id = IRI(record_id)
+            for field in self.fields:
+                setattr(record, field, tuple(fields.get(field, ())))
+            records[record_id] = record
+        return records
+
+    def _index(self, record, add=True):
+        for field, index in self._indexes.items():
+            values = record.values(field)
+            if add:
+                index.add(record.id, values)
+            else:
+                index.remove(record.id, values)
+
+    def _reload(self):
+        records = self._fetch()
+        self._indexes = {field: RangeIndex() if kind == 'range' else ValueIndex()
+                         for field, kind in self.index_kinds.items()}
+        for record in records.values():
+            self._index(record)
+        self._records = records
+        self._loaded_at = time.monotonic()
+        self._pending.clear()
+        self.full_reloads += 1
+
+    def _reload_pending(self):
+        ids = set(self._pending)
+        fresh = self._fetch(ids)
+        self._pending -= ids
+        for record_id in ids:
+            old = self._records.pop(record_id, None)
+            if old is not None:
+                self._index(old, add=False)
+            record = fresh.get(record_id)
+            if record is not None:
+                self._records[record_id] = record
+                self._index(record)
+        self.partial_reloads += 1
+
+    def _ensure_loaded(self):
+        expired = self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+        if self._records is None or expired:
+            try:
+                self._reload()
+            except Exception as e:
+                # Dernière projection connue, nouvel essai au prochain appel
+                if self._records is None:
+                    raise
+                print(f"Erreur rechargement projection {self.name}: {str(e)}")
+        elif self._pending:
+            try:
+                self._reload_pending()
+            except Exception as e:
+                print(f"Erreur rechargement projection {self.name}: {str(e)}")
+
+    def _on_update(self, update_query):
+        footprint = update_footprint(update_query)
+        with self._lock:
+            if footprint is None:
+                # DELETE/INSERT WHERE : entités touchées inconnues
+                if extract_iris(update_query) & self.vocabulary:
+                    self.invalidate()
+                return
+            if self._records is None or not footprint & self.vocabulary:
+                return
+            # Entités écrites, et celles qui les référencent via un chemin (nom du lieu d'un événement, ...)
+            subjects = footprint - self.vocabulary
+            touched = set(subjects)
+            for record in self._records.values():
+                if any(value in subjects for field in self.fields for value in record.values(field)):
+                    touched.add(record.id)
+            self._pending |= touched
+            if len(self._pending) > MAX_PARTIAL_RELOAD:
+                self.invalidate()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+            self._pending.clear()
+
+    # Lecture
+
+    def find(self, ids=None, required=(), match=None, equals=None, minimum=None, maximum=None,
+             where=None, order_by=None, descending=False):
+        """
+        Enregistrements satisfaisant les critères, avec pour chacun les valeurs
+        retenues par champ (les filtres ne gardent que les valeurs qui passent,
+        comme un FILTER sur la ligne SPARQL correspondante).
+
+        - match : champ -> motif REGEX, insensible à la casse
+        - equals : champ -> valeur exacte (IRI ou littéral)
+        - minimum / maximum : champ -> borne incluse (nombre ou date ISO)
+        - where : prédicat supplémentaire sur l'enregistrement
+        - order_by : champ ou tuple de champs de tri
+        Un champ filtré ou listé dans `required` doit être renseigné.
+        """
+        tests = {field: [] for field in required}
+        for field, pattern in (match or {}).items():
+            tests.setdefault(field, []).append(re.compile(pattern, re.IGNORECASE).search)
+        for field, expected in (equals or {}).items():
+            # Valeurs des enregistrements : chaînes (IRI ou lexicale du littéral)
+            tests.setdefault(field, []).append(lambda value, expected=str(expected): value == expected)
+        for field, bound in (minimum or {}).items():
+            key = _sort_key(bound)
+            tests.setdefault(field, []).append(lambda value, key=key: key[0] == _sort_key(value)[0] and _sort_key(value) >= key)
+        for field, bound in (maximum or {}).items():
+            key = _sort_key(bound)
+            tests.setdefault(field, []).append(lambda value, key=key: key[0] == _sort_key(value)[0] and _sort_key(value) <= key)
+
+        with self._lock:
+            self._ensure_loaded()
+            records = self._records
+
+            candidates = set(ids) & records.keys() if ids is not None else None
+            for field, index in self._indexes.items():
+                if field not in tests or not tests[field]:
+                    continue
+                if isinstance(index, RangeIndex) and (field in (minimum or {}) or field in (maximum or {})):
+                    found = index.between((minimum or {}).get(field), (maximum or {}).get(field))
+                elif isinstance(index, ValueIndex):
+                    found = index.lookup(lambda value, checks=tests[field]: all(check(value) for check in checks))
+                else:
+                    continue
+                candidates = found if candidates is None else candidates & found
+            # Copie prise sous verrou : _reload_pending modifie self._records sur place
+            selected = list(records.values()) if candidates is None else [records[i] for i in candidates]
+
+        results = []
+        for record in selected:
+            kept = {}
+            for field, checks in tests.items():
+                values = tuple(value for value in record.values(field) if all(check(value) for check in checks))
+                if not values:
+                    break
+                kept[field] = values
+            else:
+                if where is None or where(record):
+                    results.append((record, kept))
+
+        if order_by:
+            order_fields = (order_by,) if isinstance(order_by, str) else order_by
+
+            def _order(item):
+                keys = []
+                for field in order_fields:
+                    values = item[1].get(field) or item[0].values(field)
+                    # Comme ORDER BY : les valeurs non liées d'abord
+                    keys.append((1,) + _sort_key(min(values, key=_sort_key)) if values else (0,))
+                return keys
+            results.sort(key=_order, reverse=descending)
+        return results
+
+    def rows(self, fields, *, include_key=True, **criteria):
+        """
+        Lignes au format de SPARQLUtils.execute_query (valeurs réduites à leur nom
+        local), une par combinaison de valeurs comme pour des OPTIONAL
+        indépendants. Retourne {"error": ...} si la projection ne peut être
+        chargée ou qu'un critère est invalide.
+        """
+        try:
+            matches = self.find(**criteria)
+        except (re.error, ValueError) as e:
+            return {"error": f"Critère invalide: {str(e)}"}
+        except Exception as e:
+            print(f"Erreur chargement projection {self.name}: {str(e)}")
+            return {"error": f"Erreur SPARQL: {str(e)}"}
+
+        rows = []
+        for record, kept in matches:
+            rows.extend(self._render(record, kept, fields, include_key))
+        return rows
+
+    def lookup(self, fields, ids, required=()):
+        """
+        Première ligne de chaque entité de `ids`, comme les routes de détail :
+        {iri: ligne}. Les IRIs absentes de la projection (entités créées hors de
+        l'API depuis le dernier chargement) sont relues en une seule requête
+        VALUES. Lève une exception si Fuseki ne répond pas.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            unknown = set(ids) - self._records.keys()
+            if unknown:
+                self._pending |= unknown
+                self._reload_pending()
+        found = {record.id: next(self._render(record, kept, fields, False))
+                 for record, kept in self.find(ids=ids, required=required)}
+        return {iri: found[iri] for iri in ids if iri in found}
+
+    def _render(self, record, kept, fields, include_key):
+        """Lignes d'un enregistrement : une par combinaison de valeurs retenues"""
+        base = {self.key: clean_value(record.id)} if include_key else {}
+        columns = [(field, kept.get(field, record.values(field))) for field in fields]
+        bound = [(field, values) for field, values in columns if values]
+        for combination in itertools.product(*(values for _, values in bound)):
+            row = dict(base)
+            for (field, _), value in zip(bound, combination):
+                row[field] = clean_value(value)
+            yield row
+
+    def stats(self):
+        records = self._records
+        return {
+            "records": len(records) if records is not None else None,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            "pending": len(self._pending),
+            "full_reloads": self.full_reloads,
+            "partial_reloads": self.partial_reloads,
+        }
+
+
+# Instances globales
+
+PROJECTION_TTL = float(os.getenv('ENTITY_PROJECTION_TTL', '300'))
+
+event_projection = EntityProjection(sparql_utils, 'EventRecord', ECO + 'Event', 'event', {
+    'title': ECO + 'eventTitle',
+    'description': ECO + 'eventDescription',
+    'date': ECO + 'eventDate',
+    'location': ECO + 'isLocatedAt',
+    'locationName': (ECO + 'isLocatedAt', ECO + 'locationName'),
+    'address': (ECO + 'isLocatedAt', ECO + 'address'),
+    'maxParticipants': ECO + 'maxParticipants',
+    'status': ECO + 'eventStatus',
+    'duration': ECO + 'duration',
+}, indexes={'date': 'range', 'locationName': 'value', 'status': 'value'}, ttl=PROJECTION_TTL)
+
+location_projection = EntityProjection(sparql_utils, 'LocationRecord', ECO + 'Location', 'location', {
+    'name': ECO + 'locationName',
+    'address': ECO + 'address',
+    'city': ECO + 'city',
+    'country': ECO + 'country',
+    'capacity': ECO + 'capacity',
+    'price': ECO + 'price',
+    'reserved': ECO + 'reserved',
+    'inRepair': ECO + 'inRepair',
+    'description': ECO + 'locationDescription',
+    'latitude': ECO + 'latitude',
+    'longitude': ECO + 'longitude',
+    'images': ECO + 'locationImages',
+}, indexes={'city': 'value', 'capacity': 'range', 'price': 'range'}, ttl=PROJECTION_TTL)
+
+user_projection = EntityProjection(sparql_utils, 'UserRecord', ECO + 'User', 'user', {
+    'firstName': ECO + 'firstName',
+    'lastName': ECO + 'lastName',
+    'email': ECO + 'email',
+    'phone': ECO + 'phone',
+    'role': ECO + 'role',
+    'registrationDate': ECO + 'registrationDate',
+}, indexes={'role': 'value'}, ttl=PROJECTION_TTL)
+
+# Champs nommés comme les colonnes renvoyées par sponsors.py
+sponsor_projection = EntityProjection(sparql_utils, 'SponsorRecord', ECO + 'Sponsor', 'sponsor', {
+    'nomEntreprise': ECO + 'companyName',
+    'secteur': ECO + 'industry',
+    'courriel': ECO + 'contactEmail',
+    'telephone': ECO + 'phoneNumber',
+    'siteWeb': ECO + 'website',
+    'niveauDeSponsoring': (ECO + 'hasSponsorshipLevel', ECO + 'levelName'),
+    'donation': ECO + 'makesDonation',
+}, indexes={'secteur': 'value'}, ttl=PROJECTION_TTL)
+
+volunteer_projection = EntityProjection(sparql_utils, 'VolunteerRecord', WEBPROTEGE + 'RCXXzqv27uFuX5nYU81XUvw', 'volunteer', {
+    'label': RDFS_LABEL,
+    'user': WEBPROTEGE + 'RBNk0vvVsRh8FjaWPGT0XCO',
+    'phone': WEBPROTEGE + 'R8BxRbqkCT2nIQCr5UoVlXD',
+    'medicalConditions': WEBPROTEGE + 'R9F95BAS8WtbTv8ZGBaPe42',
+    'motivation': WEBPROTEGE + 'R9PW79FzwQKWuQYdTdYlHzN',
+    'experience': WEBPROTEGE + 'R9tdW5crNU837y5TemwdNfR',
+    'skills': WEBPROTEGE + 'RBqpxvMVBnwM1Wb6OhzTpHf',
+    'activityLevel': WEBPROTEGE + 'RCHqvY6cUdoI8XfAt441VX0',
+    'generalMotivation': WEBPROTEGE + 'RXzg1eKoCWK7S9zHsFoTFC',
+}, indexes={'skills': 'value', 'activityLevel': 'value'}, ttl=PROJECTION_TTL)
+
+assignment_projection = EntityProjection(sparql_utils, 'AssignmentRecord', WEBPROTEGE + 'Rj2A7xNWLfpNcbE4HJMKqN', 'assignment', {
+    'label': RDFS_LABEL,
+    'volunteer': WEBPROTEGE + 'RBNk0vvVsRh8FjaWPGT0XCO',
+    'event': WEBPROTEGE + 'RBqttmTqH5uyTK64wj0hDiD',
+    'startDate': WEBPROTEGE + 'RD3Wor03BEPInfzUaMNVPC7',
+    'status': WEBPROTEGE + 'RDT3XEARggTy1BIBKDXXrmx',
+    'rating': WEBPROTEGE + 'RRatingAssignment',
+}, indexes={'status': 'value', 'volunteer': 'value', 'event': 'value', 'rating': 'range', 'startDate': 'range'},
+    ttl=PROJECTION_TTL)
+
+projections = (event_projection, location_projection, user_projection,
+               sponsor_projection, volunteer_projection, assignment_projection)
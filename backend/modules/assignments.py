@@ -1,99 +1,60 @@
 from flask import Blueprint, jsonify, request
 from sparql_utils import sparql_utils
+from pagination import ListQuery, list_response
+from entity_projections import assignment_projection
+from entity_batch import batch_response
 
 assignments_bp = Blueprint('assignments', __name__)
 
-@assignments_bp.route('/assignments', methods=['GET'])
-def get_all_assignments():
-    """Récupère tous les assignements"""
-    query = """
+ASSIGNMENT_FIELDS = ('label', 'volunteer', 'event', 'startDate', 'status', 'rating')
+
+ASSIGNMENT_LIST = ListQuery(
+    """
     PREFIX webprotege: <http://webprotege.stanford.edu/>
     PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-    SELECT ?assignment ?label ?volunteer ?event ?startDate ?status ?rating
-    WHERE {
-        ?assignment a <http://webprotege.stanford.edu/Rj2A7xNWLfpNcbE4HJMKqN> .
-        
-        OPTIONAL { ?assignment rdfs:label ?label . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?volunteer . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RBqttmTqH5uyTK64wj0hDiD> ?event . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RD3Wor03BEPInfzUaMNVPC7> ?startDate . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RDT3XEARggTy1BIBKDXXrmx> ?status . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RRatingAssignment> ?rating . }
-    }
-    ORDER BY ?assignment
-    """
-    results = sparql_utils.execute_query(query)
-    return jsonify(results)
+    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>""",
+    key='assignment',
+    select=('assignment',) + ASSIGNMENT_FIELDS,
+    where="?assignment a <http://webprotege.stanford.edu/Rj2A7xNWLfpNcbE4HJMKqN> .",
+    optionals=[
+        (('label',), "OPTIONAL { ?assignment rdfs:label ?label . }"),
+        (('volunteer',), "OPTIONAL { ?assignment <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?volunteer . }"),
+        (('event',), "OPTIONAL { ?assignment <http://webprotege.stanford.edu/RBqttmTqH5uyTK64wj0hDiD> ?event . }"),
+        (('startDate',), "OPTIONAL { ?assignment <http://webprotege.stanford.edu/RD3Wor03BEPInfzUaMNVPC7> ?startDate . }"),
+        (('status',), "OPTIONAL { ?assignment <http://webprotege.stanford.edu/RDT3XEARggTy1BIBKDXXrmx> ?status . }"),
+        (('rating',), "OPTIONAL { ?assignment <http://webprotege.stanford.edu/RRatingAssignment> ?rating . }"),
+    ],
+    order_by=('assignment',),
+)
+
+@assignments_bp.route('/assignments', methods=['GET'])
+def get_all_assignments():
+    """Récupère tous les assignements (paramètres optionnels : fields, page_size, cursor)"""
+    return list_response(ASSIGNMENT_LIST, request.args)
 
 @assignments_bp.route('/assignments/<assignment_id>', methods=['GET'])
 def get_assignment(assignment_id):
     """Récupère un assignement spécifique"""
-    query = f"""
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?assignment ?label ?volunteer ?event ?startDate ?status ?rating
-    WHERE {{
-        <{assignment_id}> a <http://webprotege.stanford.edu/Rj2A7xNWLfpNcbE4HJMKqN> .
-        
-        OPTIONAL {{ <{assignment_id}> rdfs:label ?label . }}
-        OPTIONAL {{ <{assignment_id}> <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?volunteer . }}
-        OPTIONAL {{ <{assignment_id}> <http://webprotege.stanford.edu/RBqttmTqH5uyTK64wj0hDiD> ?event . }}
-        OPTIONAL {{ <{assignment_id}> <http://webprotege.stanford.edu/RD3Wor03BEPInfzUaMNVPC7> ?startDate . }}
-        OPTIONAL {{ <{assignment_id}> <http://webprotege.stanford.edu/RDT3XEARggTy1BIBKDXXrmx> ?status . }}
-        OPTIONAL {{ <{assignment_id}> <http://webprotege.stanford.edu/RRatingAssignment> ?rating . }}
-    }}
-    """
-    results = sparql_utils.execute_query(query)
+    results = assignment_projection.rows(ASSIGNMENT_FIELDS, include_key=False, ids=[assignment_id])
     return jsonify(results[0] if results else {})
 
+@assignments_bp.route('/assignments/batch', methods=['POST'])
+def get_assignments_batch():
+    """Récupère plusieurs assignements en un appel : {"ids": [...]} -> résultats par IRI"""
+    return batch_response(lambda ids: assignment_projection.lookup(ASSIGNMENT_FIELDS, ids))
+
 @assignments_bp.route('/assignments/by-status/<status>', methods=['GET'])
 def get_assignments_by_status(status):
     """Récupère les assignements par statut"""
-    query = f"""
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?assignment ?label ?volunteer ?event ?startDate ?status ?rating
-    WHERE {{
-        ?assignment a <http://webprotege.stanford.edu/Rj2A7xNWLfpNcbE4HJMKqN> ;
-                   <http://webprotege.stanford.edu/RDT3XEARggTy1BIBKDXXrmx> ?status .
-        
-        OPTIONAL {{ ?assignment rdfs:label ?label . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?volunteer . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RBqttmTqH5uyTK64wj0hDiD> ?event . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RD3Wor03BEPInfzUaMNVPC7> ?startDate . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RRatingAssignment> ?rating . }}
-        
-        FILTER(REGEX(?status, "{status}", "i"))
-    }}
-    ORDER BY ?startDate DESC
-    """
-    results = sparql_utils.execute_query(query)
+    results = assignment_projection.rows(
+        ASSIGNMENT_FIELDS, match={'status': status}, order_by='startDate', descending=True)
     return jsonify(results)
 
 @assignments_bp.route('/assignments/by-rating/<int:min_rating>', methods=['GET'])
 def get_assignments_by_rating(min_rating):
     """Récupère les assignements avec une note minimale"""
-    query = f"""
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-    SELECT ?assignment ?label ?volunteer ?event ?startDate ?status ?rating
-    WHERE {{
-        ?assignment a <http://webprotege.stanford.edu/Rj2A7xNWLfpNcbE4HJMKqN> ;
-                   <http://webprotege.stanford.edu/RRatingAssignment> ?rating .
-        
-        OPTIONAL {{ ?assignment rdfs:label ?label . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?volunteer . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RBqttmTqH5uyTK64wj0hDiD> ?event . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RD3Wor03BEPInfzUaMNVPC7> ?startDate . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RDT3XEARggTy1BIBKDXXrmx> ?status . }}
-        
-        FILTER(?rating >= {min_rating})
-    }}
-    ORDER BY ?rating DESC
-    """
-    results = sparql_utils.execute_query(query)
+    results = assignment_projection.rows(
+        ASSIGNMENT_FIELDS, minimum={'rating': min_rating}, order_by='rating', descending=True)
     return jsonify(results)
 
 @assignments_bp.route('/assignments/search', methods=['POST'])
@@ -107,37 +68,19 @@ def search_assignments():
     date_from = data.get('date_from', '')
     date_to = data.get('date_to', '')
     
-    query = """
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?assignment ?label ?volunteer ?event ?startDate ?status ?rating
-    WHERE {
-        ?assignment a <http://webprotege.stanford.edu/Rj2A7xNWLfpNcbE4HJMKqN> .
-        
-        OPTIONAL { ?assignment rdfs:label ?label . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?volunteer . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RBqttmTqH5uyTK64wj0hDiD> ?event . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RD3Wor03BEPInfzUaMNVPC7> ?startDate . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RDT3XEARggTy1BIBKDXXrmx> ?status . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RRatingAssignment> ?rating . }
-    """
-    
-    filters = []
+    match, minimum, maximum = {}, {}, {}
     if status:
-        filters.append(f'REGEX(?status, "{status}", "i")')
+        match['status'] = status
     if min_rating:
-        filters.append(f'?rating >= {min_rating}')
+        minimum['rating'] = min_rating
     if date_from:
-        filters.append(f'?startDate >= "{date_from}"^^xsd:date')
+        minimum['startDate'] = date_from
     if date_to:
-        filters.append(f'?startDate <= "{date_to}"^^xsd:date')
+        maximum['startDate'] = date_to
     
-    if filters:
-        query += " FILTER(" + " && ".join(filters) + ")"
-    
-    query += "} ORDER BY ?startDate DESC"
-    
-    results = sparql_utils.execute_query(query)
+    results = assignment_projection.rows(
+        ASSIGNMENT_FIELDS, match=match, minimum=minimum, maximum=maximum,
+        order_by='startDate', descending=True)
     return jsonify(results)
 
 @assignments_bp.route('/assignments/statistics', methods=['GET'])
@@ -172,119 +115,36 @@ def get_assignment_statistics():
 @assignments_bp.route('/assignments/approved', methods=['GET'])
 def get_approved_assignments():
     """Récupère les assignements approuvés"""
-    query = """
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?assignment ?label ?volunteer ?event ?startDate ?status ?rating
-    WHERE {
-        ?assignment a <http://webprotege.stanford.edu/Rj2A7xNWLfpNcbE4HJMKqN> ;
-                   <http://webprotege.stanford.edu/RDT3XEARggTy1BIBKDXXrmx> ?status .
-        
-        OPTIONAL { ?assignment rdfs:label ?label . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?volunteer . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RBqttmTqH5uyTK64wj0hDiD> ?event . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RD3Wor03BEPInfzUaMNVPC7> ?startDate . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RRatingAssignment> ?rating . }
-        
-        FILTER(REGEX(?status, "approuvé", "i"))
-    }
-    ORDER BY ?startDate DESC
-    """
-    results = sparql_utils.execute_query(query)
+    results = assignment_projection.rows(
+        ASSIGNMENT_FIELDS, match={'status': 'approuvé'}, order_by='startDate', descending=True)
     return jsonify(results)
 
 @assignments_bp.route('/assignments/rejected', methods=['GET'])
 def get_rejected_assignments():
     """Récupère les assignements rejetés"""
-    query = """
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?assignment ?label ?volunteer ?event ?startDate ?status ?rating
-    WHERE {
-        ?assignment a <http://webprotege.stanford.edu/Rj2A7xNWLfpNcbE4HJMKqN> ;
-                   <http://webprotege.stanford.edu/RDT3XEARggTy1BIBKDXXrmx> ?status .
-        
-        OPTIONAL { ?assignment rdfs:label ?label . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?volunteer . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RBqttmTqH5uyTK64wj0hDiD> ?event . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RD3Wor03BEPInfzUaMNVPC7> ?startDate . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RRatingAssignment> ?rating . }
-        
-        FILTER(REGEX(?status, "non approuvé", "i"))
-    }
-    ORDER BY ?startDate DESC
-    """
-    results = sparql_utils.execute_query(query)
+    results = assignment_projection.rows(
+        ASSIGNMENT_FIELDS, match={'status': 'non approuvé'}, order_by='startDate', descending=True)
     return jsonify(results)
 
 @assignments_bp.route('/assignments/by-volunteer/<volunteer_id>', methods=['GET'])
 def get_assignments_by_volunteer(volunteer_id):
     """Récupère les assignements d'un volontaire spécifique"""
-    query = f"""
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?assignment ?label ?volunteer ?event ?startDate ?status ?rating
-    WHERE {{
-        ?assignment a <http://webprotege.stanford.edu/Rj2A7xNWLfpNcbE4HJMKqN> ;
-                   <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> <{volunteer_id}> .
-        
-        OPTIONAL {{ ?assignment rdfs:label ?label . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?volunteer . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RBqttmTqH5uyTK64wj0hDiD> ?event . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RD3Wor03BEPInfzUaMNVPC7> ?startDate . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RDT3XEARggTy1BIBKDXXrmx> ?status . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RRatingAssignment> ?rating . }}
-    }}
-    ORDER BY ?startDate DESC
-    """
-    results = sparql_utils.execute_query(query)
+    results = assignment_projection.rows(
+        ASSIGNMENT_FIELDS, equals={'volunteer': volunteer_id}, order_by='startDate', descending=True)
     return jsonify(results)
 
 @assignments_bp.route('/assignments/by-event/<event_id>', methods=['GET'])
 def get_assignments_by_event(event_id):
     """Récupère les assignements pour un événement spécifique"""
-    query = f"""
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?assignment ?label ?volunteer ?event ?startDate ?status ?rating
-    WHERE {{
-        ?assignment a <http://webprotege.stanford.edu/Rj2A7xNWLfpNcbE4HJMKqN> ;
-                   <http://webprotege.stanford.edu/RBqttmTqH5uyTK64wj0hDiD> <{event_id}> .
-        
-        OPTIONAL {{ ?assignment rdfs:label ?label . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?volunteer . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RBqttmTqH5uyTK64wj0hDiD> ?event . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RD3Wor03BEPInfzUaMNVPC7> ?startDate . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RDT3XEARggTy1BIBKDXXrmx> ?status . }}
-        OPTIONAL {{ ?assignment <http://webprotege.stanford.edu/RRatingAssignment> ?rating . }}
-    }}
-    ORDER BY ?startDate DESC
-    """
-    results = sparql_utils.execute_query(query)
+    results = assignment_projection.rows(
+        ASSIGNMENT_FIELDS, equals={'event': event_id}, order_by='startDate', descending=True)
     return jsonify(results)
 
 @assignments_bp.route('/assignments/high-rated', methods=['GET'])
 def get_high_rated_assignments():
     """Récupère les assignements avec une note élevée (>= 4)"""
-    query = """
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?assignment ?label ?volunteer ?event ?startDate ?status ?rating
-    WHERE {
-        ?assignment a <http://webprotege.stanford.edu/Rj2A7xNWLfpNcbE4HJMKqN> ;
-                   <http://webprotege.stanford.edu/RRatingAssignment> ?rating .
-        
-        OPTIONAL { ?assignment rdfs:label ?label . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?volunteer . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RBqttmTqH5uyTK64wj0hDiD> ?event . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RD3Wor03BEPInfzUaMNVPC7> ?startDate . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RDT3XEARggTy1BIBKDXXrmx> ?status . }
-        
-        FILTER(?rating >= 4)
-    }
-    ORDER BY ?rating DESC
-    """
-    results = sparql_utils.execute_query(query)
+    results = assignment_projection.rows(
+        ASSIGNMENT_FIELDS, minimum={'rating': 4}, order_by='rating', descending=True)
     return jsonify(results)
 
 @assignments_bp.route('/assignments/advanced-search', methods=['POST'])
@@ -300,41 +160,23 @@ def advanced_search_assignments():
     volunteer_id = data.get('volunteer_id', '')
     event_id = data.get('event_id', '')
     
-    query = """
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?assignment ?label ?volunteer ?event ?startDate ?status ?rating
-    WHERE {
-        ?assignment a <http://webprotege.stanford.edu/Rj2A7xNWLfpNcbE4HJMKqN> .
-        
-        OPTIONAL { ?assignment rdfs:label ?label . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?volunteer . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RBqttmTqH5uyTK64wj0hDiD> ?event . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RD3Wor03BEPInfzUaMNVPC7> ?startDate . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RDT3XEARggTy1BIBKDXXrmx> ?status . }
-        OPTIONAL { ?assignment <http://webprotege.stanford.edu/RRatingAssignment> ?rating . }
-    """
-    
-    filters = []
+    match, equals, minimum, maximum = {}, {}, {}, {}
     if status:
-        filters.append(f'REGEX(?status, "{status}", "i")')
+        match['status'] = status
     if min_rating:
-        filters.append(f'?rating >= {min_rating}')
+        minimum['rating'] = min_rating
     if max_rating:
-        filters.append(f'?rating <= {max_rating}')
+        maximum['rating'] = max_rating
     if date_from:
-        filters.append(f'?startDate >= "{date_from}"^^xsd:date')
+        minimum['startDate'] = date_from
     if date_to:
-        filters.append(f'?startDate <= "{date_to}"^^xsd:date')
+        maximum['startDate'] = date_to
     if volunteer_id:
-        filters.append(f'?volunteer = <{volunteer_id}>')
+        equals['volunteer'] = volunteer_id
     if event_id:
-        filters.append(f'?event = <{event_id}>')
-    
-    if filters:
-        query += " FILTER(" + " && ".join(filters) + ")"
+        equals['event'] = event_id
     
-    query += "} ORDER BY ?startDate DESC"
-    
-    results = sparql_utils.execute_query(query)
-    return jsonify(results)
+    results = assignment_projection.rows(
+        ASSIGNMENT_FIELDS, match=match, equals=equals, minimum=minimum, maximum=maximum,
+        order_by='startDate', descending=True)
+    return jsonify(results)
\ No newline at end of file
@@ -0,0 +1,80 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, current_app, jsonify, request
+
+batch_bp = Blueprint('batch', __name__)
+
+MAX_SUB_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', '20'))
+# Méthodes sans effet de bord : des sous-requêtes identiques ne sont exécutées qu'une fois
+SAFE_METHODS = ('GET', 'HEAD')
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv('BATCH_WORKERS', '8')),
+                               thread_name_prefix='batch')
+
+
+def _dispatch(app, method, path, body):
+    """Exécute une sous-requête sur les routes existantes, dans son propre contexte de requête"""
+    try:
+        with app.test_request_context(path, method=method, json=body):
+            response = app.full_dispatch_request()
+            # Lu dans le contexte : les réponses en flux (/donations) en ont besoin
+            data = response.get_data()
+            payload = response.get_json(silent=True)
+        if payload is None and data:
+            payload = data.decode('utf-8', errors='replace')
+        return response.status_code, payload
+    except Exception as e:
+        print(f"Erreur sous-requête {method} {path}: {str(e)}")
+        return 500, {"error": str(e)}
+
+
+def _parse(item, position):
+    if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+        raise ValueError(f"Sous-requête {position}: objet {{\"path\": ...}} attendu")
+    method = str(item.get('method', 'GET')).upper()
+    path = item['path']
+    if not path.startswith('/api/') or path.split('?')[0].rstrip('/') == '/api/batch':
+        raise ValueError(f"Sous-requête {position}: chemin non autorisé {path}")
+    return item.get('id', position), method, path, item.get('body')
+
+
+@batch_bp.route('/batch', methods=['POST'])
+def batch():
+    """
+    Exécute plusieurs appels d'API en un seul échange HTTP :
+    {"requests": [{"id": "stats", "method": "GET", "path": "/api/certifications/stats"}, ...]}
+    Les sous-requêtes sont exécutées en parallèle ; la réponse donne, dans
+    l'ordre, le statut et le corps de chacune.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('requests') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": 'Corps attendu: {"requests": [{"path": "/api/..."}, ...]}'}), 400
+    if len(items) > MAX_SUB_REQUESTS:
+        return jsonify({"error": f"Au plus {MAX_SUB_REQUESTS} sous-requêtes par lot"}), 400
+
+    try:
+        parsed = [_parse(item, position) for position, item in enumerate(items)]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    app = current_app._get_current_object()
+    futures = {}
+    keys = []
+    for _, method, path, body in parsed:
+        # Une écriture n'est jamais fusionnée avec une autre
+        key = (method, path) if method in SAFE_METHODS else len(keys)
+        if key not in futures:
+            futures[key] = _executor.submit(_dispatch, app, method, path, body)
+        keys.append(key)
+
+    responses = []
+    for (item_id, _, _, _), key in zip(parsed, keys):
+        status, payload = futures[key].result()
+        responses.append({"id": item_id, "status": status, "body": payload})
+
+    return jsonify({
+        "responses": responses,
+        "executed": len(futures),
+        "deduplicated": len(keys) - len(futures),
+    })
@@ -1,28 +1,32 @@
 from flask import Blueprint, jsonify, request, current_app as app
 from sparql_utils import sparql_utils
+from pagination import ListQuery, list_response
 import uuid
 
 BASE_BLOG_URI = "http://example.org/blog/"
 
 blogs_bp = Blueprint('blogs', __name__)
 
+BLOG_LIST = ListQuery(
+    """
+    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>""",
+    key='blog',
+    select=('blog', 'title', 'content', 'category', 'publicationDate'),
+    where="?blog a eco:Blog .",
+    optionals=[
+        (('title',), "OPTIONAL { ?blog eco:blogTitle ?title . }"),
+        (('content',), "OPTIONAL { ?blog eco:blogContent ?content . }"),
+        (('category',), "OPTIONAL { ?blog eco:category ?category . }"),
+        (('publicationDate',), "OPTIONAL { ?blog eco:publicationDate ?publicationDate . }"),
+    ],
+    order_by=('publicationDate',),
+    descending=True,
+)
+
 @blogs_bp.route('/blogs', methods=['GET'])
 def get_all_blogs():
-    """Récupère tous les blogs"""
-    query = """
-    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-    SELECT ?blog ?title ?content ?category ?publicationDate
-    WHERE {
-        ?blog a eco:Blog .
-        OPTIONAL { ?blog eco:blogTitle ?title . }
-        OPTIONAL { ?blog eco:blogContent ?content . }
-        OPTIONAL { ?blog eco:category ?category . }
-        OPTIONAL { ?blog eco:publicationDate ?publicationDate . }
-    }
-    ORDER BY DESC(?publicationDate)
-    """
-    results = sparql_utils.execute_query(query)
-    return jsonify(results)
+    """Récupère tous les blogs (paramètres optionnels : fields, page_size, cursor)"""
+    return list_response(BLOG_LIST, request.args)
 
 
 @blogs_bp.route('/blogs/<blog_id>', methods=['GET'])
@@ -1,53 +1,74 @@
 from flask import Blueprint, jsonify, request
-from SPARQLWrapper import SPARQLWrapper, JSON
+from sparql_utils import sparql_utils
+from class_hierarchy import ECO, class_hierarchy
+from pagination import ListQuery, PaginationError
 import json
 
 api_routes = Blueprint('api', __name__)
 
-# Configuration Fuseki - CORRIGÉ pour utiliser le même endpoint que sparql_utils.py
-FUSEKI_ENDPOINT = "http://localhost:3030/eco-ontology"
-sparql = SPARQLWrapper(FUSEKI_ENDPOINT + "/query")
-sparql.setReturnFormat(JSON)
-
-@api_routes.route('/campaigns', methods=['GET'])
-def get_campaigns():
-    """Récupérer toutes les campagnes (y compris sous-classes)"""
-    query = """
+CAMPAIGN_LIST = ListQuery(
+    """
     PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    
-    SELECT ?campaign ?name ?description ?status ?startDate ?endDate ?goal ?type ?resource ?resourceName
-    WHERE {
-        {
-            ?campaign a eco:Campaign .
-        }
-        UNION
-        {
-            ?subClass rdfs:subClassOf* eco:Campaign .
-            ?campaign a ?subClass .
-        }
-        ?campaign eco:campaignName ?name .
-        OPTIONAL { ?campaign eco:campaignDescription ?description }
-        OPTIONAL { ?campaign eco:campaignStatus ?status }
-        OPTIONAL { ?campaign eco:startDate ?startDate }
-        OPTIONAL { ?campaign eco:endDate ?endDate }
-        OPTIONAL { ?campaign eco:goal ?goal }
-        OPTIONAL { 
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>""",
+    key='campaign',
+    select=('campaign', 'name', 'description', 'status', 'startDate', 'endDate', 'goal', 'type', 'resource', 'resourceName'),
+    where="""
+        ?campaign a ?campaignClass .
+        VALUES ?campaignClass { %s }
+        ?campaign eco:campaignName ?name .""",
+    optionals=[
+        (('description',), "OPTIONAL { ?campaign eco:campaignDescription ?description }"),
+        (('status',), "OPTIONAL { ?campaign eco:campaignStatus ?status }"),
+        (('startDate',), "OPTIONAL { ?campaign eco:startDate ?startDate }"),
+        (('endDate',), "OPTIONAL { ?campaign eco:endDate ?endDate }"),
+        (('goal',), "OPTIONAL { ?campaign eco:goal ?goal }"),
+        (('type',), """OPTIONAL { 
             ?campaign a ?type .
             FILTER(?type != eco:Campaign)
-        }
-        OPTIONAL { 
+        }"""),
+        (('resource', 'resourceName'), """OPTIONAL { 
             ?campaign eco:requiresResource ?resource .
             ?resource eco:resourceName ?resourceName 
-        }
-    }
-    ORDER BY ?name
+        }"""),
+    ],
+    order_by=('name',),
+)
+
+RESOURCE_LIST = ListQuery(
     """
-    
+    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>""",
+    key='resource',
+    select=('resource', 'name', 'description', 'category', 'quantity', 'unitCost', 'type', 'campaign', 'campaignName'),
+    where="""
+        ?resource a ?resourceClass .
+        VALUES ?resourceClass { %s }
+        ?resource eco:resourceName ?name .""",
+    optionals=[
+        (('description',), "OPTIONAL { ?resource eco:resourceDescription ?description }"),
+        (('category',), "OPTIONAL { ?resource eco:resourceCategory ?category }"),
+        (('quantity',), "OPTIONAL { ?resource eco:quantityAvailable ?quantity }"),
+        (('unitCost',), "OPTIONAL { ?resource eco:unitCost ?unitCost }"),
+        (('type',), """OPTIONAL { 
+            ?resource a ?type .
+            FILTER(?type != eco:Resource)
+        }"""),
+        (('campaign', 'campaignName'), """OPTIONAL { 
+            ?campaign eco:requiresResource ?resource .
+            ?campaign eco:campaignName ?campaignName 
+        }"""),
+    ],
+    order_by=('name',),
+)
+
+@api_routes.route('/campaigns', methods=['GET'])
+def get_campaigns():
+    """Récupérer toutes les campagnes (y compris sous-classes) ; paramètres optionnels : fields, page_size, cursor"""
     try:
-        sparql.setQuery(query)
-        results = sparql.query().convert()
+        results = CAMPAIGN_LIST.execute(request.args, where_args=(class_hierarchy.subclass_values(ECO + 'Campaign'),), raw=True)
         return jsonify(results)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print(f"Erreur SPARQL: {str(e)}")
         return jsonify({"error": f"Erreur SPARQL: {str(e)}"}), 500
@@ -61,14 +82,8 @@ def get_campaign_details(campaign_name):
     
     SELECT ?campaign ?name ?description ?status ?startDate ?endDate ?goal ?resource ?resourceName ?resourceDescription ?type
     WHERE {
-        {
-            ?campaign a eco:Campaign .
-        }
-        UNION
-        {
-            ?subClass rdfs:subClassOf* eco:Campaign .
-            ?campaign a ?subClass .
-        }
+        ?campaign a ?campaignClass .
+        VALUES ?campaignClass { %s }
         ?campaign eco:campaignName ?name .
         FILTER(STR(?name) = "%s")
         OPTIONAL { ?campaign eco:campaignDescription ?description }
@@ -86,11 +101,10 @@ def get_campaign_details(campaign_name):
             FILTER(?type != eco:Campaign)
         }
     }
-    """ % campaign_name
+    """ % (class_hierarchy.subclass_values(ECO + 'Campaign'), campaign_name)
     
     try:
-        sparql.setQuery(query)
-        results = sparql.query().convert()
+        results = sparql_utils.execute_raw_query(query)
         return jsonify(results)
     except Exception as e:
         print(f"Erreur SPARQL: {str(e)}")
@@ -105,14 +119,8 @@ def get_active_campaigns():
     
     SELECT ?campaign ?name ?description ?status ?startDate ?endDate ?goal ?type
     WHERE {
-        {
-            ?campaign a eco:Campaign .
-        }
-        UNION
-        {
-            ?subClass rdfs:subClassOf* eco:Campaign .
-            ?campaign a ?subClass .
-        }
+        ?campaign a ?campaignClass .
+        VALUES ?campaignClass { %s }
         ?campaign eco:campaignName ?name .
         ?campaign eco:campaignStatus ?status .
         FILTER(LCASE(STR(?status)) = "active" || LCASE(STR(?status)) = "actif" || LCASE(STR(?status)) = "en cours")
@@ -126,11 +134,10 @@ def get_active_campaigns():
         }
     }
     ORDER BY ?name
-    """
+    """ % class_hierarchy.subclass_values(ECO + 'Campaign')
     
     try:
-        sparql.setQuery(query)
-        results = sparql.query().convert()
+        results = sparql_utils.execute_raw_query(query)
         return jsonify(results)
     except Exception as e:
         print(f"Erreur SPARQL: {str(e)}")
@@ -157,8 +164,7 @@ def get_campaigns_by_type(campaign_type):
     """ % campaign_type
     
     try:
-        sparql.setQuery(query)
-        results = sparql.query().convert()
+        results = sparql_utils.execute_raw_query(query)
         return jsonify(results)
     except Exception as e:
         print(f"Erreur SPARQL: {str(e)}")
@@ -166,42 +172,12 @@ def get_campaigns_by_type(campaign_type):
 
 @api_routes.route('/resources', methods=['GET'])
 def get_resources():
-    """Récupérer toutes les ressources (y compris sous-classes)"""
-    query = """
-    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    
-    SELECT ?resource ?name ?description ?category ?quantity ?unitCost ?type ?campaign ?campaignName
-    WHERE {
-        {
-            ?resource a eco:Resource .
-        }
-        UNION
-        {
-            ?subClass rdfs:subClassOf* eco:Resource .
-            ?resource a ?subClass .
-        }
-        ?resource eco:resourceName ?name .
-        OPTIONAL { ?resource eco:resourceDescription ?description }
-        OPTIONAL { ?resource eco:resourceCategory ?category }
-        OPTIONAL { ?resource eco:quantityAvailable ?quantity }
-        OPTIONAL { ?resource eco:unitCost ?unitCost }
-        OPTIONAL { 
-            ?resource a ?type .
-            FILTER(?type != eco:Resource)
-        }
-        OPTIONAL { 
-            ?campaign eco:requiresResource ?resource .
-            ?campaign eco:campaignName ?campaignName 
-        }
-    }
-    ORDER BY ?name
-    """
-    
+    """Récupérer toutes les ressources (y compris sous-classes) ; paramètres optionnels : fields, page_size, cursor"""
     try:
-        sparql.setQuery(query)
-        results = sparql.query().convert()
+        results = RESOURCE_LIST.execute(request.args, where_args=(class_hierarchy.subclass_values(ECO + 'Resource'),), raw=True)
         return jsonify(results)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print(f"Erreur SPARQL: {str(e)}")
         return jsonify({"error": f"Erreur SPARQL: {str(e)}"}), 500
@@ -215,14 +191,8 @@ def get_resource_details(resource_name):
     
     SELECT ?resource ?name ?description ?category ?quantity ?unitCost ?type ?campaign ?campaignName ?campaignDescription
     WHERE {
-        {
-            ?resource a eco:Resource .
-        }
-        UNION
-        {
-            ?subClass rdfs:subClassOf* eco:Resource .
-            ?resource a ?subClass .
-        }
+        ?resource a ?resourceClass .
+        VALUES ?resourceClass { %s }
         ?resource eco:resourceName ?name .
         FILTER(STR(?name) = "%s")
         OPTIONAL { ?resource eco:resourceDescription ?description }
@@ -239,11 +209,10 @@ def get_resource_details(resource_name):
             OPTIONAL { ?campaign eco:campaignDescription ?campaignDescription }
         }
     }
-    """ % resource_name
+    """ % (class_hierarchy.subclass_values(ECO + 'Resource'), resource_name)
     
     try:
-        sparql.setQuery(query)
-        results = sparql.query().convert()
+        results = sparql_utils.execute_raw_query(query)
         return jsonify(results)
     except Exception as e:
         print(f"Erreur SPARQL: {str(e)}")
@@ -269,8 +238,7 @@ def get_resources_by_type(resource_type):
     """ % resource_type
     
     try:
-        sparql.setQuery(query)
-        results = sparql.query().convert()
+        results = sparql_utils.execute_raw_query(query)
         return jsonify(results)
     except Exception as e:
         print(f"Erreur SPARQL: {str(e)}")
@@ -285,14 +253,8 @@ def get_campaign_resources(campaign_name):
     
     SELECT ?resource ?resourceName ?resourceDescription ?category ?quantity ?unitCost ?resourceType
     WHERE {
-        {
-            ?campaign a eco:Campaign .
-        }
-        UNION
-        {
-            ?subClass rdfs:subClassOf* eco:Campaign .
-            ?campaign a ?subClass .
-        }
+        ?campaign a ?campaignClass .
+        VALUES ?campaignClass { %s }
         ?campaign eco:campaignName ?campaignName .
         FILTER(STR(?campaignName) = "%s")
         ?campaign eco:requiresResource ?resource .
@@ -307,11 +269,10 @@ def get_campaign_resources(campaign_name):
         }
     }
     ORDER BY ?resourceName
-    """ % campaign_name
+    """ % (class_hierarchy.subclass_values(ECO + 'Campaign'), campaign_name)
     
     try:
-        sparql.setQuery(query)
-        results = sparql.query().convert()
+        results = sparql_utils.execute_raw_query(query)
         return jsonify(results)
     except Exception as e:
         print(f"Erreur SPARQL: {str(e)}")
@@ -328,8 +289,7 @@ def semantic_search():
     
     if sparql_query:
         try:
-            sparql.setQuery(sparql_query)
-            results = sparql.query().convert()
+            results = sparql_utils.execute_raw_query(sparql_query)
             return jsonify({
                 "original_question": question,
                 "generated_sparql": sparql_query,
@@ -361,15 +321,15 @@ def transform_question_to_sparql(question):
                     }
                     UNION
                     {
-                        ?subClass rdfs:subClassOf* eco:Campaign .
                         ?campaign a ?subClass .
+                        VALUES ?subClass { %s }
                         ?campaign a ?type .
                         FILTER(?type != eco:Campaign)
                     }
                 }
                 GROUP BY ?type
                 ORDER BY DESC(?count)
-                """
+                """ % class_hierarchy.subclass_values(ECO + 'Campaign')
             else:
                 return """
                 PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
@@ -377,16 +337,10 @@ def transform_question_to_sparql(question):
                 
                 SELECT (COUNT(DISTINCT ?campaign) as ?totalCampaigns)
                 WHERE {
-                    {
-                        ?campaign a eco:Campaign .
-                    }
-                    UNION
-                    {
-                        ?subClass rdfs:subClassOf* eco:Campaign .
-                        ?campaign a ?subClass .
-                    }
+                    ?campaign a ?campaignClass .
+                    VALUES ?campaignClass { %s }
                 }
-                """
+                """ % class_hierarchy.subclass_values(ECO + 'Campaign')
         
         # REQUÊTES DE TRI POUR CAMPAGNES
         elif "trier" in question_lower or "sort" in question_lower or "ordre" in question_lower:
@@ -397,14 +351,8 @@ def transform_question_to_sparql(question):
                 
                 SELECT ?name ?description ?status ?startDate ?endDate ?goal ?type
                 WHERE {
-                    {
-                        ?campaign a eco:Campaign .
-                    }
-                    UNION
-                    {
-                        ?subClass rdfs:subClassOf* eco:Campaign .
-                        ?campaign a ?subClass .
-                    }
+                    ?campaign a ?campaignClass .
+                    VALUES ?campaignClass { %s }
                     ?campaign eco:campaignName ?name .
                     OPTIONAL { ?campaign eco:campaignDescription ?description }
                     OPTIONAL { ?campaign eco:campaignStatus ?status }
@@ -419,7 +367,7 @@ def transform_question_to_sparql(question):
                 }
                 ORDER BY DESC(?startDate)
                 LIMIT 10
-                """
+                """ % class_hierarchy.subclass_values(ECO + 'Campaign')
             else:
                 return """
                 PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
@@ -427,14 +375,8 @@ def transform_question_to_sparql(question):
                 
                 SELECT ?name ?description ?status ?startDate ?endDate ?goal ?type
                 WHERE {
-                    {
-                        ?campaign a eco:Campaign .
-                    }
-                    UNION
-                    {
-                        ?subClass rdfs:subClassOf* eco:Campaign .
-                        ?campaign a ?subClass .
-                    }
+                    ?campaign a ?campaignClass .
+                    VALUES ?campaignClass { %s }
                     ?campaign eco:campaignName ?name .
                     OPTIONAL { ?campaign eco:campaignDescription ?description }
                     OPTIONAL { ?campaign eco:campaignStatus ?status }
@@ -448,7 +390,7 @@ def transform_question_to_sparql(question):
                 }
                 ORDER BY DESC(?name)
                 LIMIT 10
-                """
+                """ % class_hierarchy.subclass_values(ECO + 'Campaign')
         
         elif any(word in question_lower for word in ["actif", "active", "en cours", "current"]):
             return """
@@ -457,14 +399,8 @@ def transform_question_to_sparql(question):
             
             SELECT ?name ?description ?status ?startDate ?endDate ?goal ?type
             WHERE {
-                {
-                    ?campaign a eco:Campaign .
-                }
-                UNION
-                {
-                    ?subClass rdfs:subClassOf* eco:Campaign .
-                    ?campaign a ?subClass .
-                }
+                ?campaign a ?campaignClass .
+                VALUES ?campaignClass { %s }
                 ?campaign eco:campaignName ?name .
                 ?campaign eco:campaignStatus ?status .
                 FILTER(LCASE(STR(?status)) = "active" || LCASE(STR(?status)) = "actif" || LCASE(STR(?status)) = "en cours")
@@ -478,7 +414,7 @@ def transform_question_to_sparql(question):
                 }
             }
             ORDER BY ?name
-            """
+            """ % class_hierarchy.subclass_values(ECO + 'Campaign')
         
         elif "nettoyage" in question_lower or "cleanup" in question_lower:
             return """
@@ -559,14 +495,8 @@ def transform_question_to_sparql(question):
             
             SELECT ?name ?description ?status ?startDate ?endDate ?goal ?type
             WHERE {
-                {
-                    ?campaign a eco:Campaign .
-                }
-                UNION
-                {
-                    ?subClass rdfs:subClassOf* eco:Campaign .
-                    ?campaign a ?subClass .
-                }
+                ?campaign a ?campaignClass .
+                VALUES ?campaignClass { %s }
                 ?campaign eco:campaignName ?name .
                 OPTIONAL { ?campaign eco:campaignDescription ?description }
                 OPTIONAL { ?campaign eco:campaignStatus ?status }
@@ -580,7 +510,7 @@ def transform_question_to_sparql(question):
             }
             ORDER BY ?name
             LIMIT 20
-            """
+            """ % class_hierarchy.subclass_values(ECO + 'Campaign')
     
     # QUESTIONS SUR LES RESSOURCES
     elif any(word in question_lower for word in ["ressource", "resource"]):
@@ -593,21 +523,14 @@ def transform_question_to_sparql(question):
                 
                 SELECT ?category (COUNT(DISTINCT ?resource) as ?count)
                 WHERE {
-                    {
-                        ?resource a eco:Resource .
-                        OPTIONAL { ?resource eco:resourceCategory ?category }
-                    }
-                    UNION
-                    {
-                        ?subClass rdfs:subClassOf* eco:Resource .
-                        ?resource a ?subClass .
-                        OPTIONAL { ?resource eco:resourceCategory ?category }
-                    }
+                    ?resource a ?resourceClass .
+                    VALUES ?resourceClass { %s }
+                    OPTIONAL { ?resource eco:resourceCategory ?category }
                     FILTER(BOUND(?category))
                 }
                 GROUP BY ?category
                 ORDER BY DESC(?count)
-                """
+                """ % class_hierarchy.subclass_values(ECO + 'Resource')
             else:
                 return """
                 PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
@@ -615,16 +538,10 @@ def transform_question_to_sparql(question):
                 
                 SELECT (COUNT(DISTINCT ?resource) as ?totalResources)
                 WHERE {
-                    {
-                        ?resource a eco:Resource .
-                    }
-                    UNION
-                    {
-                        ?subClass rdfs:subClassOf* eco:Resource .
-                        ?resource a ?subClass .
-                    }
+                    ?resource a ?resourceClass .
+                    VALUES ?resourceClass { %s }
                 }
-                """
+                """ % class_hierarchy.subclass_values(ECO + 'Resource')
         
         # REQUÊTES DE TRI POUR RESSOURCES
         elif "trier" in question_lower or "sort" in question_lower or "ordre" in question_lower:
@@ -635,14 +552,8 @@ def transform_question_to_sparql(question):
                 
                 SELECT ?name ?description ?category ?quantity ?unitCost ?type
                 WHERE {
-                    {
-                        ?resource a eco:Resource .
-                    }
-                    UNION
-                    {
-                        ?subClass rdfs:subClassOf* eco:Resource .
-                        ?resource a ?subClass .
-                    }
+                    ?resource a ?resourceClass .
+                    VALUES ?resourceClass { %s }
                     ?resource eco:resourceName ?name .
                     OPTIONAL { ?resource eco:resourceDescription ?description }
                     OPTIONAL { ?resource eco:resourceCategory ?category }
@@ -656,7 +567,7 @@ def transform_question_to_sparql(question):
                 }
                 ORDER BY DESC(xsd:decimal(?unitCost))
                 LIMIT 10
-                """
+                """ % class_hierarchy.subclass_values(ECO + 'Resource')
             else:
                 return """
                 PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
@@ -664,14 +575,8 @@ def transform_question_to_sparql(question):
                 
                 SELECT ?name ?description ?category ?quantity ?unitCost ?type
                 WHERE {
-                    {
-                        ?resource a eco:Resource .
-                    }
-                    UNION
-                    {
-                        ?subClass rdfs:subClassOf* eco:Resource .
-                        ?resource a ?subClass .
-                    }
+                    ?resource a ?resourceClass .
+                    VALUES ?resourceClass { %s }
                     ?resource eco:resourceName ?name .
                     OPTIONAL { ?resource eco:resourceDescription ?description }
                     OPTIONAL { ?resource eco:resourceCategory ?category }
@@ -684,7 +589,7 @@ def transform_question_to_sparql(question):
                 }
                 ORDER BY DESC(?name)
                 LIMIT 10
-                """
+                """ % class_hierarchy.subclass_values(ECO + 'Resource')
         
         elif "humaine" in question_lower or "human" in question_lower:
             return """
@@ -779,14 +684,8 @@ def transform_question_to_sparql(question):
             
             SELECT ?name ?description ?category ?quantity ?unitCost ?type
             WHERE {
-                {
-                    ?resource a eco:Resource .
-                }
-                UNION
-                {
-                    ?subClass rdfs:subClassOf* eco:Resource .
-                    ?resource a ?subClass .
-                }
+                ?resource a ?resourceClass .
+                VALUES ?resourceClass { %s }
                 ?resource eco:resourceName ?name .
                 OPTIONAL { ?resource eco:resourceDescription ?description }
                 OPTIONAL { ?resource eco:resourceCategory ?category }
@@ -799,4 +698,4 @@ def transform_question_to_sparql(question):
             }
             ORDER BY ?name
             LIMIT 20
-            """
\ No newline at end of file
+            """ % class_hierarchy.subclass_values(ECO + 'Resource')
\ No newline at end of file
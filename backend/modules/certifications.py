@@ -1,35 +1,26 @@
 from flask import Blueprint, jsonify, request
 from sparql_utils import sparql_utils
-from modules.gemini_sparql_service import GeminiSPARQLTransformer
+from pagination import ListQuery, list_response
+from modules.services import services
 
 certifications_bp = Blueprint('certifications', __name__)
 
-try:
-    transformer = GeminiSPARQLTransformer()
-except Exception as e:
-    print(f"⚠️ Warning: Gemini not available: {e}")
-    transformer = None
-
-@certifications_bp.route('/certifications', methods=['GET'])
-def get_certifications():
-    """Récupère toutes les certifications"""
-    try:
-        query = """
+CERTIFICATION_LIST = ListQuery(
+    """
         PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-        PREFIX webprotege: <http://webprotege.stanford.edu/>
-        
-        SELECT ?certification ?certificateCode ?pointsEarned ?type ?issuerName ?issuerEmail ?awardedToName ?awardedToEmail ?reservationCode ?eventTitle ?reservationStatus ?confirmedByName
-        WHERE {
+        PREFIX webprotege: <http://webprotege.stanford.edu/>""",
+    key='certification',
+    select=('certification', 'certificateCode', 'pointsEarned', 'type', 'issuerName', 'issuerEmail', 'awardedToName',
+            'awardedToEmail', 'reservationCode', 'eventTitle', 'reservationStatus', 'confirmedByName'),
+    where="""
             ?certification a eco:Certification .
             ?certification webprotege:R9QGoktbkOBbsLkvgjicNA8 ?certificateCode .
             ?certification webprotege:R9gsGMKtVBKEAd4d8I75UkC ?pointsEarned .
             ?certification webprotege:RBPJvon09P5n1GLdLbu2esV ?type .
             ?certification eco:issuedBy ?issuer .
             ?issuer eco:firstName ?issuerName .
-            OPTIONAL { ?issuer eco:email ?issuerEmail . }
             ?certification eco:awardedTo ?recipient .
             ?recipient eco:firstName ?awardedToName .
-            OPTIONAL { ?recipient eco:email ?awardedToEmail . }
             
             # Jointure obligatoire avec réservation confirmée
             ?reservation a eco:Reservation .
@@ -41,13 +32,19 @@ def get_certifications():
             ?reservation eco:confirmedBy ?admin .
             ?admin eco:firstName ?confirmedByName .
             
-            BIND("confirmed" as ?reservationStatus)
-        }
-        ORDER BY ?certification
-        """
-        
-        results = sparql_utils.execute_query(query)
-        return jsonify(results)
+            BIND("confirmed" as ?reservationStatus)""",
+    optionals=[
+        (('issuerEmail',), "OPTIONAL { ?issuer eco:email ?issuerEmail . }"),
+        (('awardedToEmail',), "OPTIONAL { ?recipient eco:email ?awardedToEmail . }"),
+    ],
+    order_by=('certification',),
+)
+
+@certifications_bp.route('/certifications', methods=['GET'])
+def get_certifications():
+    """Récupère toutes les certifications (paramètres optionnels : fields, page_size, cursor)"""
+    try:
+        return list_response(CERTIFICATION_LIST, request.args)
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -215,6 +212,7 @@ def semantic_search_certifications():
     if not question:
         return jsonify({"error": "Question is required"}), 400
     
+    transformer = services.optional('gemini')
     if not transformer:
         return jsonify({"error": "Gemini service not available"}), 500
     
@@ -1,63 +1,65 @@
-from flask import Blueprint, jsonify
-from sparql_utils import sparql_utils
+from flask import Blueprint, jsonify, request
+from pagination import ListQuery, PaginationError
+from entity_projections import event_projection
+from entity_batch import batch_response
 
 events_bp = Blueprint('events', __name__)
 
-@events_bp.route('/events', methods=['GET'])
-def get_all_events():
-    """Récupère tous les événements"""
-    query = """
+EVENT_DETAIL_FIELDS = ('title', 'description', 'date', 'location', 'locationName', 'address',
+                       'maxParticipants', 'status', 'duration')
+
+EVENT_LIST = ListQuery(
+    """
     PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-    SELECT ?event ?title ?description ?date ?location ?locationName ?maxParticipants ?status ?duration ?images
-    WHERE {
+    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>""",
+    key='event',
+    select=('event', 'title', 'description', 'date', 'location', 'locationName', 'maxParticipants', 'status', 'duration', 'images'),
+    where="""
         ?event a eco:Event ;
                eco:eventTitle ?title ;
                eco:eventDate ?date ;
                eco:isLocatedAt ?location ;
-               eco:maxParticipants ?maxParticipants .
-        
-        OPTIONAL { ?event eco:eventDescription ?description . }
-        OPTIONAL { ?event eco:eventStatus ?status . }
-        OPTIONAL { ?event eco:duration ?duration . }
-        OPTIONAL { ?location eco:locationName ?locationName . }
-        OPTIONAL { ?event eco:eventImages ?images . }
-    }
-    ORDER BY ?date
-    """
-    results = sparql_utils.execute_query(query)
+               eco:maxParticipants ?maxParticipants .""",
+    optionals=[
+        (('description',), "OPTIONAL { ?event eco:eventDescription ?description . }"),
+        (('status',), "OPTIONAL { ?event eco:eventStatus ?status . }"),
+        (('duration',), "OPTIONAL { ?event eco:duration ?duration . }"),
+        (('locationName',), "OPTIONAL { ?location eco:locationName ?locationName . }"),
+        (('images',), "OPTIONAL { ?event eco:eventImages ?images . }"),
+    ],
+    order_by=('date',),
+)
+
+@events_bp.route('/events', methods=['GET'])
+def get_all_events():
+    """Récupère tous les événements (paramètres optionnels : fields, page_size, cursor)"""
+    try:
+        results = EVENT_LIST.execute(request.args)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     
     # Debug: Print what we're getting from SPARQL
-    print("DEBUG - Raw images data from SPARQL:")
-    for event in results:
-        print(f"Event: {event.get('title')}, Images: {event.get('images')}")
+    if isinstance(results, list):
+        print("DEBUG - Raw images data from SPARQL:")
+        for event in results:
+            print(f"Event: {event.get('title')}, Images: {event.get('images')}")
     
     return jsonify(results)
 
 @events_bp.route('/events/<event_id>', methods=['GET'])
 def get_event(event_id):
     """Récupère un événement spécifique"""
-    query = f"""
-    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-    SELECT ?event ?title ?description ?date ?location ?locationName ?address ?maxParticipants ?status ?duration
-    WHERE {{
-        <{event_id}> a eco:Event ;
-               eco:eventTitle ?title ;
-               eco:eventDate ?date ;
-               eco:isLocatedAt ?location ;
-               eco:maxParticipants ?maxParticipants .
-        
-        ?location eco:locationName ?locationName ;
-                 eco:address ?address .
-        
-        OPTIONAL {{ <{event_id}> eco:eventDescription ?description . }}
-        OPTIONAL {{ <{event_id}> eco:eventStatus ?status . }}
-        OPTIONAL {{ <{event_id}> eco:duration ?duration . }}
-    }}
-    """
-    results = sparql_utils.execute_query(query)
+    results = event_projection.rows(
+        EVENT_DETAIL_FIELDS, include_key=False, ids=[event_id],
+        required=('title', 'date', 'location', 'maxParticipants', 'locationName', 'address'))
     return jsonify(results[0] if results else {})
 
+@events_bp.route('/events/batch', methods=['POST'])
+def get_events_batch():
+    """Récupère plusieurs événements en un appel : {"ids": [...]} -> résultats par IRI"""
+    return batch_response(lambda ids: event_projection.lookup(
+        EVENT_DETAIL_FIELDS, ids, required=('title', 'date', 'location', 'maxParticipants', 'locationName', 'address')))
+
 @events_bp.route('/events/search', methods=['POST'])
 def search_events():
     """Recherche d'événements par critères"""
@@ -68,37 +70,16 @@ def search_events():
     date = data.get('date', '')
     title = data.get('title', '')
     
-    query = """
-    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-    SELECT ?event ?title ?description ?date ?location ?locationName ?maxParticipants
-    WHERE {
-        ?event a eco:Event ;
-               eco:eventTitle ?title ;
-               eco:eventDate ?date ;
-               eco:isLocatedAt ?location ;
-               eco:maxParticipants ?maxParticipants .
-        
-        ?location eco:locationName ?locationName .
-        
-        OPTIONAL { ?event eco:eventDescription ?description . }
-    """
-    
-    filters = []
+    filters = {}
     if location:
-        filters.append(f'REGEX(?locationName, "{location}", "i")')
+        filters['locationName'] = location
     if date:
-        filters.append(f'REGEX(?date, "{date}", "i")')
+        filters['date'] = date
     if title:
-        filters.append(f'REGEX(?title, "{title}", "i")')
+        filters['title'] = title
     
-    if filters:
-        query += " FILTER(" + " && ".join(filters) + ")"
-    
-    query += "} ORDER BY ?date"
-    
-    results = sparql_utils.execute_query(query)
+    results = event_projection.rows(
+        ('title', 'description', 'date', 'location', 'locationName', 'maxParticipants'),
+        required=('title', 'date', 'location', 'maxParticipants', 'locationName'),
+        match=filters, order_by='date')
     return jsonify(results)
-
-
-
-
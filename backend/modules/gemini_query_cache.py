@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from modules.query_compiler import tokenize
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data')
+ONTOLOGY_SOURCE = os.getenv('ONTOLOGY_SOURCE', os.path.join(DATA_DIR, 'eco-ontology.rdf'))
+
+# Mots retirés de la clé : ils ne changent pas la requête générée
+STOP_WORDS = frozenset("""
+le la les l un une des de du d a au aux et ce cet cette ces y il ils elle elles est sont t moi me je j
+svp merci s il vous plait the an of to is are please
+""".split())
+
+
+def normalize_question(question):
+    """Question réduite à ses mots significatifs, sans accents ni ponctuation"""
+    return ' '.join(token for token in tokenize(question) if token not in STOP_WORDS)
+
+
+def analysis_signature(analysis):
+    """Ce que l'analyse TALN ajoute au prompt en plus de la question : classes, intention, temps, lieux"""
+    return {
+        "entities": sorted({entity.get('ontology_class') or '' for entity in analysis.get('entities') or []}),
+        "intent": (analysis.get('intent') or {}).get('primary_intent'),
+        "time": (analysis.get('temporal_info') or {}).get('relative_time'),
+        "locations": sorted((analysis.get('location_info') or {}).get('locations') or []),
+    }
+
+
+def ontology_fingerprint(path=ONTOLOGY_SOURCE):
+    try:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()[:16]
+    except OSError:
+        return 'unknown'
+
+
+class GeneratedQueryCache:
+    """
+    Cache disque (SQLite) des requêtes SPARQL produites par Gemini, partagé
+    entre les processus et conservé au redémarrage. La clé est la question
+    normalisée, complétée de la signature de l'analyse TALN pour les requêtes
+    générées à partir de celle-ci. Éviction LRU au-delà de `max_entries`.
+
+    `version` combine la version des prompts et l'empreinte de l'ontologie,
+    complétée de `fingerprint()` (empreinte du schéma lu dans Fuseki) si elle
+    est fournie : les entrées d'une autre version ne sont jamais servies et
+    sont purgées dès que la version courante change.
+    """
+
+    def __init__(self, path, version, max_entries=2000, enabled=True, fingerprint=None):
+        self.path = path
+        self.base_version = version
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._ready = False
+        self._purged_version = None
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+
+    @property
+    def version(self):
+        """Version courante ; None tant que l'empreinte du schéma est inconnue (cache alors contourné, sans purge)"""
+        if self.fingerprint is None:
+            return self.base_version
+        fingerprint = self.fingerprint()
+        return f"{self.base_version}-{fingerprint}" if fingerprint else None
+
+    def _connect(self, version):
+        connection = sqlite3.connect(self.path, timeout=5)
+        if not self._ready or self._purged_version != version:
+            with self._lock:
+                if not self._ready:
+                    connection.execute("""
+                        CREATE TABLE IF NOT EXISTS generated_queries (
+                            key TEXT PRIMARY KEY, version TEXT NOT NULL, question TEXT,
+                            sparql TEXT NOT NULL, last_used REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0
+                        )""")
+                    connection.execute("CREATE INDEX IF NOT EXISTS generated_queries_lru ON generated_queries (last_used)")
+                    self._ready = True
+                if self._purged_version != version:
+                    connection.execute("DELETE FROM generated_queries WHERE version != ?", (version,))
+                    self._purged_version = version
+                connection.commit()
+        return connection
+
+    def key(self, question, analysis=None):
+        parts = [normalize_question(question)]
+        if analysis is not None:
+            parts.append(json.dumps(analysis_signature(analysis), sort_keys=True))
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Requête en cache, ou None"""
+        if not self.enabled:
+            return None
+        version = self.version
+        if version is None:
+            return None
+        try:
+            connection = self._connect(version)
+            try:
+                row = connection.execute(
+                    "SELECT sparql FROM generated_queries WHERE key = ? AND version = ?",
+                    (key, version)).fetchone()
+                if row is not None:
+                    connection.execute(
+                        "UPDATE generated_queries SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                        (time.time(), key))
+                    connection.commit()
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            print(f"Erreur cache Gemini: {str(e)}")
+            self.errors += 1
+            return None
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, key, question, sparql):
+        if not self.enabled:
+            return
+        version = self.version
+        if version is None:
+            return
+        try:
+            connection = self._connect(version)
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO generated_queries (key, version, question, sparql, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (key, version, question, sparql, time.time()))
+                (count,) = connection.execute("SELECT COUNT(*) FROM generated_queries").fetchone()
+                if count > self.max_entries:
+                    connection.execute(
+                        "DELETE FROM generated_queries WHERE key IN "
+                        "(SELECT key FROM generated_queries ORDER BY last_used LIMIT ?)",
+                        (count - self.max_entries,))
+                connection.commit()
+            finally:
+                connection.close()
+            self.stores += 1
+        except sqlite3.Error as e:
+            print(f"Erreur cache Gemini: {str(e)}")
+            self.errors += 1
+
+    def stats(self):
+        entries = None
+        version = self.version
+        if self.enabled and version is not None:
+            try:
+                connection = self._connect(version)
+                try:
+                    (entries,) = connection.execute("SELECT COUNT(*) FROM generated_queries").fetchone()
+                finally:
+                    connection.close()
+            except sqlite3.Error:
+                pass
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "version": version,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "stores": self.stores,
+            "errors": self.errors,
+        }
@@ -0,0 +1,87 @@
+import re
+from collections import namedtuple
+
+# Occurrence d'un mot-clé : table et étiquette d'origine, rang dans la liste, position [start, end[ dans le texte
+KeywordMatch = namedtuple('KeywordMatch', 'table label keyword rank start end')
+
+
+def lower_with_offsets(text):
+    """Texte en minuscules et, si sa longueur change ("İ"...), position d'origine de chaque caractère"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered, None
+    pieces = [ch.lower() for ch in text]
+    return ''.join(pieces), [position for position, piece in enumerate(pieces) for _ in piece]
+
+
+def trie_pattern(keywords):
+    """
+    Expression régulière reconnaissant les mots-clés, factorisés par préfixe
+    commun ; les répétitions gourmandes donnent la correspondance la plus longue
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[''] = {}  # fin de mot-clé
+
+    def render(node):
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # Mot-clé complet ici : la suite est facultative
+            body = body + '?' if len(branches) == 1 and len(body) == 1 else '(?:' + body + ')?'
+        return body
+
+    return render(trie)
+
+
+class KeywordMatcher:
+    """
+    Recherche en une passe de tous les mots-clés de plusieurs tables
+    {étiquette: [mots-clés]}, avec la même sémantique que des tests
+    `mot_clé in texte.lower()` successifs : sous-chaînes, chevauchements compris.
+
+    Une seule expression régulière, construite une fois : les mots-clés y sont
+    factorisés en arbre de préfixes (au plus une branche essayée par caractère)
+    dans une assertion avant `(?=(...))` qui teste chaque position du texte.
+    À une position donnée, le moteur retient le mot-clé le plus long ; ceux
+    qui en sont des préfixes y sont aussi présents et sont ajoutés à partir
+    d'une table précalculée.
+    """
+
+    def __init__(self, tables):
+        self._entries = {}  # mot-clé -> [(table, étiquette, rang)]
+        for table, labels in tables.items():
+            for label, keywords in labels.items():
+                for rank, keyword in enumerate(keywords):
+                    entries = self._entries.setdefault(keyword.lower(), [])
+                    if not any(entry[:2] == (table, label) for entry in entries):
+                        entries.append((table, label, rank))
+
+        keywords = sorted(self._entries, key=lambda keyword: (-len(keyword), keyword))
+        # Pour chaque mot-clé : lui-même puis les mots-clés qui en sont des préfixes
+        self._expansions = {
+            keyword: [keyword] + [other for other in keywords if other != keyword and keyword.startswith(other)]
+            for keyword in keywords
+        }
+        self._pattern = re.compile('(?=(' + trie_pattern(keywords) + '))')
+
+    def find(self, text):
+        """Toutes les occurrences, par position croissante puis du mot-clé le plus long au plus court"""
+        lowered, offsets = lower_with_offsets(text)
+        matches = []
+        for match in self._pattern.finditer(lowered):
+            start = match.start()
+            for keyword in self._expansions[match.group(1)]:
+                end = start + len(keyword)
+                if offsets is not None:
+                    span = (offsets[start], offsets[end - 1] + 1)
+                else:
+                    span = (start, end)
+                for table, label, rank in self._entries[keyword]:
+                    matches.append(KeywordMatch(table, label, keyword, rank, *span))
+        return matches
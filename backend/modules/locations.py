@@ -1,83 +1,58 @@
-from flask import Blueprint, jsonify
-from sparql_utils import sparql_utils
+from flask import Blueprint, jsonify, request
+from pagination import ListQuery, list_response
+from entity_projections import is_unset, location_projection
+from entity_batch import batch_response
 
 locations_bp = Blueprint('locations', __name__)
 
+LOCATION_DETAIL_FIELDS = ('name', 'address', 'city', 'country', 'capacity', 'price', 'reserved', 'inRepair',
+                          'description', 'latitude', 'longitude', 'images')
+
+LOCATION_LIST = ListQuery(
+    """
+    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>""",
+    key='location',
+    select=('location', 'name', 'address', 'city', 'country', 'capacity', 'price', 'reserved', 'inRepair', 'description'),
+    where="?location a eco:Location .",
+    optionals=[
+        (('name',), "OPTIONAL { ?location eco:locationName ?name . }"),
+        (('address',), "OPTIONAL { ?location eco:address ?address . }"),
+        (('city',), "OPTIONAL { ?location eco:city ?city . }"),
+        (('country',), "OPTIONAL { ?location eco:country ?country . }"),
+        (('capacity',), "OPTIONAL { ?location eco:capacity ?capacity . }"),
+        (('price',), "OPTIONAL { ?location eco:price ?price . }"),
+        (('reserved',), "OPTIONAL { ?location eco:reserved ?reserved . }"),
+        (('inRepair',), "OPTIONAL { ?location eco:inRepair ?inRepair . }"),
+        (('description',), "OPTIONAL { ?location eco:locationDescription ?description . }"),
+    ],
+    order_by=('name',),
+)
+
 @locations_bp.route('/locations', methods=['GET'])
 def get_all_locations():
-    """Récupère toutes les locations"""
-    query = """
-    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-    SELECT ?location ?name ?address ?city ?country ?capacity ?price ?reserved ?inRepair ?description
-    WHERE {
-        ?location a eco:Location .
-        
-        OPTIONAL { ?location eco:locationName ?name . }
-        OPTIONAL { ?location eco:address ?address . }
-        OPTIONAL { ?location eco:city ?city . }
-        OPTIONAL { ?location eco:country ?country . }
-        OPTIONAL { ?location eco:capacity ?capacity . }
-        OPTIONAL { ?location eco:price ?price . }
-        OPTIONAL { ?location eco:reserved ?reserved . }
-        OPTIONAL { ?location eco:inRepair ?inRepair . }
-        OPTIONAL { ?location eco:locationDescription ?description . }
-    }
-    ORDER BY ?name
-    """
-    results = sparql_utils.execute_query(query)
-    return jsonify(results)
+    """Récupère toutes les locations (paramètres optionnels : fields, page_size, cursor)"""
+    return list_response(LOCATION_LIST, request.args)
 
 @locations_bp.route('/locations/<location_id>', methods=['GET'])
 def get_location(location_id):
     """Récupère une location spécifique"""
-    query = f"""
-    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-    SELECT ?location ?name ?address ?city ?country ?capacity ?price ?reserved ?inRepair ?description ?latitude ?longitude ?images
-    WHERE {{
-        <{location_id}> a eco:Location ;
-                 eco:locationName ?name ;
-                 eco:address ?address ;
-                 eco:capacity ?capacity .
-        
-        OPTIONAL {{ <{location_id}> eco:city ?city . }}
-        OPTIONAL {{ <{location_id}> eco:country ?country . }}
-        OPTIONAL {{ <{location_id}> eco:price ?price . }}
-        OPTIONAL {{ <{location_id}> eco:reserved ?reserved . }}
-        OPTIONAL {{ <{location_id}> eco:inRepair ?inRepair . }}
-        OPTIONAL {{ <{location_id}> eco:locationDescription ?description . }}
-        OPTIONAL {{ <{location_id}> eco:latitude ?latitude . }}
-        OPTIONAL {{ <{location_id}> eco:longitude ?longitude . }}
-        OPTIONAL {{ <{location_id}> eco:locationImages ?images . }}
-    }}
-    """
-    results = sparql_utils.execute_query(query)
+    results = location_projection.rows(
+        LOCATION_DETAIL_FIELDS, include_key=False, ids=[location_id], required=('name', 'address', 'capacity'))
     return jsonify(results[0] if results else {})
 
+@locations_bp.route('/locations/batch', methods=['POST'])
+def get_locations_batch():
+    """Récupère plusieurs locations en un appel : {"ids": [...]} -> résultats par IRI"""
+    return batch_response(lambda ids: location_projection.lookup(
+        LOCATION_DETAIL_FIELDS, ids, required=('name', 'address', 'capacity')))
+
 @locations_bp.route('/locations/available', methods=['GET'])
 def get_available_locations():
     """Récupère les locations disponibles (non réservées et non en réparation)"""
-    query = """
-    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-    SELECT ?location ?name ?address ?city ?capacity ?price
-    WHERE {
-        ?location a eco:Location .
-        
-        OPTIONAL { ?location eco:locationName ?name . }
-        OPTIONAL { ?location eco:address ?address . }
-        OPTIONAL { ?location eco:city ?city . }
-        OPTIONAL { ?location eco:capacity ?capacity . }
-        OPTIONAL { ?location eco:price ?price . }
-        OPTIONAL { ?location eco:reserved ?reserved . }
-        OPTIONAL { ?location eco:inRepair ?inRepair . }
-        
-        # Filter for available locations
-        FILTER (!BOUND(?reserved) || ?reserved = false)
-        FILTER (!BOUND(?inRepair) || ?inRepair = false)
-    }
-    ORDER BY ?name
-    """
-    results = sparql_utils.execute_query(query)
+    results = location_projection.rows(
+        ('name', 'address', 'city', 'capacity', 'price'),
+        where=lambda record: is_unset(record.reserved) and is_unset(record.inRepair),
+        order_by='name')
     return jsonify(results)
 
 @locations_bp.route('/locations/search', methods=['POST'])
@@ -90,34 +65,15 @@ def search_locations():
     min_capacity = data.get('min_capacity', '')
     max_price = data.get('max_price', '')
     
-    query = """
-    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-    SELECT ?location ?name ?address ?city ?capacity ?price
-    WHERE {
-        ?location a eco:Location ;
-                 eco:locationName ?name ;
-                 eco:address ?address ;
-                 eco:capacity ?capacity ;
-                 eco:price ?price .
-        
-        OPTIONAL { ?location eco:city ?city . }
-    """
-    
-    filters = []
+    criteria = {}
     if city:
-        filters.append(f'REGEX(?city, "{city}", "i")')
+        criteria['match'] = {'city': city}
     if min_capacity:
-        filters.append(f'?capacity >= {min_capacity}')
+        criteria['minimum'] = {'capacity': min_capacity}
     if max_price:
-        filters.append(f'?price <= {max_price}')
-    
-    if filters:
-        query += " FILTER(" + " && ".join(filters) + ")"
-    
-    query += "} ORDER BY ?price"
+        criteria['maximum'] = {'price': max_price}
     
-    results = sparql_utils.execute_query(query)
+    results = location_projection.rows(
+        ('name', 'address', 'city', 'capacity', 'price'),
+        required=('name', 'address', 'capacity', 'price'), order_by='price', **criteria)
     return jsonify(results)
-
-
-
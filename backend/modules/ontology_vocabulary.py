@@ -0,0 +1,425 @@
+import functools
+import itertools
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+from class_hierarchy import ECO
+from sparql_cache import extract_iris, update_footprint
+from sparql_utils import sparql_utils
+
+WEBPROTEGE = 'http://webprotege.stanford.edu/'
+
+# Préfixes des noms courts, au format des tables de l'analyse TALN ("eco:Event")
+PREFIXES = {ECO: 'eco:', WEBPROTEGE: 'webprotege:'}
+
+VOCABULARY_QUERY = """
+PREFIX owl: <http://www.w3.org/2002/07/owl#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+SELECT ?term ?kind ?label WHERE {
+    VALUES ?kind { owl:Class owl:ObjectProperty owl:DatatypeProperty }
+    ?term a ?kind .
+    FILTER(isIRI(?term))
+    OPTIONAL { ?term rdfs:label|skos:prefLabel|skos:altLabel ?label }
+}
+"""
+
+OWL = 'http://www.w3.org/2002/07/owl#'
+RDFS = 'http://www.w3.org/2000/01/rdf-schema#'
+
+# Termes dont l'écriture modifie le schéma (en plus des owl:*Property)
+SCHEMA_TERMS = frozenset((RDFS + 'subClassOf', RDFS + 'domain', RDFS + 'range', OWL + 'Class'))
+
+
+def touches_schema(update_query):
+    """Vrai si une mise à jour écrit une déclaration de classe ou de propriété, une hiérarchie, un domaine ou une portée"""
+    footprint = update_footprint(update_query)
+    if footprint is None:
+        # DELETE/INSERT WHERE : IRIs mentionnées par la requête
+        footprint = extract_iris(update_query)
+    return any(iri in SCHEMA_TERMS or (iri.startswith(OWL) and iri.endswith('Property')) for iri in footprint)
+
+
+KINDS = {
+    'http://www.w3.org/2002/07/owl#Class': 'class',
+    'http://www.w3.org/2002/07/owl#ObjectProperty': 'property',
+    'http://www.w3.org/2002/07/owl#DatatypeProperty': 'property',
+}
+
+# Équivalents français des mots des étiquettes (anglaises dans l'ontologie) ;
+# les variantes féminines couvrent l'accord avec le nom
+FRENCH_WORDS = {
+    # Noms des classes
+    'event': ['événement', 'évènement'],
+    'campaign': ['campagne'],
+    'volunteer': ['volontaire', 'bénévole'],
+    'assignment': ['assignement', 'affectation', 'assignation'],
+    'assignement': ['assignement', 'affectation', 'assignation'],
+    'reservation': ['réservation'],
+    'certificate': ['certificat'],
+    'certification': ['certification'],
+    'resource': ['ressource'],
+    'location': ['lieu'],
+    'platform': ['plateforme'],
+    'sponsor': ['sponsor', 'parrain'],
+    'sponsorship': ['parrainage', 'sponsoring'],
+    'donation': ['don', 'donation'],
+    'review': ['avis'],
+    'user': ['utilisateur'],
+    'level': ['niveau'],
+    # Qualificatifs des sous-classes
+    'educational': ['éducatif', 'éducative'],
+    'entertainment': ['divertissement'],
+    'competitive': ['compétitif', 'compétitive'],
+    'socialization': ['socialisation'],
+    'awareness': ['sensibilisation'],
+    'cleanup': ['nettoyage'],
+    'funding': ['financement'],
+    'digital': ['numérique'],
+    'equipment': ['équipement'],
+    'human': ['humain', 'humaine'],
+    'financial': ['financier', 'financière'],
+    'material': ['matériel', 'matérielle'],
+    'indoor': ['intérieur'],
+    'outdoor': ['extérieur'],
+    'virtual': ['virtuel', 'virtuelle'],
+    'active': ['actif', 'active'],
+    'inactive': ['inactif', 'inactive'],
+    'beginner': ['débutant', 'débutante'],
+    'intermediate': ['intermédiaire'],
+    'advanced': ['avancé', 'avancée', 'expérimenté'],
+    'suspended': ['suspendu', 'suspendue'],
+    'pending': ['en attente'],
+    'confirmed': ['confirmé', 'confirmée'],
+    'cancelled': ['annulé', 'annulée'],
+    'approved': ['approuvé', 'approuvée'],
+    'completed': ['terminé', 'terminée'],
+    'participation': ['participation'],
+    'achievement': ['réussite'],
+    'completion': ['achèvement'],
+    'gold': ['or'],
+    'silver': ['argent'],
+    'platinum': ['platine'],
+    # Mots des propriétés
+    'date': ['date'],
+    'start': ['début'],
+    'end': ['fin'],
+    'name': ['nom'],
+    'title': ['titre'],
+    'status': ['statut'],
+    'city': ['ville'],
+    'country': ['pays'],
+    'address': ['adresse'],
+    'capacity': ['capacité'],
+    'price': ['prix'],
+    'amount': ['montant'],
+    'rating': ['note'],
+    'phone': ['téléphone'],
+    'skill': ['compétence'],
+    'experience': ['expérience'],
+    'category': ['catégorie'],
+    'duration': ['durée'],
+    'goal': ['objectif'],
+    'quantity': ['quantité'],
+    'currency': ['devise'],
+    'registration': ['inscription'],
+    'participants': ['participants'],
+}
+
+# Mots introduisant un complément, qui ne s'accorde pas ("réservations en attente")
+FRENCH_LINKS = {'de', 'en'}
+
+# Au-delà, les combinaisons de traductions d'une étiquette ne sont pas générées
+MAX_VARIANTS_PER_LABEL = 32
+
+# Terme reconnu : ressource, nom court, nature (class/property), étiquette, position [start, end[ dans le texte
+VocabularyMatch = namedtuple('VocabularyMatch', 'iri qname kind label term start end')
+
+
+@functools.lru_cache(maxsize=4096)
+def _fold_char(ch):
+    """Caractère en minuscules sans accents ; ponctuation et espaces deviennent un espace"""
+    folded = ''.join(c for c in unicodedata.normalize('NFKD', ch.lower()) if not unicodedata.combining(c))
+    return ''.join(c if c.isalnum() else ' ' for c in folded)
+
+
+def normalize(text):
+    """Forme canonique des termes : minuscules, sans accents, mots séparés par un seul espace"""
+    return ' '.join(''.join(_fold_char(ch) for ch in text).split())
+
+
+def normalize_with_offsets(text):
+    """Comme `normalize`, avec la position d'origine de chaque caractère du résultat"""
+    chars = []
+    offsets = []
+    for position, ch in enumerate(text):
+        for c in _fold_char(ch):
+            if c == ' ' and (not chars or chars[-1] == ' '):
+                continue
+            chars.append(c)
+            offsets.append(position)
+    if chars and chars[-1] == ' ':
+        chars.pop()
+        offsets.pop()
+    return ''.join(chars), offsets
+
+
+def split_identifier(name):
+    """Mots d'un nom local ou d'une étiquette en camelCase ("eventTitle" -> "event Title")"""
+    return re.sub(r'(?<=[a-z0-9])(?=[A-Z])|_', ' ', name)
+
+
+def qname(iri):
+    for namespace, prefix in PREFIXES.items():
+        if iri.startswith(namespace):
+            return prefix + iri[len(namespace):]
+    return iri
+
+
+def expand(short_name):
+    """IRI complète d'un nom court ("eco:Event") ; None si le préfixe est inconnu"""
+    prefix, _, local = (short_name or '').partition(':')
+    for namespace, known in PREFIXES.items():
+        if known == prefix + ':' and local:
+            return namespace + local
+    return None
+
+
+def _plural(word):
+    return word if word[-1] in 'sxz' else word + 's'
+
+
+def _plurals(words, french=False):
+    """
+    Formes au singulier et au pluriel : dernier mot en anglais, nom et
+    qualificatifs accordés en français, jusqu'au complément ("campagnes de nettoyage")
+    """
+    yield words
+    if not french:
+        yield words[:-1] + [_plural(words[-1])]
+        return
+    head = next((index for index, word in enumerate(words) if word in FRENCH_LINKS), len(words))
+    yield [_plural(word) for word in words[:head]] + words[head:]
+
+
+def label_variants(label):
+    """
+    Termes dérivés d'une étiquette : l'étiquette elle-même, ses traductions
+    françaises mot à mot (nom en tête : "Active Volunteer" -> "volontaire actif",
+    "Cleanup Campaign" -> "campagne de nettoyage") et leurs pluriels
+    """
+    words = normalize(split_identifier(label)).split()
+    if not words:
+        return set()
+    variants = {' '.join(variant) for variant in _plurals(words)}
+    if any(word in FRENCH_WORDS for word in words) and len(words) <= 3:
+        options = [[normalize(french) for french in FRENCH_WORDS.get(word, [word])] for word in reversed(words)]
+        for combination in itertools.islice(itertools.product(*options), MAX_VARIANTS_PER_LABEL):
+            phrases = [' '.join(combination).split()]
+            if len(combination) == 2:
+                phrases.append(f'{combination[0]} de {combination[1]}'.split())
+            variants.update(' '.join(variant) for phrase in phrases for variant in _plurals(phrase, french=True))
+    return variants
+
+
+class VocabularyTrie:
+    """
+    Arbre de préfixes compact : les nœuds sont des entiers, toutes les arêtes
+    tiennent dans un seul dictionnaire {(nœud, caractère): nœud}, et seuls les
+    nœuds terminaux portent les entrées du terme.
+    """
+
+    def __init__(self):
+        self._edges = {}
+        self._entries = {}  # nœud terminal -> tuple d'entrées
+        self._nodes = 1  # racine : 0
+
+    def add(self, term, entry):
+        node = 0
+        for ch in term:
+            child = self._edges.get((node, ch))
+            if child is None:
+                child = self._edges[(node, ch)] = self._nodes
+                self._nodes += 1
+            node = child
+        entries = self._entries.get(node, ())
+        # Une entrée par ressource : la première étiquette ajoutée est conservée
+        if all(existing[0] != entry[0] for existing in entries):
+            self._entries[node] = entries + (entry,)
+
+    def longest(self, text, start):
+        """(fin, entrées) du plus long terme commençant à `start` et finissant en fin de mot, ou None"""
+        edges = self._edges
+        node = 0
+        best = None
+        position = start
+        length = len(text)
+        while position < length:
+            node = edges.get((node, text[position]))
+            if node is None:
+                break
+            position += 1
+            if node in self._entries and (position == length or text[position] == ' '):
+                best = (position, self._entries[node])
+        return best
+
+    def get(self, term):
+        node = 0
+        for ch in term:
+            node = self._edges.get((node, ch))
+            if node is None:
+                return ()
+        return self._entries.get(node, ())
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nodes(self):
+        return self._nodes
+
+
+class OntologyVocabulary:
+    """
+    Index des termes désignant les classes et propriétés de l'ontologie,
+    construit à partir des données : rdfs:label (et skos:prefLabel/altLabel),
+    noms locaux lisibles (les IRIs webprotege générés sont ignorés, seules
+    leurs étiquettes comptent), traductions françaises et pluriels.
+
+    La recherche ne démarre qu'en début de mot et parcourt l'arbre au plus sur
+    la longueur du plus long terme : le coût est linéaire en la longueur du
+    texte. Les correspondances retenues sont les plus longues, sans
+    chevauchement ("campagne de nettoyage" plutôt que "campagne").
+
+    Reconstruit après une écriture touchant le schéma (déclarations de
+    classes/propriétés, hiérarchie, domaines et portées), et au plus tard
+    après `ttl` secondes (rechargements externes du dataset, étiquettes).
+    Après un échec de chargement, Fuseki n'est réinterrogé qu'au bout de
+    `retry_delay` secondes.
+    """
+
+    # Termes plus courts trop ambigus pour désigner une ressource ("don", "nom", "fin") :
+    # seuls leurs pluriels et les termes composés ("dons", "don financier") sont indexés
+    MIN_TERM_LENGTH = 4
+
+    def __init__(self, utils, ttl=600.0, retry_delay=30.0):
+        self.utils = utils
+        self.ttl = ttl
+        self.retry_delay = retry_delay
+        self._trie = None
+        self._counts = {}
+        self._loaded_at = None
+        self._failed_at = None
+        self._loading = False
+        self._generation = 0
+        self._lock = threading.Lock()
+        utils.add_update_listener(self._on_update)
+
+    def _on_update(self, update_query):
+        # Les écritures d'entités (même avec rdfs:label) ne changent pas le vocabulaire
+        if touches_schema(update_query):
+            self.invalidate()
+
+    def invalidate(self):
+        with self._lock:
+            self._trie = None
+            self._generation += 1
+
+    def _index(self):
+        with self._lock:
+            now = time.monotonic()
+            expired = self._loaded_at is None or now - self._loaded_at > self.ttl
+            if self._trie is not None and (not expired or self._loading):
+                return self._trie
+            # Échec récent : dernier index connu (à défaut, index vide) jusqu'au prochain essai
+            if self._failed_at is not None and now - self._failed_at < self.retry_delay:
+                return self._trie or VocabularyTrie()
+            self._loading = True
+            generation = self._generation
+
+        # Requête et construction hors verrou : les analyses en cours gardent l'index précédent
+        try:
+            trie, counts = self._build(self.utils.execute_raw_query(VOCABULARY_QUERY))
+        except Exception as e:
+            print(f"Erreur chargement vocabulaire de l'ontologie: {str(e)}")
+            with self._lock:
+                self._loading = False
+                self._failed_at = time.monotonic()
+                return self._trie or VocabularyTrie()
+
+        with self._lock:
+            self._loading = False
+            # Schéma modifié pendant le chargement : index servi une fois, mais pas conservé
+            if generation == self._generation:
+                self._trie = trie
+                self._counts = counts
+                self._loaded_at = time.monotonic()
+                self._failed_at = None
+        return trie
+
+    def _build(self, results):
+        """(index, nombre de classes et de propriétés) à partir des résultats de VOCABULARY_QUERY"""
+        labels = {}  # (iri, nature) -> étiquettes
+        for binding in results["results"]["bindings"]:
+            key = (binding['term']['value'], KINDS[binding['kind']['value']])
+            names = labels.setdefault(key, set())
+            if 'label' in binding:
+                names.add(binding['label']['value'])
+
+        trie = VocabularyTrie()
+        for (iri, kind), names in labels.items():
+            # Étiquettes d'abord (triées pour un index reproductible), puis le nom local
+            names = sorted(names)
+            if not iri.startswith(WEBPROTEGE):
+                names.append(re.split(r'[#/]', iri)[-1])
+            for name in names:
+                entry = (iri, qname(iri), kind, name)
+                for term in label_variants(name):
+                    if len(term) >= self.MIN_TERM_LENGTH:
+                        trie.add(term, entry)
+        return trie, {
+            "classes": sum(1 for _, kind in labels if kind == 'class'),
+            "properties": sum(1 for _, kind in labels if kind == 'property'),
+        }
+
+    def find(self, text):
+        """Termes de l'ontologie présents dans le texte, par position croissante (plus longs d'abord, sans chevauchement)"""
+        trie = self._index()
+        normalized, offsets = normalize_with_offsets(text)
+        matches = []
+        position = 0
+        while position < len(normalized):
+            found = None
+            if normalized[position] != ' ' and (position == 0 or normalized[position - 1] == ' '):
+                found = trie.longest(normalized, position)
+            if found is None:
+                position += 1
+                continue
+            end, entries = found
+            span = (offsets[position], offsets[end - 1] + 1)
+            for iri, short_name, kind, label in entries:
+                matches.append(VocabularyMatch(iri, short_name, kind, label, text[span[0]:span[1]], *span))
+            position = end
+        return matches
+
+    def lookup(self, text, kind='class'):
+        """Ressources de la nature donnée dont un terme correspond exactement au texte"""
+        return [VocabularyMatch(iri, short_name, entry_kind, label, text, 0, len(text))
+                for iri, short_name, entry_kind, label in self._index().get(normalize(text or ''))
+                if entry_kind == kind]
+
+    def stats(self):
+        trie = self._trie
+        return {
+            **self._counts,
+            "terms": len(trie) if trie is not None else None,
+            "trie_nodes": trie.nodes if trie is not None else None,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+        }
+
+
+# Instance globale
+ontology_vocabulary = OntologyVocabulary(sparql_utils, ttl=float(os.getenv('ONTOLOGY_VOCABULARY_TTL', '600')))
@@ -0,0 +1,352 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+from class_hierarchy import ECO, class_hierarchy
+
+WEBPROTEGE = 'http://webprotege.stanford.edu/'
+
+PREFIXES = """PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
+PREFIX webprotege: <http://webprotege.stanford.edu/>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>"""
+
+RESULT_LIMIT = 50
+
+# Mots sans incidence sur la requête : tout autre mot non reconnu fait baisser la confiance
+FILLER_WORDS = frozenset("""
+le la les l un une des de du d a au aux en et ou dans sur pour avec ce cet cette ces y il ils elle elles
+est sont t existe existent qui que quel quels quelle quelles tous toutes tout toute liste lister listez
+montre montrer montrez moi affiche afficher affichez donne donner donnez voir trouve trouver trouvez
+cherche chercher recherche rechercher combien nombre total je j veux voudrais aimerais peux pouvez svp merci
+the an of in at on for to and or all every list show me give find search what which who are is there
+how many count number please
+""".split())
+
+COUNT_WORDS = frozenset(('combien', 'nombre', 'total', 'count', 'many'))
+
+# Mots-clés du repli TALN trop vagues pour désigner une classe à eux seuls
+# ("don" apparaît dans "données", "collecte" vaut pour deux types de campagnes...)
+UNRELIABLE_TERMS = frozenset((
+    'don', 'donation', 'collecte', 'information', 'education', 'local', 'place', 'site', 'app',
+    'application', 'social', 'meeting', 'rencontre', 'team', 'equipe', 'personnel', 'staff',
+    'post', 'publication', 'cours', 'course', 'show', 'party',
+))
+
+
+def fold(text):
+    """Minuscules sans accents"""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    return re.findall(r'[a-z0-9]+', fold(text))
+
+
+def _expand(qname):
+    prefix, local = qname.split(':', 1)
+    return (ECO if prefix == 'eco' else WEBPROTEGE) + local
+
+
+# Les dates de début des affectations sont des chaînes "jj/mm/aaaa" (ou des xsd:date dans
+# les données d'origine) : comparaison du jour "aaaa-mm-jj" en texte, une chaîne comparée
+# à NOW() étant une erreur de type qui écarte toutes les lignes
+ASSIGNMENT_DAY = ('IF(CONTAINS(STR(?startDate), "/"), CONCAT(SUBSTR(STR(?startDate), 7, 4), "-", '
+                  'SUBSTR(STR(?startDate), 4, 2), "-", SUBSTR(STR(?startDate), 1, 2)), SUBSTR(STR(?startDate), 1, 10))')
+TODAY = 'SUBSTR(STR(NOW()), 1, 10)'
+
+
+class QueryTemplate:
+    """
+    Gabarit paramétré pour une famille de classes (une classe racine et ses
+    sous-classes reconnues par TALN) :
+
+    - `fields` : (variable, motif) dans l'ordre du SELECT ; les motifs des
+      variables de `required` sont obligatoires, les autres en OPTIONAL
+    - `temporal` : {relative_time TALN: expression FILTER}
+    - `place` : variables texte comparées aux villes mentionnées
+    """
+
+    def __init__(self, name, var, root, classes, fields, required=(), order_by=None, temporal=None, place=()):
+        self.name = name
+        self.var = var
+        self.root = root
+        self.classes = (root,) + tuple(classes)
+        self.fields = tuple(fields)
+        self.required = frozenset(required)
+        self.order_by = order_by
+        self.temporal = temporal or {}
+        self.place = tuple(place)
+
+    def render(self, classes, count=False, relative_time=None, locations=()):
+        values = class_hierarchy.subclass_values(*(_expand(cls) for cls in classes))
+        blocks = [f"?{self.var} a ?{self.var}Class .", f"VALUES ?{self.var}Class {{ {values} }}"]
+
+        filters = []
+        needed = set(self.required)
+        if relative_time:
+            filters.append(self.temporal[relative_time])
+            needed.update(var for var, _ in self.fields if f"?{var}" in self.temporal[relative_time])
+        if locations:
+            text = ', " ", '.join(f'COALESCE(STR(?{var}), "")' for var in self.place)
+            haystack = f'LCASE(CONCAT({text}))' if len(self.place) > 1 else f'LCASE({text})'
+            filters.append(' || '.join(f'CONTAINS({haystack}, {json.dumps(fold(location))})' for location in locations))
+            needed.update(self.place)
+        if not count:
+            needed.update(var for var, _ in self.fields)
+
+        for var, pattern in self.fields:
+            if var in self.required:
+                blocks.append(pattern)
+            elif var in needed:
+                blocks.append(f"OPTIONAL {{ {pattern} }}")
+        blocks.extend(f"FILTER({condition})" for condition in filters)
+
+        body = '\n    '.join(blocks)
+        if count:
+            return f"""{PREFIXES}
+SELECT (COUNT(DISTINCT ?{self.var}) AS ?count)
+WHERE {{
+    {body}
+}}"""
+        variables = ' '.join(f"?{var}" for var in (self.var,) + tuple(var for var, _ in self.fields))
+        return f"""{PREFIXES}
+SELECT DISTINCT {variables}
+WHERE {{
+    {body}
+}}
+ORDER BY ?{self.order_by or self.var}
+LIMIT {RESULT_LIMIT}"""
+
+
+TEMPLATES = (
+    QueryTemplate('events', 'event', 'eco:Event',
+                  ('eco:EducationalEvent', 'eco:EntertainmentEvent', 'eco:CompetitiveEvent', 'eco:SocializationEvent'),
+                  fields=[
+                      ('title', "?event eco:eventTitle ?title ."),
+                      ('date', "?event eco:eventDate ?date ."),
+                      ('description', "?event eco:eventDescription ?description ."),
+                      ('status', "?event eco:eventStatus ?status ."),
+                      ('locationName', "?event eco:isLocatedAt ?location . ?location eco:locationName ?locationName ."),
+                      ('city', "?event eco:isLocatedAt ?location . ?location eco:city ?city ."),
+                      ('address', "?event eco:isLocatedAt ?location . ?location eco:address ?address ."),
+                  ],
+                  required=('title',), order_by='date',
+                  temporal={'future': "BOUND(?date) && ?date >= NOW()", 'past': "BOUND(?date) && ?date < NOW()"},
+                  place=('city', 'locationName', 'address')),
+    QueryTemplate('locations', 'location', 'eco:Location', ('eco:Indoor', 'eco:Outdoor', 'eco:VirtualPlatform'),
+                  fields=[
+                      ('name', "?location eco:locationName ?name ."),
+                      ('city', "?location eco:city ?city ."),
+                      ('address', "?location eco:address ?address ."),
+                      ('capacity', "?location eco:capacity ?capacity ."),
+                      ('price', "?location eco:price ?price ."),
+                  ],
+                  order_by='name', place=('city', 'name', 'address')),
+    QueryTemplate('campaigns', 'campaign', 'eco:Campaign',
+                  ('eco:AwarenessCampaign', 'eco:CleanupCampaign', 'eco:FundingCampaign'),
+                  fields=[
+                      ('name', "?campaign eco:campaignName ?name ."),
+                      ('description', "?campaign eco:campaignDescription ?description ."),
+                      ('status', "?campaign eco:campaignStatus ?status ."),
+                      ('startDate', "?campaign eco:startDate ?startDate ."),
+                      ('endDate', "?campaign eco:endDate ?endDate ."),
+                  ],
+                  required=('name',), order_by='name',
+                  temporal={
+                      'future': "BOUND(?startDate) && ?startDate >= NOW()",
+                      'past': "BOUND(?endDate) && ?endDate < NOW()",
+                      'present': "BOUND(?startDate) && ?startDate <= NOW() && (!BOUND(?endDate) || ?endDate >= NOW())",
+                  }),
+    QueryTemplate('resources', 'resource', 'eco:Resource',
+                  ('eco:DigitalResource', 'eco:EquipmentResource', 'eco:HumanResource'),
+                  fields=[
+                      ('name', "?resource eco:resourceName ?name ."),
+                      ('description', "?resource eco:resourceDescription ?description ."),
+                      ('category', "?resource eco:resourceCategory ?category ."),
+                      ('quantity', "?resource eco:quantityAvailable ?quantity ."),
+                      ('unitCost', "?resource eco:unitCost ?unitCost ."),
+                  ],
+                  required=('name',), order_by='name'),
+    QueryTemplate('volunteers', 'volunteer', 'webprotege:RCXXzqv27uFuX5nYU81XUvw', (),
+                  fields=[
+                      ('label', "?volunteer rdfs:label ?label ."),
+                      ('phone', "?volunteer webprotege:R8BxRbqkCT2nIQCr5UoVlXD ?phone ."),
+                      ('activityLevel', "?volunteer webprotege:RCHqvY6cUdoI8XfAt441VX0 ?activityLevel ."),
+                      ('skills', "?volunteer webprotege:RBqpxvMVBnwM1Wb6OhzTpHf ?skills ."),
+                      ('experience', "?volunteer webprotege:R9tdW5crNU837y5TemwdNfR ?experience ."),
+                  ],
+                  order_by='label'),
+    QueryTemplate('assignments', 'assignment', 'webprotege:Rj2A7xNWLfpNcbE4HJMKqN', (),
+                  fields=[
+                      ('label', "?assignment rdfs:label ?label ."),
+                      ('status', "?assignment webprotege:RDT3XEARggTy1BIBKDXXrmx ?status ."),
+                      ('rating', "?assignment webprotege:RRatingAssignment ?rating ."),
+                      ('startDate', "?assignment webprotege:RD3Wor03BEPInfzUaMNVPC7 ?startDate ."),
+                  ],
+                  order_by='label',
+                  temporal={'future': f"BOUND(?startDate) && {ASSIGNMENT_DAY} >= {TODAY}",
+                            'past': f"BOUND(?startDate) && {ASSIGNMENT_DAY} < {TODAY}"}),
+    QueryTemplate('reservations', 'reservation', 'eco:Reservation', (),
+                  fields=[
+                      ('seatNumber', "?reservation webprotege:R7QgAmvOpBSpwRmRrDZL8VE ?seatNumber ."),
+                      ('status', "?reservation webprotege:R9wdyKGFoajnFCFN4oqnwHr ?status ."),
+                      ('eventTitle', "?reservation webprotege:R8r5yxVXnZfa0TwP5biVHiL ?event . ?event eco:eventTitle ?eventTitle ."),
+                  ],
+                  order_by='seatNumber'),
+    QueryTemplate('blogs', 'blog', 'eco:Blog', (),
+                  fields=[
+                      ('title', "?blog eco:blogTitle ?title ."),
+                      ('category', "?blog eco:category ?category ."),
+                      ('publicationDate', "?blog eco:publicationDate ?publicationDate ."),
+                  ],
+                  order_by='publicationDate'),
+    QueryTemplate('certifications', 'certification', 'eco:Certification', (),
+                  fields=[
+                      ('certificateCode', "?certification webprotege:R9QGoktbkOBbsLkvgjicNA8 ?certificateCode ."),
+                      ('pointsEarned', "?certification webprotege:R9gsGMKtVBKEAd4d8I75UkC ?pointsEarned ."),
+                      ('type', "?certification webprotege:RBPJvon09P5n1GLdLbu2esV ?type ."),
+                  ],
+                  order_by='certificateCode'),
+)
+
+
+class QueryCompiler:
+    """
+    Compilation déterministe d'une analyse TALN (entités, intention,
+    temporal_info, location_info) en SPARQL à partir des gabarits, avant tout
+    appel à Gemini. Chaque terme retenu de l'analyse doit apparaître comme mot
+    entier dans la question ; tout mot restant non couvert par le gabarit
+    (critère non géré, regroupement "par ...", etc.) fait baisser la confiance
+    et la question est alors laissée à Gemini.
+    """
+
+    BASE_CONFIDENCE = 0.9
+    UNKNOWN_WORD_PENALTY = 0.15
+
+    def __init__(self, templates, min_confidence=0.8, enabled=True):
+        self.templates = templates
+        self.min_confidence = min_confidence
+        self.enabled = enabled
+        self._by_class = {cls: template for template in templates for cls in template.classes}
+        self._lock = threading.Lock()
+        self.compiled = 0
+        self.delegated = 0
+        self.delegation_reasons = {}
+        self.template_hits = {}
+
+    @staticmethod
+    def _consume(tokens, term, consumed):
+        """Marque les mots de `term` dans la question (pluriel en s/x admis) ; False s'il n'y figure pas en mots entiers"""
+        words = tokenize(term)
+        if not words:
+            return False
+        found = False
+        for start in range(len(tokens) - len(words) + 1):
+            window = tokens[start:start + len(words)]
+            if window[:-1] == words[:-1] and window[-1] in (words[-1], words[-1] + 's', words[-1] + 'x'):
+                consumed.update(range(start, start + len(words)))
+                found = True
+        return found
+
+    def _analyse(self, analysis):
+        """(gabarit, classes, comptage, relative_time, villes, mots non couverts) ; lève ValueError si non compilable"""
+        question = analysis.get('original_question') or ''
+        tokens = tokenize(question)
+        consumed = set()
+
+        families = {}
+        for entity in analysis.get('entities') or []:
+            template = self._by_class.get(entity.get('ontology_class'))
+            text = entity.get('text') or ''
+            if template is None or fold(text) in UNRELIABLE_TERMS:
+                continue
+            if self._consume(tokens, text, consumed):
+                families.setdefault(template, {}).setdefault(entity['ontology_class'], set()).add(fold(text))
+        if not families:
+            raise ValueError("aucune entité reconnue")
+        if len(families) > 1:
+            raise ValueError("plusieurs types d'entités")
+        template, matched = next(iter(families.items()))
+
+        # Un mot-clé partagé avec la classe racine ("campagne") ne désigne pas une sous-classe
+        root_terms = matched.get(template.root, set())
+        classes = sorted(cls for cls, terms in matched.items() if cls != template.root and terms - root_terms)
+        classes = classes or [template.root]
+
+        temporal = analysis.get('temporal_info') or {}
+        detected = temporal.get('time_expressions') or []
+        expressions = [expression for expression in detected if self._consume(tokens, expression, consumed)]
+        relative_time = None
+        if expressions:
+            # relative_time ne décrit que la dernière expression détectée : une seule est acceptée
+            if len(detected) > 1 or temporal.get('relative_time') not in template.temporal:
+                raise ValueError(f"critère temporel non géré: {', '.join(expressions)}")
+            relative_time = temporal['relative_time']
+
+        locations = [location for location in (analysis.get('location_info') or {}).get('locations') or []
+                     if self._consume(tokens, location, consumed)]
+        if locations and not template.place:
+            raise ValueError("critère de lieu non géré")
+
+        count = any(token in COUNT_WORDS for token in tokens)
+        unknown = [token for position, token in enumerate(tokens)
+                   if position not in consumed and token not in FILLER_WORDS]
+        return template, classes, count, relative_time, locations, unknown
+
+    def compile(self, analysis):
+        """
+        {"accepted", "sparql", "confidence", "template", "reason"} ; "accepted"
+        vaut True si la confiance atteint `min_confidence`, sinon la requête
+        (éventuelle) est à laisser à Gemini.
+        """
+        result = {"accepted": False, "sparql": None, "confidence": 0.0, "template": None, "reason": None}
+        try:
+            if not self.enabled:
+                raise ValueError("compilateur désactivé")
+            template, classes, count, relative_time, locations, unknown = self._analyse(analysis)
+            confidence = max(0.0, self.BASE_CONFIDENCE - self.UNKNOWN_WORD_PENALTY * len(unknown))
+            result.update(
+                sparql=template.render(classes, count=count, relative_time=relative_time, locations=locations),
+                confidence=round(confidence, 2),
+                template=f"{template.name}:count" if count else template.name,
+            )
+            if unknown:
+                result["reason"] = f"mots non couverts: {', '.join(unknown)}"
+            result["accepted"] = confidence >= self.min_confidence
+        except ValueError as e:
+            result["reason"] = str(e)
+
+        with self._lock:
+            if result["accepted"]:
+                self.compiled += 1
+                self.template_hits[result["template"]] = self.template_hits.get(result["template"], 0) + 1
+            else:
+                self.delegated += 1
+                # Motif sans le détail des mots, pour garder un nombre de clés borné
+                reason = (result["reason"] or "confiance insuffisante").split(':')[0]
+                self.delegation_reasons[reason] = self.delegation_reasons.get(reason, 0) + 1
+        return result
+
+    def stats(self):
+        with self._lock:
+            total = self.compiled + self.delegated
+            return {
+                "enabled": self.enabled,
+                "min_confidence": self.min_confidence,
+                "questions": total,
+                "compiled": self.compiled,
+                "delegated_to_gemini": self.delegated,
+                "local_ratio": round(self.compiled / total, 3) if total else None,
+                "templates": dict(self.template_hits),
+                "delegation_reasons": dict(self.delegation_reasons),
+            }
+
+
+# Instance globale
+query_compiler = QueryCompiler(
+    TEMPLATES,
+    min_confidence=float(os.getenv('SEARCH_COMPILER_MIN_CONFIDENCE', '0.8')),
+    enabled=os.getenv('SEARCH_COMPILER_ENABLED', 'true').lower() == 'true',
+)
@@ -1,49 +1,45 @@
 from flask import Blueprint, jsonify, request
 from sparql_utils import sparql_utils
-from modules.gemini_sparql_service import GeminiSPARQLTransformer
+from pagination import ListQuery, list_response
+from modules.services import services
 
 reservations_bp = Blueprint('reservations', __name__)
 
-try:
-    transformer = GeminiSPARQLTransformer()
-except Exception as e:
-    print(f"⚠️ Warning: Gemini not available: {e}")
-    transformer = None
-
-@reservations_bp.route('/reservations', methods=['GET'])
-def get_reservations():
-    """Récupère toutes les réservations"""
-    try:
-        query = """
+RESERVATION_LIST = ListQuery(
+    """
         PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-        PREFIX webprotege: <http://webprotege.stanford.edu/>
-        
-        SELECT ?reservation ?seatNumber ?status ?eventTitle ?userName ?userLastName ?userEmail ?confirmedByName ?confirmedByEmail
-        WHERE {
-            ?reservation a eco:Reservation .
-            OPTIONAL { ?reservation webprotege:R7QgAmvOpBSpwRmRrDZL8VE ?seatNumber . }
-            OPTIONAL { ?reservation webprotege:R9wdyKGFoajnFCFN4oqnwHr ?status . }
-            OPTIONAL { 
+        PREFIX webprotege: <http://webprotege.stanford.edu/>""",
+    key='reservation',
+    select=('reservation', 'seatNumber', 'status', 'eventTitle', 'userName', 'userLastName', 'userEmail',
+            'confirmedByName', 'confirmedByEmail'),
+    where="?reservation a eco:Reservation .",
+    optionals=[
+        (('seatNumber',), "OPTIONAL { ?reservation webprotege:R7QgAmvOpBSpwRmRrDZL8VE ?seatNumber . }"),
+        (('status',), "OPTIONAL { ?reservation webprotege:R9wdyKGFoajnFCFN4oqnwHr ?status . }"),
+        (('eventTitle',), """OPTIONAL { 
                 ?reservation webprotege:R8r5yxVXnZfa0TwP5biVHiL ?event .
                 ?event eco:eventTitle ?eventTitle .
-            }
-            OPTIONAL { 
+            }"""),
+        (('userName', 'userLastName', 'userEmail'), """OPTIONAL { 
                 ?reservation eco:belongsToUser ?user .
                 ?user eco:firstName ?userName .
                 OPTIONAL { ?user eco:lastName ?userLastName . }
                 OPTIONAL { ?user eco:email ?userEmail . }
-            }
-            OPTIONAL { 
+            }"""),
+        (('confirmedByName', 'confirmedByEmail'), """OPTIONAL { 
                 ?reservation eco:confirmedBy ?admin .
                 ?admin eco:firstName ?confirmedByName .
                 OPTIONAL { ?admin eco:email ?confirmedByEmail . }
-            }
-        }
-        ORDER BY ?reservation
-        """
-        
-        results = sparql_utils.execute_query(query)
-        return jsonify(results)
+            }"""),
+    ],
+    order_by=('reservation',),
+)
+
+@reservations_bp.route('/reservations', methods=['GET'])
+def get_reservations():
+    """Récupère toutes les réservations (paramètres optionnels : fields, page_size, cursor)"""
+    try:
+        return list_response(RESERVATION_LIST, request.args)
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -177,6 +173,7 @@ def semantic_search_reservations():
     if not question:
         return jsonify({"error": "Question is required"}), 400
     
+    transformer = services.optional('gemini')
     if not transformer:
         return jsonify({"error": "Gemini service not available"}), 500
     
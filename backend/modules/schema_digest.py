@@ -0,0 +1,370 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from sparql_utils import sparql_utils
+from modules.ontology_vocabulary import PREFIXES, WEBPROTEGE, expand, qname, touches_schema
+
+CLASSES_QUERY = """
+PREFIX owl: <http://www.w3.org/2002/07/owl#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+SELECT ?class ?label ?parent WHERE {
+    ?class a owl:Class .
+    FILTER(isIRI(?class))
+    OPTIONAL { ?class rdfs:label ?label }
+    OPTIONAL { ?class rdfs:subClassOf ?parent . FILTER(isIRI(?parent)) }
+}
+"""
+
+PROPERTIES_QUERY = """
+PREFIX owl: <http://www.w3.org/2002/07/owl#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+SELECT ?property ?kind ?label ?domain ?range WHERE {
+    VALUES ?kind { owl:ObjectProperty owl:DatatypeProperty }
+    ?property a ?kind .
+    FILTER(isIRI(?property))
+    OPTIONAL { ?property rdfs:label ?label }
+    OPTIONAL { ?property rdfs:domain ?domain . FILTER(isIRI(?domain)) }
+    OPTIONAL { ?property rdfs:range ?range . FILTER(isIRI(?range)) }
+}
+"""
+
+# Propriétés sans rdfs:domain (celles de webprotege notamment) : classes des sujets qui les utilisent
+USAGE_DOMAINS_QUERY = """
+PREFIX owl: <http://www.w3.org/2002/07/owl#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+SELECT DISTINCT ?property ?domain WHERE {
+    VALUES ?kind { owl:ObjectProperty owl:DatatypeProperty }
+    ?property a ?kind .
+    FILTER NOT EXISTS { ?property rdfs:domain ?declared }
+    ?subject ?property ?value ;
+             a ?domain .
+    ?domain a owl:Class .
+}
+"""
+
+OBJECT_PROPERTY = 'http://www.w3.org/2002/07/owl#ObjectProperty'
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+
+# Estimation grossière du nombre de tokens d'un texte (anglais, identifiants)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class SchemaDigest:
+    """
+    Résumé du schéma de l'ontologie (classes, sous-classes, propriétés avec
+    domaine et portée) extrait une fois de Fuseki et rendu en section de
+    prompt compacte pour Gemini : les sous-classes ne répètent pas les
+    propriétés héritées, seules les ressources webprotege (IRIs opaques)
+    portent leur étiquette. Les propriétés sans rdfs:domain sont rattachées
+    aux classes des sujets qui les utilisent.
+
+    `section(classes)` limite le résumé aux classes utiles à la question
+    (classes détectées, leurs ancêtres, sous-classes et les classes atteintes
+    par leurs propriétés objet), dans la limite de `token_budget` tokens.
+    Les sections rendues sont mises en cache.
+
+    Rechargé après une écriture touchant le schéma (déclarations de
+    classes/propriétés, hiérarchie, domaines et portées), et au plus tard
+    après `ttl` secondes (rechargements externes du dataset). Les requêtes
+    de chargement s'exécutent hors verrou ; après un échec, Fuseki n'est
+    réinterrogé qu'au bout de `retry_delay` secondes.
+    """
+
+    MAX_RENDERED = 128
+
+    def __init__(self, utils, ttl=600.0, token_budget=2000, retry_delay=30.0):
+        self.utils = utils
+        self.ttl = ttl
+        self.token_budget = token_budget
+        self.retry_delay = retry_delay
+        self._schema = None  # (classes, propriétés, propriétés par classe, propriétés sans domaine)
+        self._loaded_at = None
+        self._failed_at = None
+        self._loading = False
+        self._generation = 0
+        self._fingerprint = None
+        self._rendered = OrderedDict()  # frozenset(classes) ou None -> section
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        utils.add_update_listener(self._on_update)
+
+    def _on_update(self, update_query):
+        # Les écritures d'entités (même avec rdfs:label) ne changent pas le schéma
+        if touches_schema(update_query):
+            self.invalidate()
+
+    def invalidate(self):
+        with self._lock:
+            self._schema = None
+            self._rendered.clear()
+            self._generation += 1
+
+    def _load(self):
+        """Schéma courant (rechargé si expiré), ou None s'il n'a jamais pu être lu"""
+        with self._lock:
+            now = time.monotonic()
+            expired = self._loaded_at is None or now - self._loaded_at > self.ttl
+            if self._schema is not None and (not expired or self._loading):
+                return self._schema
+            # Échec récent : dernier schéma connu (à défaut, section vide) jusqu'au prochain essai
+            if self._failed_at is not None and now - self._failed_at < self.retry_delay:
+                return self._schema
+            self._loading = True
+            generation = self._generation
+
+        # Requêtes hors verrou : les prompts en cours gardent le schéma précédent
+        try:
+            class_rows = self.utils.execute_raw_query(CLASSES_QUERY)["results"]["bindings"]
+            property_rows = self.utils.execute_raw_query(PROPERTIES_QUERY)["results"]["bindings"]
+            usage_rows = self.utils.execute_raw_query(USAGE_DOMAINS_QUERY)["results"]["bindings"]
+            schema, fingerprint = self._build(class_rows, property_rows, usage_rows)
+        except Exception as e:
+            print(f"Erreur chargement schéma de l'ontologie: {str(e)}")
+            with self._lock:
+                self._loading = False
+                self._failed_at = time.monotonic()
+                return self._schema
+
+        with self._lock:
+            self._loading = False
+            # Schéma modifié pendant le chargement : résultat servi une fois, mais pas conservé
+            if generation == self._generation:
+                self._schema = schema
+                self._fingerprint = fingerprint
+                self._loaded_at = time.monotonic()
+                self._failed_at = None
+                self._rendered.clear()
+        return schema
+
+    def _build(self, class_rows, property_rows, usage_rows):
+        """(schéma, empreinte) à partir des résultats des trois requêtes"""
+        classes = {}  # IRI -> {"label", "parents"}
+        for row in class_rows:
+            info = classes.setdefault(row['class']['value'], {"label": None, "parents": set()})
+            if 'label' in row and info["label"] is None:
+                info["label"] = row['label']['value']
+            if 'parent' in row:
+                info["parents"].add(row['parent']['value'])
+
+        properties = {}  # IRI -> {"object", "label", "domains", "ranges"}
+        for row in property_rows:
+            info = properties.setdefault(row['property']['value'], {
+                "object": False, "label": None, "domains": set(), "ranges": set()
+            })
+            info["object"] |= row['kind']['value'] == OBJECT_PROPERTY
+            if 'label' in row and info["label"] is None:
+                info["label"] = row['label']['value']
+            if 'domain' in row:
+                info["domains"].add(row['domain']['value'])
+            if 'range' in row:
+                info["ranges"].add(row['range']['value'])
+
+        used_by = {}
+        for row in usage_rows:
+            used_by.setdefault(row['property']['value'], set()).add(row['domain']['value'])
+        for prop, domains in used_by.items():
+            if prop in properties and not properties[prop]["domains"]:
+                # Classe la plus générale parmi celles des sujets (Volunteer plutôt que ActiveVolunteer)
+                properties[prop]["domains"] = {
+                    domain for domain in domains
+                    if not self._ancestors(classes, domain) & (domains - {domain})
+                }
+
+        by_class = {}
+        unattached = []
+        for prop, info in sorted(properties.items(), key=lambda item: qname(item[0])):
+            if not info["domains"]:
+                unattached.append(prop)
+            for domain in info["domains"]:
+                by_class.setdefault(domain, []).append(prop)
+
+        fingerprint = hashlib.sha256(json.dumps([
+            {cls: [info["label"], sorted(info["parents"])] for cls, info in classes.items()},
+            {prop: [info["object"], info["label"], sorted(info["domains"]), sorted(info["ranges"])]
+             for prop, info in properties.items()},
+        ], sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        return (classes, properties, by_class, unattached), fingerprint
+
+    @staticmethod
+    def _ancestors(classes, class_iri):
+        seen = set()
+        stack = [class_iri]
+        while stack:
+            for parent in classes.get(stack.pop(), {}).get("parents", ()):
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+        return seen
+
+    def _term(self, iri, label):
+        """Nom court, suivi de l'étiquette pour les IRIs opaques de webprotege"""
+        if iri.startswith(WEBPROTEGE) and label:
+            return f'{qname(iri)} "{label}"'
+        return qname(iri)
+
+    def _property_text(self, properties, prop):
+        info = properties[prop]
+        text = self._term(prop, info["label"])
+        ranges = sorted(info["ranges"])
+        if info["object"]:
+            return text + (f" -> {', '.join(qname(r) for r in ranges)}" if ranges else '')
+        datatypes = [r[len(XSD):] for r in ranges if r.startswith(XSD)]
+        return text + (f" ({', '.join(datatypes)})" if datatypes else '')
+
+    def _class_block(self, schema, class_iri, subclasses):
+        """Ligne d'une classe : parents, sous-classes sans propriétés propres, propriétés"""
+        classes, properties, by_class, _ = schema
+        info = classes[class_iri]
+        line = '- ' + self._term(class_iri, info["label"])
+        parents = sorted(parent for parent in info["parents"] if parent in classes)
+        if parents:
+            line += f" ⊑ {', '.join(qname(parent) for parent in parents)}"
+        if subclasses:
+            line += f" [subclasses: {', '.join(self._term(sub, classes[sub]['label']) for sub in subclasses)}]"
+        props = by_class.get(class_iri)
+        if props:
+            line += ': ' + '; '.join(self._property_text(properties, prop) for prop in props)
+        return line
+
+    def _ordered_classes(self, classes):
+        """Classes en profondeur d'abord : chaque classe suivie de ses sous-classes"""
+        children = {}
+        roots = []
+        for cls, info in classes.items():
+            parents = [parent for parent in info["parents"] if parent in classes]
+            for parent in parents:
+                children.setdefault(parent, []).append(cls)
+            if not parents:
+                roots.append(cls)
+        ordered = []
+        seen = set()
+        stack = sorted(roots, key=qname, reverse=True)
+        while stack:
+            cls = stack.pop()
+            if cls in seen:
+                continue
+            seen.add(cls)
+            ordered.append(cls)
+            stack.extend(sorted(children.get(cls, ()), key=qname, reverse=True))
+        return ordered + sorted(set(classes) - seen, key=qname)
+
+    def _relevant(self, schema, focus):
+        """Classes détectées, leurs ancêtres et sous-classes, puis les classes atteintes par leurs propriétés objet"""
+        classes, properties, by_class, _ = schema
+        relevant = set()
+        for cls in focus:
+            relevant |= {cls} | self._ancestors(classes, cls)
+            relevant |= {other for other in classes if cls in self._ancestors(classes, other)}
+        for cls in list(relevant):
+            for prop in by_class.get(cls, ()):
+                if properties[prop]["object"]:
+                    relevant |= properties[prop]["ranges"] & set(classes)
+        return relevant
+
+    def _render(self, schema, focus):
+        classes, properties, by_class, unattached = schema
+        selected = self._ordered_classes(classes)
+        if focus:
+            relevant = self._relevant(schema, focus)
+            selected = [cls for cls in selected if cls in relevant]
+
+        # Sous-classes sans propriété propre ni autre parent : citées sur la ligne du parent
+        folded = {}
+        for cls in selected:
+            parents = [parent for parent in classes[cls]["parents"] if parent in classes]
+            if not by_class.get(cls) and len(parents) == 1 and parents[0] in selected:
+                folded.setdefault(parents[0], []).append(cls)
+        nested = {cls for subclasses in folded.values() for cls in subclasses}
+
+        lines = [f"PREFIX {prefix} <{namespace}>" for namespace, prefix in PREFIXES.items()]
+        lines.append("CLASSES (subclasses inherit the properties of their parents; use webprotege IRIs exactly as written):")
+        budget = self.token_budget - estimate_tokens('\n'.join(lines))
+        omitted = 0
+        for cls in selected:
+            if cls in nested:
+                continue
+            # Classe isolée sans propriété ("eco:li") : rien à apprendre au modèle
+            if not by_class.get(cls) and cls not in folded and not classes[cls]["parents"] & set(classes) \
+                    and not (focus and cls in focus):
+                continue
+            block = self._class_block(schema, cls, folded.get(cls))
+            cost = estimate_tokens(block)
+            if cost > budget:
+                omitted += 1 + len(folded.get(cls, ()))
+                continue
+            lines.append(block)
+            budget -= cost
+        if unattached and not focus:
+            block = "OTHER PROPERTIES: " + '; '.join(self._property_text(properties, prop) for prop in unattached)
+            if estimate_tokens(block) <= budget:
+                lines.append(block)
+        if omitted:
+            lines.append(f"({omitted} more classes omitted)")
+        return '\n'.join(lines)
+
+    def section(self, classes=None):
+        """
+        Section de prompt décrivant le schéma ; limitée aux classes utiles si
+        `classes` (noms courts "eco:Event" ou IRIs) en désigne de connues
+        """
+        schema = self._load()
+        if schema is None:
+            return ''
+        focus = None
+        if classes:
+            iris = {cls if cls in schema[0] else expand(cls) for cls in classes}
+            focus = frozenset(iris & set(schema[0])) or None
+
+        with self._lock:
+            # Les sections en cache sont celles du schéma courant
+            current = schema is self._schema
+            section = self._rendered.get(focus) if current else None
+            if section is not None:
+                self.hits += 1
+                self._rendered.move_to_end(focus)
+                return section
+            self.misses += 1
+            section = self._render(schema, focus)
+            if current:
+                self._rendered[focus] = section
+                if len(self._rendered) > self.MAX_RENDERED:
+                    self._rendered.popitem(last=False)
+            return section
+
+    def fingerprint(self):
+        """Empreinte du schéma courant (change avec lui) ; None s'il n'a jamais pu être lu"""
+        self._load()
+        with self._lock:
+            return self._fingerprint
+
+    def stats(self):
+        with self._lock:
+            schema = self._schema
+            full = self._rendered.get(None)
+            return {
+                "fingerprint": self._fingerprint,
+                "classes": len(schema[0]) if schema is not None else None,
+                "properties": len(schema[1]) if schema is not None else None,
+                "token_budget": self.token_budget,
+                "full_section_tokens": estimate_tokens(full) if full is not None else None,
+                "rendered_sections": len(self._rendered),
+                "hits": self.hits,
+                "misses": self.misses,
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            }
+
+
+# Instance globale
+schema_digest = SchemaDigest(
+    sparql_utils,
+    ttl=float(os.getenv('SCHEMA_DIGEST_TTL', '600')),
+    token_budget=int(os.getenv('GEMINI_SCHEMA_TOKEN_BUDGET', '2000')),
+)
@@ -1,17 +1,159 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from flask import Blueprint, jsonify, request
 from sparql_utils import sparql_utils
-from modules.taln_service import TALNService
-from modules.gemini_sparql_service import GeminiSPARQLTransformer
+from modules.gemini_sparql_service import fallback_query, generated_query_cache
+from modules.ontology_vocabulary import ontology_vocabulary
+from modules.query_compiler import query_compiler
+from modules.schema_digest import schema_digest
+from modules.services import gemini_transformer, services, taln_service
 
 search_bp = Blueprint('search', __name__)
 
-# Initialize services
-taln_service = TALNService()
-gemini_transformer = GeminiSPARQLTransformer()
+SPONSOR_LOOKUP_QUERY = '''PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
+SELECT DISTINCT ?sponsor ?companyName ?donation
+WHERE {
+  ?sponsor a eco:Sponsor .
+  OPTIONAL { ?sponsor eco:companyName ?companyName . }
+  OPTIONAL { ?sponsor eco:makesDonation ?donation . }
+}
+LIMIT 50'''
+
+# Budget (s) au-delà duquel la requête de secours, si elle a abouti, est renvoyée sans attendre Gemini
+LATENCY_BUDGET = float(os.getenv('SEARCH_LATENCY_BUDGET', '8'))
+# Délai (s) avant de lancer la requête de secours : les questions compilées localement n'en ont pas besoin
+SPECULATION_DELAY = float(os.getenv('SEARCH_SPECULATION_DELAY', '0.5'))
+
+# Chaînes principales uniquement : une chaîne perdante continue jusqu'à la réponse de Gemini,
+# la requête de secours s'exécute donc sur le thread de la requête et n'attend jamais ce pool
+_primary_executor = ThreadPoolExecutor(max_workers=int(os.getenv('SEARCH_WORKERS', '8')), thread_name_prefix='search')
+_pipeline_lock = threading.Lock()
+_pipeline_stats = {"requests": 0, "speculations": 0, "wins": {"primary": 0, "fallback": 0}, "budget_exceeded": 0,
+                   "primary_cancelled": 0}
+
+
+def _sponsor_override(question):
+    """Heuristic override: if the user asks "who" (qui) about donations, prefer returning sponsors"""
+    q_lower = question.lower()
+    if 'qui' in q_lower and 'donat' in q_lower:
+        print("DEBUG: Question asks who made donations - overriding to sponsor query")
+        return SPONSOR_LOOKUP_QUERY
+    return None
+
+
+def _primary_branch(question, state):
+    """TALN → compilateur local ou Gemini → SPARQL ; l'analyse TALN est publiée dans `state` dès qu'elle est prête"""
+    started = time.monotonic()
+
+    # Step 1: TALN Analysis - Extract entities, relationships, intent
+    print("📝 Step 1: TALN Analysis...")
+    taln_analysis = taln_service().analyze_question(question)
+    state['taln_analysis'] = taln_analysis
+    print(f"✅ TALN Analysis completed. Entities: {len(taln_analysis.get('entities', []))}")
+
+    # Step 2: SPARQL Generation - local templates first, Gemini only when confidence is too low
+    compiled = query_compiler.compile(taln_analysis)
+    if compiled["accepted"]:
+        print(f"⚡ Step 2: SPARQL compiled locally ({compiled['template']}, confidence {compiled['confidence']})")
+        sparql_query = compiled["sparql"]
+        sparql_source = "compiler"
+    else:
+        print(f"🤖 Step 2: Gemini SPARQL Generation ({compiled['reason']})...")
+        sparql_query = gemini_transformer().transform_taln_analysis_to_sparql(taln_analysis)
+        sparql_source = "gemini"
+
+    if not sparql_query:
+        raise ValueError("Impossible de générer une requête SPARQL")
+    print(f"✅ SPARQL Query generated: {len(sparql_query)} characters")
+    sparql_query = _sponsor_override(question) or sparql_query
+
+    # Step 3: Execute SPARQL Query
+    print("⚡ Step 3: Executing SPARQL Query...")
+    results = sparql_utils.execute_query(sparql_query)
+    print(f"✅ Query executed. Results: {len(results) if results else 0} rows")
+    return {
+        "sparql_query": sparql_query,
+        "results": results,
+        "sparql_source": sparql_source,
+        "compiled": compiled,
+        "elapsed_ms": round((time.monotonic() - started) * 1000),
+    }
+
+
+def _fallback_branch(question):
+    """Requête de secours par mots-clés, exécutée par anticipation pendant l'appel à Gemini"""
+    started = time.monotonic()
+    sparql_query = _sponsor_override(question) or fallback_query(question)
+    results = sparql_utils.execute_query(sparql_query)
+    return {
+        "sparql_query": sparql_query,
+        "results": results,
+        "sparql_source": "fallback",
+        "compiled": None,
+        "elapsed_ms": round((time.monotonic() - started) * 1000),
+    }
+
+
+def _acceptable(future):
+    """Branche terminée sans exception ni erreur SPARQL"""
+    return future.done() and future.exception() is None and isinstance(future.result()["results"], list)
+
+
+def _run_fallback(question):
+    """Requête de secours exécutée sur le thread appelant, résultat (ou exception) sous forme de Future terminé"""
+    future = Future()
+    try:
+        future.set_result(_fallback_branch(question))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def _run_pipeline(question):
+    """
+    Lance la chaîne principale (TALN → compilateur/Gemini → SPARQL) dans le pool
+    dédié et, si elle n'a pas abouti après SPECULATION_DELAY, exécute la requête
+    de secours sur le thread de la requête, qui sinon ne ferait qu'attendre : elle
+    n'est jamais retardée par des chaînes principales encore occupées avec Gemini.
+    La chaîne principale est retenue dès qu'elle aboutit dans LATENCY_BUDGET ;
+    passé ce budget, ou si elle échoue, la requête de secours l'emporte si elle
+    a abouti. Une chaîne principale encore en file d'attente est alors annulée.
+    Retourne (branche gagnante, résultat, analyse TALN si disponible).
+    """
+    state = {}
+    started = time.monotonic()
+    deadline = started + LATENCY_BUDGET
+    primary = _primary_executor.submit(_primary_branch, question, state)
+    wait([primary], timeout=SPECULATION_DELAY)
+
+    fallback = None
+    if not _acceptable(primary):
+        fallback = _run_fallback(question)
+
+    winner = primary
+    if fallback is not None and _acceptable(fallback) and not _acceptable(primary):
+        # La chaîne principale a jusqu'à la fin du budget pour aboutir
+        wait([primary], timeout=max(0.0, deadline - time.monotonic()))
+        if not _acceptable(primary):
+            winner = fallback
+
+    cancelled = winner is fallback and primary.cancel()
+    with _pipeline_lock:
+        _pipeline_stats["requests"] += 1
+        _pipeline_stats["speculations"] += fallback is not None
+        _pipeline_stats["wins"]["primary" if winner is primary else "fallback"] += 1
+        _pipeline_stats["primary_cancelled"] += cancelled
+        if time.monotonic() > deadline:
+            _pipeline_stats["budget_exceeded"] += 1
+    # Sans branche acceptable : résultat (ou exception) de la chaîne principale, attendue jusqu'au bout
+    return ("primary" if winner is primary else "fallback"), winner.result(), state.get('taln_analysis')
+
 
 @search_bp.route('/search', methods=['POST'])
 def semantic_search():
-    """Recherche sémantique - TALN → Gemini → SPARQL pipeline"""
+    """Recherche sémantique - TALN → Gemini → SPARQL pipeline, avec requête de secours anticipée"""
     try:
         data = request.get_json(force=True)
         question = data.get('question', '').strip()
@@ -20,54 +162,32 @@ def semantic_search():
             return jsonify({"error": "Question vide"}), 400
         
         print(f"🔍 Processing question: {question}")
-        
-        # Step 1: TALN Analysis - Extract entities, relationships, intent
-        print("📝 Step 1: TALN Analysis...")
-        taln_analysis = taln_service.analyze_question(question)
-        print(f"✅ TALN Analysis completed. Entities: {len(taln_analysis.get('entities', []))}")
-        
-        # Step 2: Gemini SPARQL Generation - Generate query from TALN analysis
-        print("🤖 Step 2: Gemini SPARQL Generation...")
-        sparql_query = gemini_transformer.transform_taln_analysis_to_sparql(taln_analysis)
-        print(f"✅ SPARQL Query generated: {len(sparql_query)} characters")
-        
-        if not sparql_query:
-            return jsonify({"error": "Impossible de générer une requête SPARQL"}), 400
-
-        # Heuristic override: if the user asks "who" (qui) about donations, prefer returning sponsors
-        q_lower = question.lower()
         try:
-            if 'qui' in q_lower and 'donat' in q_lower:
-                print("DEBUG: Question asks who made donations - overriding to sponsor query")
-                sparql_query = '''PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-SELECT DISTINCT ?sponsor ?companyName ?donation
-WHERE {
-  ?sponsor a eco:Sponsor .
-  OPTIONAL { ?sponsor eco:companyName ?companyName . }
-  OPTIONAL { ?sponsor eco:makesDonation ?donation . }
-}
-LIMIT 50'''
-                print(f"DEBUG: Overridden SPARQL query (sponsor lookup): {sparql_query[:200]}...")
-        except Exception:
-            # If anything goes wrong with the heuristic, continue with original query
-            pass
-        
-        # Step 3: Execute SPARQL Query
-        print("⚡ Step 3: Executing SPARQL Query...")
-        results = sparql_utils.execute_query(sparql_query)
-        print(f"✅ Query executed. Results: {len(results) if results else 0} rows")
+            branch, outcome, taln_analysis = _run_pipeline(question)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        print(f"🏁 Branch used: {branch} ({outcome['elapsed_ms']} ms)")
+
+        results = outcome["results"]
+        compiled = outcome["compiled"] or {}
+        analysis = taln_analysis or {}
         
         # Return comprehensive response
         return jsonify({
             "question": question,
             "taln_analysis": taln_analysis,
-            "sparql_query": sparql_query,
+            "sparql_query": outcome["sparql_query"],
             "results": results,
             "pipeline_info": {
-                "taln_confidence": taln_analysis.get('confidence_scores', {}).get('overall_confidence', 0.0),
-                "entities_detected": len(taln_analysis.get('entities', [])),
-                "intent_classified": taln_analysis.get('intent', {}).get('primary_intent', 'unknown'),
-                "query_length": len(sparql_query),
+                "taln_confidence": analysis.get('confidence_scores', {}).get('overall_confidence', 0.0),
+                "entities_detected": len(analysis.get('entities', [])),
+                "intent_classified": analysis.get('intent', {}).get('primary_intent', 'unknown'),
+                "sparql_source": outcome["sparql_source"],
+                "compiler_confidence": compiled.get("confidence"),
+                "compiler_template": compiled.get("template"),
+                "branch": branch,
+                "branch_elapsed_ms": outcome["elapsed_ms"],
+                "query_length": len(outcome["sparql_query"]),
                 "results_count": len(results) if results else 0
             }
         })
@@ -89,7 +209,7 @@ def ai_search():
         print(f"🤖 AI Search processing: {question}")
         
         # Direct Gemini transformation (fallback method)
-        sparql_query = gemini_transformer.transform_question_to_sparql(question)
+        sparql_query = gemini_transformer().transform_question_to_sparql(question)
         
         if not sparql_query:
             return jsonify({"error": "Impossible de générer une requête SPARQL"}), 400
@@ -137,12 +257,17 @@ def hybrid_search():
         
         # Try TALN + Gemini first
         try:
-            taln_analysis = taln_service.analyze_question(question)
-            sparql_query = gemini_transformer.transform_taln_analysis_to_sparql(taln_analysis)
-            method_used = "taln_gemini"
+            taln_analysis = taln_service().analyze_question(question)
+            compiled = query_compiler.compile(taln_analysis)
+            if compiled["accepted"]:
+                sparql_query = compiled["sparql"]
+                method_used = "taln_compiler"
+            else:
+                sparql_query = gemini_transformer().transform_taln_analysis_to_sparql(taln_analysis)
+                method_used = "taln_gemini"
         except Exception as e:
             print(f"TALN+Gemini failed, falling back to direct Gemini: {e}")
-            sparql_query = gemini_transformer.transform_question_to_sparql(question)
+            sparql_query = gemini_transformer().transform_question_to_sparql(question)
             method_used = "direct_gemini"
             taln_analysis = None
         
@@ -185,3 +310,43 @@ LIMIT 50'''
     except Exception as e:
         print(f"❌ Error in hybrid search: {str(e)}")
         return jsonify({"error": f"Erreur dans la recherche hybride: {str(e)}"}), 500
+
+
+@search_bp.route('/search/compiler/stats', methods=['GET'])
+def compiler_stats():
+    """Part des questions compilées localement (sans appel à Gemini) et motifs de délégation"""
+    return jsonify(query_compiler.stats())
+
+
+@search_bp.route('/search/cache/stats', methods=['GET'])
+def gemini_cache_stats():
+    """État du cache disque des requêtes générées par Gemini"""
+    return jsonify(generated_query_cache.stats())
+
+
+@search_bp.route('/search/vocabulary/stats', methods=['GET'])
+def vocabulary_stats():
+    """Index des termes de l'ontologie utilisé par l'analyse TALN locale"""
+    return jsonify(ontology_vocabulary.stats())
+
+
+@search_bp.route('/search/schema/stats', methods=['GET'])
+def schema_digest_stats():
+    """Résumé du schéma de l'ontologie inséré dans les prompts Gemini (taille, sections en cache)"""
+    return jsonify(schema_digest.stats())
+
+
+@search_bp.route('/search/pipeline/stats', methods=['GET'])
+def pipeline_stats():
+    """Branche retenue par /search (chaîne principale ou requête de secours anticipée)"""
+    with _pipeline_lock:
+        stats = dict(_pipeline_stats, wins=dict(_pipeline_stats["wins"]))
+    stats["latency_budget"] = LATENCY_BUDGET
+    stats["speculation_delay"] = SPECULATION_DELAY
+    return jsonify(stats)
+
+
+@search_bp.route('/search/services', methods=['GET'])
+def services_status():
+    """Services partagés (Gemini, TALN) : initialisés ou non, durée d'initialisation, erreur éventuelle"""
+    return jsonify(services.stats())
@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+
+
+class ServiceRegistry:
+    """
+    Services coûteux à initialiser (client Gemini, TALN), créés au premier usage
+    puis partagés par toutes les routes du processus. Rien n'est construit à
+    l'import : le démarrage et les workers forkés (`gunicorn --preload`) ne
+    paient l'initialisation que s'ils utilisent le service.
+
+    Un échec d'initialisation (clé d'API absente, erreur réseau...) est
+    mémorisé et relevé à chaque appel de `get` ; une nouvelle tentative n'a
+    lieu qu'après `retry_delay` secondes.
+    """
+
+    def __init__(self, retry_delay=30.0):
+        self.retry_delay = retry_delay
+        self._factories = {}
+        self._instances = {}
+        self._errors = {}  # nom -> (exception, instant de l'échec)
+        self._init_seconds = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, factory):
+        self._factories[name] = factory
+
+    def get(self, name):
+        """Instance partagée du service ; lève l'erreur d'initialisation s'il n'est pas disponible"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            if name in self._errors and time.monotonic() - self._errors[name][1] >= self.retry_delay:
+                # Échec ancien (.env absent au premier appel, erreur réseau) : nouvel essai
+                del self._errors[name]
+            if name not in self._instances and name not in self._errors:
+                started = time.perf_counter()
+                try:
+                    self._instances[name] = self._factories[name]()
+                except Exception as e:
+                    print(f"⚠️ Warning: {name} not available: {e}")
+                    self._errors[name] = (e, time.monotonic())
+                self._init_seconds[name] = round(time.perf_counter() - started, 3)
+            if name in self._errors:
+                raise self._errors[name][0]
+            return self._instances[name]
+
+    def optional(self, name):
+        """Instance partagée du service, ou None s'il n'est pas disponible"""
+        try:
+            return self.get(name)
+        except Exception:
+            return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    "initialized": name in self._instances,
+                    "error": str(self._errors[name][0]) if name in self._errors else None,
+                    "init_seconds": self._init_seconds.get(name),
+                }
+                for name in self._factories
+            }
+
+
+def _create_gemini():
+    from modules.gemini_sparql_service import GeminiSPARQLTransformer
+    return GeminiSPARQLTransformer()
+
+
+def _create_taln():
+    from modules.taln_service import TALNService
+    return TALNService()
+
+
+# Instance globale
+services = ServiceRegistry(retry_delay=float(os.getenv('SERVICE_RETRY_DELAY', '30')))
+services.register('gemini', _create_gemini)
+services.register('taln', _create_taln)
+
+
+def gemini_transformer():
+    return services.get('gemini')
+
+
+def taln_service():
+    return services.get('taln')
@@ -1,8 +1,13 @@
-from flask import Blueprint, jsonify, request
-from sparql_utils import sparql_utils
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from sparql_utils import format_binding, sparql_utils
+from sparql_stream import iter_json_array
+from entity_projections import sponsor_projection
+from entity_batch import batch_response, values_clause
 
 sponsors_bp = Blueprint('sponsors', __name__)
 
+SPONSOR_FIELDS = ('nomEntreprise', 'secteur', 'courriel', 'telephone', 'siteWeb', 'niveauDeSponsoring')
+
 
 @sponsors_bp.route('/sponsors', methods=['GET'])
 def get_all_sponsors():
@@ -28,24 +33,16 @@ def get_all_sponsors():
 @sponsors_bp.route('/sponsors/<sponsor_id>', methods=['GET'])
 def get_sponsor(sponsor_id):
     """Récupère un sponsor spécifique"""
-    query = f"""
-    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-    SELECT ?sponsor (?companyName AS ?nomEntreprise) (?industry AS ?secteur) (?contactEmail AS ?courriel) (?phoneNumber AS ?telephone) (?website AS ?siteWeb) (?levelName AS ?niveauDeSponsoring) ?donation
-    WHERE {{
-        <{sponsor_id}> a eco:Sponsor .
-        OPTIONAL {{ <{sponsor_id}> eco:companyName ?companyName }}
-        OPTIONAL {{ <{sponsor_id}> eco:industry ?industry }}
-        OPTIONAL {{ <{sponsor_id}> eco:contactEmail ?contactEmail }}
-        OPTIONAL {{ <{sponsor_id}> eco:phoneNumber ?phoneNumber }}
-        OPTIONAL {{ <{sponsor_id}> eco:website ?website }}
-        OPTIONAL {{ <{sponsor_id}> eco:hasSponsorshipLevel ?level . OPTIONAL {{ ?level eco:levelName ?levelName }} }}
-        OPTIONAL {{ <{sponsor_id}> eco:makesDonation ?donation }}
-    }}
-    """
-    results = sparql_utils.execute_query(query)
+    results = sponsor_projection.rows(SPONSOR_FIELDS + ('donation',), include_key=False, ids=[sponsor_id])
     return jsonify(results[0] if results else {})
 
 
+@sponsors_bp.route('/sponsors/batch', methods=['POST'])
+def get_sponsors_batch():
+    """Récupère plusieurs sponsors en un appel : {"ids": [...]} -> résultats par IRI"""
+    return batch_response(lambda ids: sponsor_projection.lookup(SPONSOR_FIELDS + ('donation',), ids))
+
+
 @sponsors_bp.route('/sponsors/search', methods=['POST'])
 def search_sponsors():
     """Recherche de sponsors par critères"""
@@ -53,31 +50,13 @@ def search_sponsors():
     name = data.get('name', '')
     industry = data.get('industry', '')
 
-    query = """
-    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-    SELECT ?sponsor (?companyName AS ?nomEntreprise) (?industry AS ?secteur) (?contactEmail AS ?courriel) (?phoneNumber AS ?telephone) (?website AS ?siteWeb) (?levelName AS ?niveauDeSponsoring)
-    WHERE {
-        ?sponsor a eco:Sponsor .
-        OPTIONAL { ?sponsor eco:companyName ?companyName }
-        OPTIONAL { ?sponsor eco:industry ?industry }
-        OPTIONAL { ?sponsor eco:contactEmail ?contactEmail }
-        OPTIONAL { ?sponsor eco:phoneNumber ?phoneNumber }
-        OPTIONAL { ?sponsor eco:website ?website }
-        OPTIONAL { ?sponsor eco:hasSponsorshipLevel ?level . OPTIONAL { ?level eco:levelName ?levelName } }
-    """
-
-    filters = []
+    filters = {}
     if name:
-        filters.append(f'REGEX(?companyName, "{name}", "i")')
+        filters['nomEntreprise'] = name
     if industry:
-        filters.append(f'REGEX(?industry, "{industry}", "i")')
-
-    if filters:
-        query += " FILTER(" + " && ".join(filters) + ")"
+        filters['secteur'] = industry
 
-    query += "} ORDER BY ?companyName"
-
-    results = sparql_utils.execute_query(query)
+    results = sponsor_projection.rows(SPONSOR_FIELDS, match=filters, order_by='nomEntreprise')
     return jsonify(results)
 
 
@@ -141,8 +120,16 @@ def get_all_donations():
     {limit_clause}
     """
 
-    results = sparql_utils.execute_query(query)
-    return jsonify(results)
+    # Jusqu'à 1000 donations : les lignes sont sérialisées au fil de la lecture
+    # du flux SPARQL au lieu de construire la liste complète en mémoire
+    try:
+        rows = sparql_utils.iter_query(query)
+    except Exception as e:
+        print(f"Erreur SPARQL: {str(e)}")
+        print(f"Requête: {query}")
+        return jsonify({"error": f"Erreur SPARQL: {str(e)}"})
+    return Response(stream_with_context(iter_json_array(rows, current_app.json.dumps)),
+                    mimetype='application/json')
 
 
 @sponsors_bp.route('/donations/<donation_id>', methods=['GET'])
@@ -165,3 +152,34 @@ def get_donation(donation_id):
     """
     results = sparql_utils.execute_query(query)
     return jsonify(results[0] if results else {})
+
+
+@sponsors_bp.route('/donations/batch', methods=['POST'])
+def get_donations_batch():
+    """Récupère plusieurs donations en une seule requête VALUES : {"ids": [...]} -> résultats par IRI"""
+    def fetch(ids):
+        query = f"""
+    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
+    SELECT ?id ?type (?amount AS ?montant) (?currency AS ?devise) ?date (?donorName AS ?donateur) (?eventTitle AS ?evenement) (?itemDescription AS ?description) (?estimatedValue AS ?valeurEstimee) (?hoursDonated AS ?heuresDonnees)
+    WHERE {{
+        VALUES ?id {{ {values_clause(ids)} }}
+        ?id a ?type .
+        OPTIONAL {{ ?id eco:amount ?amount }}
+        OPTIONAL {{ ?id eco:currency ?currency }}
+        OPTIONAL {{ ?id eco:dateDonated ?date }}
+        OPTIONAL {{ ?id eco:itemDescription ?itemDescription }}
+        OPTIONAL {{ ?id eco:estimatedValue ?estimatedValue }}
+        OPTIONAL {{ ?id eco:hoursDonated ?hoursDonated }}
+        OPTIONAL {{ ?id ^eco:makesDonation ?donor . OPTIONAL {{ ?donor eco:companyName ?donorName }} }}
+        OPTIONAL {{ ?id eco:fundsEvent ?event . OPTIONAL {{ ?event eco:eventTitle ?eventTitle }} }}
+    }}
+    """
+        results = {}
+        for binding in sparql_utils.execute_raw_query(query)["results"]["bindings"]:
+            # Le document peut être partagé par le cache de requêtes : il n'est jamais modifié
+            donation = binding['id']['value']
+            # Comme /donations/<donation_id> : première ligne de chaque donation
+            results.setdefault(donation, format_binding({k: v for k, v in binding.items() if k != 'id'}))
+        return results
+
+    return batch_response(fetch)
@@ -3,6 +3,8 @@ import requests
 import json
 from typing import Dict, List, Optional, Any
 from dotenv import load_dotenv
+from modules.keyword_matcher import KeywordMatcher
+from modules.ontology_vocabulary import ontology_vocabulary
 
 load_dotenv()
 
@@ -12,6 +14,68 @@ class TALNService:
     This service extracts entities, relationships, and semantic information from natural language questions.
     """
     
+    # Keyword tables of the fallback analysis - CORRECTED FROM RDF ANALYSIS
+    ENTITY_KEYWORDS = {
+        # Events (eco: namespace)
+        "eco:Event": ["événement", "event", "évènement", "evenement", "événements", "events", "manifestation", "manifestations"],
+        "eco:EducationalEvent": ["atelier", "ateliers", "workshop", "workshops", "formation", "formations", "training", "trainings", "séminaire", "séminaires", "seminar", "seminars", "conférence", "conférences", "conference", "conferences", "cours", "course", "courses", "éducation", "education"],
+        "eco:EntertainmentEvent": ["festival", "festivals", "fête", "fêtes", "party", "parties", "concert", "concerts", "spectacle", "spectacles", "show", "shows", "divertissement", "entertainment", "loisir", "loisirs", "leisure"],
+        "eco:CompetitiveEvent": ["compétition", "compétitions", "competition", "competitions", "challenge", "challenges", "défi", "défis", "contest", "contests", "tournoi", "tournois", "tournament", "tournaments", "marathon", "marathons"],
+        "eco:SocializationEvent": ["socialisation", "socialization", "réseautage", "networking", "rencontre", "meeting", "social"],
+        
+        # Campaigns (eco: namespace)
+        "eco:Campaign": ["campagne", "campaign", "initiative", "initiatives"],
+        "eco:AwarenessCampaign": ["campagne", "campaign", "sensibilisation", "awareness", "information", "éducation"],
+        "eco:CleanupCampaign": ["nettoyage", "cleanup", "ramassage", "collecte", "déchets", "waste"],
+        "eco:FundingCampaign": ["financement", "funding", "don", "donation", "collecte", "fundraising"],
+        
+        # Locations (eco: namespace)
+        "eco:Location": ["location", "lieu", "endroit", "salle", "place", "venue", "local", "site", "adresse", "address"],
+        "eco:Indoor": ["intérieur", "indoor", "salle", "hall", "auditorium", "salle de conférence"],
+        "eco:Outdoor": ["extérieur", "outdoor", "parc", "park", "jardin", "garden", "plage", "beach"],
+        "eco:VirtualPlatform": ["virtuel", "virtual", "en ligne", "online", "webinaire", "webinar"],
+        
+        # Volunteers (webprotege: namespace)
+        "webprotege:RCXXzqv27uFuX5nYU81XUvw": ["volontaire", "volunteer", "bénévole", "benevole", "volontaires", "volunteers"],
+        
+        # Assignments (webprotege: namespace)
+        "webprotege:Rj2A7xNWLfpNcbE4HJMKqN": ["assignement", "assignment", "assignation", "affectation", "assignements", "assignments"],
+        
+        # Resources (eco: namespace)
+        "eco:Resource": ["ressource", "resource", "équipement", "equipment", "matériel", "material"],
+        "eco:DigitalResource": ["ressource numérique", "digital resource", "logiciel", "software", "application", "app"],
+        "eco:EquipmentResource": ["équipement", "equipment", "outil", "tool", "matériel", "material"],
+        "eco:HumanResource": ["ressource humaine", "human resource", "personnel", "staff", "équipe", "team"],
+        
+        # Reservations (eco: namespace)
+        "eco:Reservation": ["réservation", "reservation", "réserver", "booking", "réservations", "reservations"],
+        
+        # Blogs (eco: namespace)
+        "eco:Blog": ["blog", "article", "publication", "post", "blogs", "articles"],
+        
+        # Certifications (eco: namespace)
+        "eco:Certification": ["certification", "certificat", "diplôme", "diploma", "récompense", "reward", "badge"]
+    }
+
+    TEMPORAL_KEYWORDS = {
+        "future": ["à venir", "futur", "future", "upcoming", "prochain", "demain", "tomorrow"],
+        "past": ["passé", "past", "ancien", "previous", "terminé", "hier", "yesterday"],
+        "present": ["aujourd'hui", "today", "ce jour", "actuel", "current"],
+        "week": ["semaine", "week", "weekend", "week-end"],
+        "month": ["mois", "month"],
+        "year": ["année", "year", "annuel", "annual"]
+    }
+
+    LOCATION_KEYWORDS = ["paris", "london", "new york", "boston", "chicago", "san francisco", "tunis"]
+
+    INTENT_PATTERNS = {
+        "list": ["quelles", "quels", "montre", "liste", "tous", "all", "every"],
+        "count": ["combien", "nombre", "total", "count", "how many"],
+        "filter": ["par", "par type", "par catégorie", "par ville", "par date"],
+        "search": ["recherche", "trouve", "find", "search", "cherche"],
+        "details": ["détails", "informations", "details", "information", "qui", "où", "quand"]
+    }
+
     def __init__(self):
         self.api_key = os.getenv('TALN_API_KEY')
         self.base_url = os.getenv('TALN_API_URL', 'https://api.taln.fr/v1')  # Default TALN API URL
@@ -23,6 +87,14 @@ class TALNService:
         else:
             self.use_fallback = False
             print("SUCCESS: TALN API initialized successfully")
+        
+        # Matcher compiled once for all keyword tables of the local analysis
+        self._matcher = KeywordMatcher({
+            'entity': self.ENTITY_KEYWORDS,
+            'temporal': self.TEMPORAL_KEYWORDS,
+            'location': {location: [location] for location in self.LOCATION_KEYWORDS},
+            'intent': self.INTENT_PATTERNS,
+        })
     
     def analyze_question(self, question: str) -> Dict[str, Any]:
         """
@@ -130,7 +202,7 @@ class TALNService:
                 "confidence": entity.get("confidence", 0.0),
                 "start_pos": entity.get("start"),
                 "end_pos": entity.get("end"),
-                "ontology_class": self._map_to_ontology_class(entity.get("type"))
+                "ontology_class": self._map_to_ontology_class(entity.get("type"), entity.get("text"))
             })
         
         return entities
@@ -207,8 +279,12 @@ class TALNService:
             "intent_classification": taln_result.get("intent_confidence", 0.0)
         }
     
-    def _map_to_ontology_class(self, entity_type: str) -> str:
-        """Map TALN entity types to our ontology classes"""
+    def _map_to_ontology_class(self, entity_type: str, text: Optional[str] = None) -> str:
+        """Map TALN entity types to our ontology classes, preferring a class named by the entity text"""
+        named = ontology_vocabulary.lookup(text) if text else []
+        if named:
+            return named[0].qname
+        
         mapping = {
             "PERSON": "webprotege:User",
             "ORGANIZATION": "webprotege:User",  # Organizations can be users
@@ -236,176 +312,86 @@ class TALNService:
         Uses simple pattern matching and keyword extraction.
         """
         print(f"DEBUG: Starting fallback analysis for: '{question}'")
-        question_lower = question.lower()
         
         # Simple entity extraction using keywords
         entities = []
         relationships = []
         keywords = []
         
-        # Extract entity types based on keywords - CORRECTED FROM RDF ANALYSIS
-        entity_keywords = {
-            # Events (eco: namespace)
-            "eco:Event": ["événement", "event", "évènement", "evenement", "événements", "events", "manifestation", "manifestations"],
-            "eco:EducationalEvent": ["atelier", "ateliers", "workshop", "workshops", "formation", "formations", "training", "trainings", "séminaire", "séminaires", "seminar", "seminars", "conférence", "conférences", "conference", "conferences", "cours", "course", "courses", "éducation", "education"],
-            "eco:EntertainmentEvent": ["festival", "festivals", "fête", "fêtes", "party", "parties", "concert", "concerts", "spectacle", "spectacles", "show", "shows", "divertissement", "entertainment", "loisir", "loisirs", "leisure"],
-            "eco:CompetitiveEvent": ["compétition", "compétitions", "competition", "competitions", "challenge", "challenges", "défi", "défis", "contest", "contests", "tournoi", "tournois", "tournament", "tournaments", "marathon", "marathons"],
-            "eco:SocializationEvent": ["socialisation", "socialization", "réseautage", "networking", "rencontre", "meeting", "social"],
-            
-            # Campaigns (eco: namespace)
-            "eco:Campaign": ["campagne", "campaign", "initiative", "initiatives"],
-            "eco:AwarenessCampaign": ["campagne", "campaign", "sensibilisation", "awareness", "information", "éducation"],
-            "eco:CleanupCampaign": ["nettoyage", "cleanup", "ramassage", "collecte", "déchets", "waste"],
-            "eco:FundingCampaign": ["financement", "funding", "don", "donation", "collecte", "fundraising"],
-            
-            # Locations (eco: namespace)
-            "eco:Location": ["location", "lieu", "endroit", "salle", "place", "venue", "local", "site", "adresse", "address"],
-            "eco:Indoor": ["intérieur", "indoor", "salle", "hall", "auditorium", "salle de conférence"],
-            "eco:Outdoor": ["extérieur", "outdoor", "parc", "park", "jardin", "garden", "plage", "beach"],
-            "eco:VirtualPlatform": ["virtuel", "virtual", "en ligne", "online", "webinaire", "webinar"],
-            
-            # Volunteers (webprotege: namespace)
-            "webprotege:RCXXzqv27uFuX5nYU81XUvw": ["volontaire", "volunteer", "bénévole", "benevole", "volontaires", "volunteers"],
-            
-            # Assignments (webprotege: namespace)
-            "webprotege:Rj2A7xNWLfpNcbE4HJMKqN": ["assignement", "assignment", "assignation", "affectation", "assignements", "assignments"],
-            
-            # Resources (eco: namespace)
-            "eco:Resource": ["ressource", "resource", "équipement", "equipment", "matériel", "material"],
-            "eco:DigitalResource": ["ressource numérique", "digital resource", "logiciel", "software", "application", "app"],
-            "eco:EquipmentResource": ["équipement", "equipment", "outil", "tool", "matériel", "material"],
-            "eco:HumanResource": ["ressource humaine", "human resource", "personnel", "staff", "équipe", "team"],
-            
-            # Reservations (eco: namespace)
-            "eco:Reservation": ["réservation", "reservation", "réserver", "booking", "réservations", "reservations"],
-            
-            # Blogs (eco: namespace)
-            "eco:Blog": ["blog", "article", "publication", "post", "blogs", "articles"],
-            
-            # Certifications (eco: namespace)
-            "eco:Certification": ["certification", "certificat", "diplôme", "diploma", "récompense", "reward", "badge"]
-        }
+        # Single pass over the question for all keyword tables
+        matches = self._matcher.find(question)
         
-        # First pass: exact keyword matching
-        for entity_type, keywords_list in entity_keywords.items():
-            for keyword in keywords_list:
-                if keyword in question_lower:
-                    entities.append({
-                        "text": keyword,
-                        "type": entity_type.split(":")[1],
-                        "category": "domain_entity",
-                        "confidence": 0.8,
-                        "ontology_class": entity_type
-                    })
-                    print(f"DEBUG: Found entity '{keyword}' -> {entity_type}")
-        
-        # Second pass: flexible pattern matching for common cases
-        if not entities:  # Only if no exact matches found
-            # Check for event-related terms
-            event_terms = ["événement", "event", "évènement", "evenement", "événements", "events"]
-            if any(term in question_lower for term in event_terms):
-                entities.append({
-                    "text": "événement",
-                    "type": "Event",
-                    "category": "domain_entity",
-                    "confidence": 0.9,
-                    "ontology_class": "eco:Event"
-                })
-                print(f"DEBUG: Found entity 'événement' -> eco:Event")
-            
-            # Check for volunteer-related terms
-            volunteer_terms = ["volontaire", "volunteer", "bénévole", "benevole"]
-            if any(term in question_lower for term in volunteer_terms):
-                entities.append({
-                    "text": "volontaire",
-                    "type": "Volunteer",
-                    "category": "domain_entity",
-                    "confidence": 0.9,
-                    "ontology_class": "webprotege:RCXXzqv27uFuX5nYU81XUvw"
-                })
-                print(f"DEBUG: Found entity 'volontaire' -> webprotege:RCXXzqv27uFuX5nYU81XUvw")
-            
-            # Check for assignment-related terms
-            assignment_terms = ["assignement", "assignment", "assignation", "affectation"]
-            if any(term in question_lower for term in assignment_terms):
-                entities.append({
-                    "text": "assignement",
-                    "type": "Assignment",
-                    "category": "domain_entity",
-                    "confidence": 0.9,
-                    "ontology_class": "webprotege:Rj2A7xNWLfpNcbE4HJMKqN"
-                })
-                print(f"DEBUG: Found entity 'assignement' -> webprotege:Rj2A7xNWLfpNcbE4HJMKqN")
-            
-            # Check for campaign-related terms
-            campaign_terms = ["campagne", "campaign"]
-            if any(term in question_lower for term in campaign_terms):
-                entities.append({
-                    "text": "campagne",
-                    "type": "Campaign",
-                    "category": "domain_entity",
-                    "confidence": 0.9,
-                    "ontology_class": "eco:Campaign"
+        # Entities: each (class, keyword) pair once, in text order
+        seen_entities = set()
+        for match in matches:
+            if match.table != 'entity' or (match.label, match.keyword) in seen_entities:
+                continue
+            seen_entities.add((match.label, match.keyword))
+            entities.append({
+                "text": match.keyword,
+                "type": match.label.split(":")[1],
+                "category": "domain_entity",
+                "confidence": 0.8,
+                "start_pos": match.start,
+                "end_pos": match.end,
+                "ontology_class": match.label
+            })
+            print(f"DEBUG: Found entity '{match.keyword}' -> {match.label}")
+        
+        # Ontology vocabulary: classes named in the question (labels, local names, French variants)
+        # that the keyword tables above do not know; properties are kept as keywords
+        known_classes = {entity["ontology_class"] for entity in entities}
+        property_keywords = []
+        for match in ontology_vocabulary.find(question):
+            if match.kind == "property":
+                property_keywords.append({
+                    "text": match.term.lower(),
+                    "importance": 0.7,
+                    "category": "ontology_property",
+                    "semantic_type": match.qname
                 })
-                print(f"DEBUG: Found entity 'campagne' -> eco:Campaign")
-            
-            # Check for certification-related terms
-            cert_terms = ["certification", "certificat", "diplôme", "récompense", "badge"]
-            if any(term in question_lower for term in cert_terms):
+            elif match.qname not in known_classes:
+                known_classes.add(match.qname)
                 entities.append({
-                    "text": "certification",
-                    "type": "Certification",
+                    "text": match.term.lower(),
+                    "type": match.qname.split(":")[-1],
                     "category": "domain_entity",
-                    "confidence": 0.9,
-                    "ontology_class": "eco:Certification"
+                    "confidence": 0.7,
+                    "start_pos": match.start,
+                    "end_pos": match.end,
+                    "ontology_class": match.qname
                 })
-                print(f"DEBUG: Found entity 'certification' -> eco:Certification")
+                print(f"DEBUG: Found ontology term '{match.term}' -> {match.qname}")
+        entities.sort(key=lambda entity: entity["start_pos"])
         
         print(f"DEBUG: Total entities found: {len(entities)}")
         
-        # Extract temporal information
-        temporal_keywords = {
-            "future": ["à venir", "futur", "future", "upcoming", "prochain", "demain", "tomorrow"],
-            "past": ["passé", "past", "ancien", "previous", "terminé", "hier", "yesterday"],
-            "present": ["aujourd'hui", "today", "ce jour", "actuel", "current"],
-            "week": ["semaine", "week", "weekend", "week-end"],
-            "month": ["mois", "month"],
-            "year": ["année", "year", "annuel", "annual"]
-        }
+        # Extract temporal information: first listed keyword of each time type, last type wins
+        time_matches = {}
+        for match in matches:
+            if match.table == 'temporal' and (match.label not in time_matches or match.rank < time_matches[match.label].rank):
+                time_matches[match.label] = match
         
         temporal_info = {"time_expressions": [], "relative_time": None}
-        for time_type, keywords_list in temporal_keywords.items():
-            for keyword in keywords_list:
-                if keyword in question_lower:
-                    temporal_info["time_expressions"].append(keyword)
-                    temporal_info["relative_time"] = time_type
-                    break
+        for time_type in self.TEMPORAL_KEYWORDS:
+            if time_type in time_matches:
+                temporal_info["time_expressions"].append(time_matches[time_type].keyword)
+                temporal_info["relative_time"] = time_type
         
         # Extract location information
-        location_keywords = ["paris", "london", "new york", "boston", "chicago", "san francisco", "tunis"]
-        location_info = {"locations": []}
-        for location in location_keywords:
-            if location in question_lower:
-                location_info["locations"].append(location)
-        
-        # Extract intent
-        intent_patterns = {
-            "list": ["quelles", "quels", "montre", "liste", "tous", "all", "every"],
-            "count": ["combien", "nombre", "total", "count", "how many"],
-            "filter": ["par", "par type", "par catégorie", "par ville", "par date"],
-            "search": ["recherche", "trouve", "find", "search", "cherche"],
-            "details": ["détails", "informations", "details", "information", "qui", "où", "quand"]
-        }
+        found_locations = {match.label for match in matches if match.table == 'location'}
+        location_info = {"locations": [location for location in self.LOCATION_KEYWORDS if location in found_locations]}
         
+        # Extract intent: the last intent type (in table order) with a matching keyword
+        found_intents = {match.label for match in matches if match.table == 'intent'}
         intent = {"primary_intent": "unknown", "query_type": "general"}
-        for intent_type, keywords_list in intent_patterns.items():
-            for keyword in keywords_list:
-                if keyword in question_lower:
-                    intent["primary_intent"] = intent_type
-                    intent["query_type"] = intent_type
-                    break
+        for intent_type in self.INTENT_PATTERNS:
+            if intent_type in found_intents:
+                intent["primary_intent"] = intent_type
+                intent["query_type"] = intent_type
         
         # Extract important keywords
+        keywords.extend(property_keywords)
         important_words = question.split()
         for word in important_words:
             if len(word) > 3 and word.lower() not in ["les", "des", "une", "pour", "avec", "dans", "sur"]:
@@ -1,49 +1,49 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from sparql_utils import sparql_utils
+from pagination import ListQuery, list_response
+from entity_projections import user_projection
+from entity_batch import batch_response
 
 users_bp = Blueprint('users', __name__)
 
-@users_bp.route('/users', methods=['GET'])
-def get_all_users():
-    """Récupère tous les utilisateurs"""
-    query = """
-    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-    SELECT ?user ?firstName ?lastName ?email ?phone ?role ?registrationDate
-    WHERE {
+USER_LIST = ListQuery(
+    """
+    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>""",
+    key='user',
+    select=('user', 'firstName', 'lastName', 'email', 'phone', 'role', 'registrationDate'),
+    where="""
         ?user a eco:User ;
               eco:firstName ?firstName ;
               eco:lastName ?lastName ;
               eco:email ?email ;
-              eco:role ?role .
-        
-        OPTIONAL { ?user eco:phone ?phone . }
-        OPTIONAL { ?user eco:registrationDate ?registrationDate . }
-    }
-    ORDER BY ?lastName ?firstName
-    """
-    results = sparql_utils.execute_query(query)
-    return jsonify(results)
+              eco:role ?role .""",
+    optionals=[
+        (('phone',), "OPTIONAL { ?user eco:phone ?phone . }"),
+        (('registrationDate',), "OPTIONAL { ?user eco:registrationDate ?registrationDate . }"),
+    ],
+    order_by=('lastName', 'firstName'),
+)
+
+@users_bp.route('/users', methods=['GET'])
+def get_all_users():
+    """Récupère tous les utilisateurs (paramètres optionnels : fields, page_size, cursor)"""
+    return list_response(USER_LIST, request.args)
 
 @users_bp.route('/users/<user_id>', methods=['GET'])
 def get_user(user_id):
     """Récupère un utilisateur spécifique"""
-    query = f"""
-    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-    SELECT ?user ?firstName ?lastName ?email ?phone ?role ?registrationDate
-    WHERE {{
-        <{user_id}> a eco:User ;
-              eco:firstName ?firstName ;
-              eco:lastName ?lastName ;
-              eco:email ?email ;
-              eco:role ?role .
-        
-        OPTIONAL {{ <{user_id}> eco:phone ?phone . }}
-        OPTIONAL {{ <{user_id}> eco:registrationDate ?registrationDate . }}
-    }}
-    """
-    results = sparql_utils.execute_query(query)
+    results = user_projection.rows(
+        ('firstName', 'lastName', 'email', 'phone', 'role', 'registrationDate'),
+        include_key=False, ids=[user_id], required=('firstName', 'lastName', 'email', 'role'))
     return jsonify(results[0] if results else {})
 
+@users_bp.route('/users/batch', methods=['POST'])
+def get_users_batch():
+    """Récupère plusieurs utilisateurs en un appel : {"ids": [...]} -> résultats par IRI"""
+    return batch_response(lambda ids: user_projection.lookup(
+        ('firstName', 'lastName', 'email', 'phone', 'role', 'registrationDate'), ids,
+        required=('firstName', 'lastName', 'email', 'role')))
+
 @users_bp.route('/users/organizers', methods=['GET'])
 def get_organizers():
     """Récupère les organisateurs d'événements"""
@@ -68,22 +68,7 @@ def get_organizers():
 @users_bp.route('/users/role/<role>', methods=['GET'])
 def get_users_by_role(role):
     """Récupère les utilisateurs par rôle"""
-    query = f"""
-    PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
-    SELECT ?user ?firstName ?lastName ?email ?phone ?registrationDate
-    WHERE {{
-        ?user a eco:User ;
-              eco:firstName ?firstName ;
-              eco:lastName ?lastName ;
-              eco:email ?email ;
-              eco:role ?userRole .
-        
-        OPTIONAL {{ ?user eco:phone ?phone . }}
-        OPTIONAL {{ ?user eco:registrationDate ?registrationDate . }}
-        
-        FILTER(REGEX(?userRole, "{role}", "i"))
-    }}
-    ORDER BY ?lastName ?firstName
-    """
-    results = sparql_utils.execute_query(query)
+    results = user_projection.rows(
+        ('firstName', 'lastName', 'email', 'phone', 'registrationDate'),
+        required=('firstName', 'lastName', 'email'), match={'role': role}, order_by=('lastName', 'firstName'))
     return jsonify(results)
\ No newline at end of file
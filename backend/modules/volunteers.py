@@ -1,57 +1,52 @@
 from flask import Blueprint, jsonify, request
+import re
 from sparql_utils import sparql_utils
+from pagination import ListQuery, list_response
+from entity_projections import volunteer_projection
+from entity_batch import batch_response
 
 volunteers_bp = Blueprint('volunteers', __name__)
 
+VOLUNTEER_FIELDS = ('label', 'user', 'phone', 'medicalConditions', 'motivation', 'experience',
+                    'skills', 'activityLevel', 'generalMotivation')
+
+VOLUNTEER_LIST = ListQuery(
+    """
+    PREFIX webprotege: <http://webprotege.stanford.edu/>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>""",
+    key='volunteer',
+    select=('volunteer',) + VOLUNTEER_FIELDS,
+    where="?volunteer a <http://webprotege.stanford.edu/RCXXzqv27uFuX5nYU81XUvw> .",
+    optionals=[
+        (('label',), "OPTIONAL { ?volunteer rdfs:label ?label . }"),
+        (('user',), "OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?user . }"),
+        (('phone',), "OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R8BxRbqkCT2nIQCr5UoVlXD> ?phone . }"),
+        (('medicalConditions',), "OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R9F95BAS8WtbTv8ZGBaPe42> ?medicalConditions . }"),
+        (('motivation',), "OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R9PW79FzwQKWuQYdTdYlHzN> ?motivation . }"),
+        (('experience',), "OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R9tdW5crNU837y5TemwdNfR> ?experience . }"),
+        (('skills',), "OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RBqpxvMVBnwM1Wb6OhzTpHf> ?skills . }"),
+        (('activityLevel',), "OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RCHqvY6cUdoI8XfAt441VX0> ?activityLevel . }"),
+        (('generalMotivation',), "OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RXzg1eKoCWK7S9zHsFoTFC> ?generalMotivation . }"),
+    ],
+    order_by=('label',),
+)
+
 @volunteers_bp.route('/volunteers', methods=['GET'])
 def get_all_volunteers():
-    """Récupère tous les volontaires"""
-    query = """
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?volunteer ?label ?user ?phone ?medicalConditions ?motivation ?experience ?skills ?activityLevel ?generalMotivation
-    WHERE {
-        ?volunteer a <http://webprotege.stanford.edu/RCXXzqv27uFuX5nYU81XUvw> .
-        
-        OPTIONAL { ?volunteer rdfs:label ?label . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?user . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R8BxRbqkCT2nIQCr5UoVlXD> ?phone . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R9F95BAS8WtbTv8ZGBaPe42> ?medicalConditions . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R9PW79FzwQKWuQYdTdYlHzN> ?motivation . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R9tdW5crNU837y5TemwdNfR> ?experience . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RBqpxvMVBnwM1Wb6OhzTpHf> ?skills . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RCHqvY6cUdoI8XfAt441VX0> ?activityLevel . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RXzg1eKoCWK7S9zHsFoTFC> ?generalMotivation . }
-    }
-    ORDER BY ?label
-    """
-    results = sparql_utils.execute_query(query)
-    return jsonify(results)
+    """Récupère tous les volontaires (paramètres optionnels : fields, page_size, cursor)"""
+    return list_response(VOLUNTEER_LIST, request.args)
 
 @volunteers_bp.route('/volunteers/<volunteer_id>', methods=['GET'])
 def get_volunteer(volunteer_id):
     """Récupère un volontaire spécifique"""
-    query = f"""
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?volunteer ?label ?user ?phone ?medicalConditions ?motivation ?experience ?skills ?activityLevel ?generalMotivation
-    WHERE {{
-        <{volunteer_id}> a <http://webprotege.stanford.edu/RCXXzqv27uFuX5nYU81XUvw> .
-        
-        OPTIONAL {{ <{volunteer_id}> rdfs:label ?label . }}
-        OPTIONAL {{ <{volunteer_id}> <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?user . }}
-        OPTIONAL {{ <{volunteer_id}> <http://webprotege.stanford.edu/R8BxRbqkCT2nIQCr5UoVlXD> ?phone . }}
-        OPTIONAL {{ <{volunteer_id}> <http://webprotege.stanford.edu/R9F95BAS8WtbTv8ZGBaPe42> ?medicalConditions . }}
-        OPTIONAL {{ <{volunteer_id}> <http://webprotege.stanford.edu/R9PW79FzwQKWuQYdTdYlHzN> ?motivation . }}
-        OPTIONAL {{ <{volunteer_id}> <http://webprotege.stanford.edu/R9tdW5crNU837y5TemwdNfR> ?experience . }}
-        OPTIONAL {{ <{volunteer_id}> <http://webprotege.stanford.edu/RBqpxvMVBnwM1Wb6OhzTpHf> ?skills . }}
-        OPTIONAL {{ <{volunteer_id}> <http://webprotege.stanford.edu/RCHqvY6cUdoI8XfAt441VX0> ?activityLevel . }}
-        OPTIONAL {{ <{volunteer_id}> <http://webprotege.stanford.edu/RXzg1eKoCWK7S9zHsFoTFC> ?generalMotivation . }}
-    }}
-    """
-    results = sparql_utils.execute_query(query)
+    results = volunteer_projection.rows(VOLUNTEER_FIELDS, include_key=False, ids=[volunteer_id])
     return jsonify(results[0] if results else {})
 
+@volunteers_bp.route('/volunteers/batch', methods=['POST'])
+def get_volunteers_batch():
+    """Récupère plusieurs volontaires en un appel : {"ids": [...]} -> résultats par IRI"""
+    return batch_response(lambda ids: volunteer_projection.lookup(VOLUNTEER_FIELDS, ids))
+
 @volunteers_bp.route('/volunteers/search', methods=['POST'])
 def search_volunteers():
     """Recherche de volontaires par critères"""
@@ -62,133 +57,47 @@ def search_volunteers():
     activity_level = data.get('activity_level', '')
     medical_conditions = data.get('medical_conditions', '')
     
-    query = """
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?volunteer ?label ?user ?phone ?medicalConditions ?motivation ?experience ?skills ?activityLevel ?generalMotivation
-    WHERE {
-        ?volunteer a <http://webprotege.stanford.edu/RCXXzqv27uFuX5nYU81XUvw> .
-        
-        OPTIONAL { ?volunteer rdfs:label ?label . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?user . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R8BxRbqkCT2nIQCr5UoVlXD> ?phone . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R9F95BAS8WtbTv8ZGBaPe42> ?medicalConditions . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R9PW79FzwQKWuQYdTdYlHzN> ?motivation . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R9tdW5crNU837y5TemwdNfR> ?experience . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RBqpxvMVBnwM1Wb6OhzTpHf> ?skills . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RCHqvY6cUdoI8XfAt441VX0> ?activityLevel . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RXzg1eKoCWK7S9zHsFoTFC> ?generalMotivation . }
-    """
-    
-    filters = []
+    filters = {}
     if skills:
-        filters.append(f'REGEX(?skills, "{skills}", "i")')
+        filters['skills'] = skills
     if activity_level:
-        filters.append(f'REGEX(?activityLevel, "{activity_level}", "i")')
+        filters['activityLevel'] = activity_level
     if medical_conditions:
-        filters.append(f'REGEX(?medicalConditions, "{medical_conditions}", "i")')
-    
-    if filters:
-        query += " FILTER(" + " && ".join(filters) + ")"
+        filters['medicalConditions'] = medical_conditions
     
-    query += "} ORDER BY ?label"
-    
-    results = sparql_utils.execute_query(query)
+    results = volunteer_projection.rows(VOLUNTEER_FIELDS, match=filters, order_by='label')
     return jsonify(results)
 
 @volunteers_bp.route('/volunteers/by-activity-level/<level>', methods=['GET'])
 def get_volunteers_by_activity_level(level):
     """Récupère les volontaires par niveau d'activité"""
-    query = f"""
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?volunteer ?label ?user ?phone ?skills ?activityLevel
-    WHERE {{
-        ?volunteer a <http://webprotege.stanford.edu/RCXXzqv27uFuX5nYU81XUvw> ;
-                  <http://webprotege.stanford.edu/RCHqvY6cUdoI8XfAt441VX0> ?activityLevel .
-        
-        OPTIONAL {{ ?volunteer rdfs:label ?label . }}
-        OPTIONAL {{ ?volunteer <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?user . }}
-        OPTIONAL {{ ?volunteer <http://webprotege.stanford.edu/R8BxRbqkCT2nIQCr5UoVlXD> ?phone . }}
-        OPTIONAL {{ ?volunteer <http://webprotege.stanford.edu/RBqpxvMVBnwM1Wb6OhzTpHf> ?skills . }}
-        
-        FILTER(REGEX(?activityLevel, "{level}", "i"))
-    }}
-    ORDER BY ?label
-    """
-    results = sparql_utils.execute_query(query)
+    results = volunteer_projection.rows(
+        ('label', 'user', 'phone', 'skills', 'activityLevel'),
+        match={'activityLevel': level}, order_by='label')
     return jsonify(results)
 
 @volunteers_bp.route('/volunteers/by-skills/<skill>', methods=['GET'])
 def get_volunteers_by_skills(skill):
     """Récupère les volontaires par compétence"""
-    query = f"""
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?volunteer ?label ?user ?phone ?skills ?activityLevel ?experience
-    WHERE {{
-        ?volunteer a <http://webprotege.stanford.edu/RCXXzqv27uFuX5nYU81XUvw> ;
-                  <http://webprotege.stanford.edu/RBqpxvMVBnwM1Wb6OhzTpHf> ?skills .
-        
-        OPTIONAL {{ ?volunteer rdfs:label ?label . }}
-        OPTIONAL {{ ?volunteer <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?user . }}
-        OPTIONAL {{ ?volunteer <http://webprotege.stanford.edu/R8BxRbqkCT2nIQCr5UoVlXD> ?phone . }}
-        OPTIONAL {{ ?volunteer <http://webprotege.stanford.edu/RCHqvY6cUdoI8XfAt441VX0> ?activityLevel . }}
-        OPTIONAL {{ ?volunteer <http://webprotege.stanford.edu/R9tdW5crNU837y5TemwdNfR> ?experience . }}
-        
-        FILTER(REGEX(?skills, "{skill}", "i"))
-    }}
-    ORDER BY ?label
-    """
-    results = sparql_utils.execute_query(query)
+    results = volunteer_projection.rows(
+        ('label', 'user', 'phone', 'skills', 'activityLevel', 'experience'),
+        match={'skills': skill}, order_by='label')
     return jsonify(results)
 
 @volunteers_bp.route('/volunteers/active', methods=['GET'])
 def get_active_volunteers():
     """Récupère les volontaires actifs"""
-    query = """
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?volunteer ?label ?user ?phone ?skills ?activityLevel ?motivation ?experience
-    WHERE {
-        ?volunteer a <http://webprotege.stanford.edu/RCXXzqv27uFuX5nYU81XUvw> ;
-                  <http://webprotege.stanford.edu/RCHqvY6cUdoI8XfAt441VX0> ?activityLevel .
-        
-        OPTIONAL { ?volunteer rdfs:label ?label . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?user . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R8BxRbqkCT2nIQCr5UoVlXD> ?phone . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RBqpxvMVBnwM1Wb6OhzTpHf> ?skills . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R9PW79FzwQKWuQYdTdYlHzN> ?motivation . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R9tdW5crNU837y5TemwdNfR> ?experience . }
-        
-        FILTER(REGEX(?activityLevel, "actif", "i"))
-    }
-    ORDER BY ?label
-    """
-    results = sparql_utils.execute_query(query)
+    results = volunteer_projection.rows(
+        ('label', 'user', 'phone', 'skills', 'activityLevel', 'motivation', 'experience'),
+        match={'activityLevel': 'actif'}, order_by='label')
     return jsonify(results)
 
 @volunteers_bp.route('/volunteers/experienced', methods=['GET'])
 def get_experienced_volunteers():
     """Récupère les volontaires avec de l'expérience"""
-    query = """
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?volunteer ?label ?user ?phone ?skills ?activityLevel ?experience ?motivation
-    WHERE {
-        ?volunteer a <http://webprotege.stanford.edu/RCXXzqv27uFuX5nYU81XUvw> ;
-                  <http://webprotege.stanford.edu/R9tdW5crNU837y5TemwdNfR> ?experience .
-        
-        OPTIONAL { ?volunteer rdfs:label ?label . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?user . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R8BxRbqkCT2nIQCr5UoVlXD> ?phone . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RBqpxvMVBnwM1Wb6OhzTpHf> ?skills . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RCHqvY6cUdoI8XfAt441VX0> ?activityLevel . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R9PW79FzwQKWuQYdTdYlHzN> ?motivation . }
-    }
-    ORDER BY ?label
-    """
-    results = sparql_utils.execute_query(query)
+    results = volunteer_projection.rows(
+        ('label', 'user', 'phone', 'skills', 'activityLevel', 'experience', 'motivation'),
+        required=('experience',), order_by='label')
     return jsonify(results)
 
 @volunteers_bp.route('/volunteers/statistics', methods=['GET'])
@@ -233,43 +142,26 @@ def advanced_search_volunteers():
     has_medical_conditions = data.get('has_medical_conditions', None)
     motivation_keyword = data.get('motivation_keyword', '')
     
-    query = """
-    PREFIX webprotege: <http://webprotege.stanford.edu/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?volunteer ?label ?user ?phone ?medicalConditions ?motivation ?experience ?skills ?activityLevel ?generalMotivation
-    WHERE {
-        ?volunteer a <http://webprotege.stanford.edu/RCXXzqv27uFuX5nYU81XUvw> .
-        
-        OPTIONAL { ?volunteer rdfs:label ?label . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RBNk0vvVsRh8FjaWPGT0XCO> ?user . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R8BxRbqkCT2nIQCr5UoVlXD> ?phone . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R9F95BAS8WtbTv8ZGBaPe42> ?medicalConditions . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R9PW79FzwQKWuQYdTdYlHzN> ?motivation . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/R9tdW5crNU837y5TemwdNfR> ?experience . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RBqpxvMVBnwM1Wb6OhzTpHf> ?skills . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RCHqvY6cUdoI8XfAt441VX0> ?activityLevel . }
-        OPTIONAL { ?volunteer <http://webprotege.stanford.edu/RXzg1eKoCWK7S9zHsFoTFC> ?generalMotivation . }
-    """
-    
-    filters = []
+    filters = {}
+    required = []
+    conditions = []
     if skills:
-        filters.append(f'REGEX(?skills, "{skills}", "i")')
+        filters['skills'] = skills
     if activity_level:
-        filters.append(f'REGEX(?activityLevel, "{activity_level}", "i")')
+        filters['activityLevel'] = activity_level
     if has_experience:
-        filters.append('BOUND(?experience)')
+        required.append('experience')
     if has_medical_conditions is not None:
         if has_medical_conditions:
-            filters.append('BOUND(?medicalConditions)')
+            required.append('medicalConditions')
         else:
-            filters.append('!BOUND(?medicalConditions)')
+            conditions.append(lambda record: not record.medicalConditions)
     if motivation_keyword:
-        filters.append(f'(REGEX(?motivation, "{motivation_keyword}", "i") || REGEX(?generalMotivation, "{motivation_keyword}", "i"))')
+        conditions.append(lambda record: any(
+            re.search(motivation_keyword, value, re.IGNORECASE)
+            for value in record.motivation + record.generalMotivation))
     
-    if filters:
-        query += " FILTER(" + " && ".join(filters) + ")"
-    
-    query += "} ORDER BY ?label"
-    
-    results = sparql_utils.execute_query(query)
-    return jsonify(results)
+    results = volunteer_projection.rows(
+        VOLUNTEER_FIELDS, match=filters, required=required, order_by='label',
+        where=lambda record: all(condition(record) for condition in conditions))
+    return jsonify(results)
\ No newline at end of file
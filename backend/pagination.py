@@ -0,0 +1,247 @@
+import base64
+import json
+from flask import jsonify
+from sparql_utils import format_binding, sparql_utils
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+
+class PaginationError(ValueError):
+    """Paramètre de pagination invalide (curseur illisible, taille de page, champ inconnu)"""
+
+
+def _term_sparql(term):
+    """Cellule SPARQL JSON -> terme utilisable dans un FILTER"""
+    if term['type'] == 'uri':
+        return f"<{term['value']}>"
+    literal = json.dumps(term['value'], ensure_ascii=False)
+    if 'xml:lang' in term:
+        return f"{literal}@{term['xml:lang']}"
+    if 'datatype' in term:
+        return f"{literal}^^<{term['datatype']}>"
+    return literal
+
+
+def encode_cursor(keys, key_value):
+    payload = json.dumps([keys, key_value], separators=(',', ':'), ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        keys, key_value = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        for term in keys:
+            if term is not None and (term.get('type') not in ('uri', 'literal', 'typed-literal') or 'value' not in term):
+                raise ValueError(term)
+        if not isinstance(key_value, str):
+            raise ValueError(key_value)
+        return keys, key_value
+    except (ValueError, TypeError, AttributeError, UnicodeError):
+        raise PaginationError(f"Curseur invalide: {cursor}")
+
+
+class ListQuery:
+    """
+    Requête de liste décrite par blocs pour la pagination keyset et la
+    projection de champs :
+
+    - `where` : motifs obligatoires (toujours présents, ils filtrent les entités)
+    - `optionals` : liste de (variables, bloc OPTIONAL) ; un bloc n'est gardé que
+      si l'une de ses variables est demandée ou sert au tri
+    - `order_by` : variables de l'ORDER BY existant ; la variable `key` (IRI de
+      l'entité) départage les ex æquo et sert de fin de curseur
+
+    Sans `page_size`, `cursor` ni `fields`, la requête produite est celle d'origine.
+    """
+
+    def __init__(self, prefixes, key, select, where, optionals=(), order_by=(), descending=False):
+        self.prefixes = prefixes
+        self.key = key
+        self.select = tuple(select)
+        self.where = where
+        self.optionals = tuple(optionals)
+        self.order_by = tuple(order_by)
+        self.descending = descending
+
+    def parse_args(self, args):
+        """(champs, taille de page, curseur décodé) depuis les paramètres de la requête HTTP"""
+        fields = None
+        if args.get('fields'):
+            fields = [field.strip() for field in args['fields'].split(',') if field.strip()]
+            unknown = [field for field in fields if field not in self.select]
+            if unknown:
+                raise PaginationError(f"Champs inconnus: {', '.join(unknown)} (disponibles: {', '.join(self.select)})")
+
+        page_size = None
+        if args.get('page_size') or args.get('cursor'):
+            try:
+                page_size = int(args.get('page_size') or DEFAULT_PAGE_SIZE)
+            except ValueError:
+                raise PaginationError(f"page_size invalide: {args.get('page_size')}")
+            if not 1 <= page_size <= MAX_PAGE_SIZE:
+                raise PaginationError(f"page_size doit être compris entre 1 et {MAX_PAGE_SIZE}")
+
+        cursor = decode_cursor(args['cursor']) if args.get('cursor') else None
+        if cursor is not None and len(cursor[0]) != len(self.order_by):
+            raise PaginationError(f"Curseur invalide: {args['cursor']}")
+        return fields, page_size, cursor
+
+    def build(self, fields=None, page_size=None, cursor=None, where_args=(), position=None):
+        """
+        Texte SPARQL pour les champs demandés, éventuellement limité à une page,
+        ou réduit aux lignes d'une position (clés de tri, IRI de l'entité) donnée
+        """
+        paged = page_size is not None or position is not None
+        requested = self.select if fields is None else fields
+        needed = set(requested) | set(self.order_by)
+        if paged:
+            needed.add(self.key)
+        variables = [var for var in self.select if var in needed]
+
+        blocks = [self.where % where_args if where_args else self.where]
+        for block_vars, block in self.optionals:
+            if needed.intersection(block_vars):
+                blocks.append(block)
+        if cursor is not None:
+            blocks.append(f"FILTER({self._keyset_filter(*cursor)})")
+        if position is not None:
+            blocks.append(f"FILTER({self._position_filter(*position)})")
+
+        order = list(self.order_by)
+        if paged and self.key not in order:
+            order.append(self.key)
+        order_clause = ' '.join(f"DESC(?{var})" if self.descending else f"?{var}" for var in order)
+        body = '\n        '.join(block.strip() for block in blocks)
+        query = f"""{self.prefixes}
+    SELECT {' '.join('?' + var for var in variables)}
+    WHERE {{
+        {body}
+    }}
+    """
+        if order:
+            query += f"ORDER BY {order_clause}\n    "
+        if page_size is not None:
+            # Une ligne de plus pour savoir s'il reste une page
+            query += f"LIMIT {page_size + 1}\n    "
+        return query
+
+    def _comparisons(self, keys):
+        """Conditions par clé de tri : (strictement après, égale) à la valeur du curseur"""
+        after, equal = [], []
+        for var, term in zip(self.order_by, keys):
+            if term is None:
+                # Non lié : placé en tête en ordre croissant, en fin en ordre décroissant
+                after.append(f"BOUND(?{var})" if not self.descending else "false")
+                current_equal = f"!BOUND(?{var})"
+            else:
+                value = _term_sparql(term)
+                if term['type'] == 'uri':
+                    # Les opérateurs < et > ne sont pas définis sur les IRIs : comparaison de leur texte
+                    value = json.dumps(term['value'])
+                    current_equal = f"(BOUND(?{var}) && STR(?{var}) = {value})"
+                    var_expr = f"STR(?{var})"
+                else:
+                    current_equal = f"(BOUND(?{var}) && ?{var} = {value})"
+                    var_expr = f"?{var}"
+                if self.descending:
+                    after.append(f"(!BOUND(?{var}) || {var_expr} < {value})")
+                else:
+                    after.append(f"(BOUND(?{var}) && {var_expr} > {value})")
+            equal.append(current_equal)
+        return after, equal
+
+    def _keyset_filter(self, keys, key_value):
+        """Lignes strictement après le curseur dans l'ordre (clés de tri, IRI de l'entité)"""
+        after, equal = self._comparisons(keys)
+        comparison = '<' if self.descending else '>'
+        clauses = []
+        for position, condition in enumerate(after + [f"STR(?{self.key}) {comparison} {json.dumps(key_value)}"]):
+            clauses.append(' && '.join(equal[:position] + [condition]))
+        return ' || '.join(f"({clause})" for clause in clauses)
+
+    def _position_filter(self, keys, key_value):
+        """Lignes exactement à la position du curseur (mêmes clés de tri, même entité)"""
+        _, equal = self._comparisons(keys)
+        return ' && '.join(equal + [f"STR(?{self.key}) = {json.dumps(key_value)}"])
+
+    def _page(self, bindings, page_size, fetch_position):
+        """
+        Coupe à `page_size` lignes sans séparer les lignes d'une même position
+        (clés de tri, IRI de l'entité) ; retourne (lignes, curseur).
+        `fetch_position((clés, IRI))` renvoie toutes les lignes d'une position,
+        pour une position qui dépasse à elle seule la page.
+        """
+        if len(bindings) <= page_size:
+            return bindings, None
+        page = bindings[:page_size]
+        key_of = lambda binding: binding.get(self.key, {}).get('value')
+        position_of = lambda binding: ([binding.get(var) for var in self.order_by], key_of(binding) or '')
+        position = position_of(page[-1])
+        # La dernière position continue sur la page suivante : seules ses lignes sont reportées.
+        # Les lignes de la même entité à des positions antérieures (colonne de tri multivaluée)
+        # restent sur cette page : le curseur ne revient jamais avant elles
+        if position_of(bindings[page_size]) == position:
+            trimmed = [binding for binding in page if position_of(binding) != position]
+            if trimmed:
+                page = trimmed
+            else:
+                # Aucune autre position à garder : la page s'étend jusqu'à la dernière ligne
+                # de cette position, sinon le curseur sauterait les lignes restantes
+                page = fetch_position(position)
+        return page, encode_cursor(*position_of(page[-1]))
+
+    def execute(self, args, where_args=(), raw=False):
+        """
+        Exécute la liste pour les paramètres HTTP `fields`, `page_size` et `cursor`.
+        Sans pagination : la liste de lignes (ou le document SPARQL JSON si `raw`)
+        comme auparavant. Avec : {"items", "next_cursor", "page_size"} (ou le
+        document JSON complété de "next_cursor"). Lève PaginationError, et en
+        mode `raw` les erreurs SPARQL.
+        """
+        fields, page_size, cursor = self.parse_args(args)
+        query = self.build(fields, page_size, cursor, where_args)
+        if page_size is None and not raw:
+            rows = sparql_utils.execute_query(query)
+            if fields is not None and isinstance(rows, list):
+                rows = [{var: value for var, value in row.items() if var in fields} for row in rows]
+            return rows
+
+        def fetch_position(position):
+            query = self.build(fields, where_args=where_args, position=position)
+            return sparql_utils.execute_raw_query(query)["results"]["bindings"]
+
+        try:
+            document = sparql_utils.execute_raw_query(query)
+            if page_size is None and fields is None:
+                return document
+            bindings, next_cursor = document["results"]["bindings"], None
+            if page_size is not None:
+                bindings, next_cursor = self._page(bindings, page_size, fetch_position)
+        except Exception as e:
+            if raw:
+                raise
+            print(f"Erreur SPARQL: {str(e)}")
+            return {"error": f"Erreur SPARQL: {str(e)}"}
+        if fields is not None:
+            bindings = [{var: cell for var, cell in binding.items() if var in fields} for binding in bindings]
+
+        if raw:
+            result = {"head": {"vars": list(fields or self.select)}, "results": {"bindings": bindings}}
+            if page_size is not None:
+                result["next_cursor"] = next_cursor
+            return result
+        return {
+            "items": [format_binding(binding) for binding in bindings],
+            "next_cursor": next_cursor,
+            "page_size": page_size,
+        }
+
+
+def list_response(list_query, args, where_args=()):
+    """Réponse JSON d'une route de liste ; 400 si un paramètre de pagination est invalide"""
+    try:
+        return jsonify(list_query.execute(args, where_args))
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
@@ -0,0 +1,208 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Jetons SPARQL à préserver tels quels lors de la normalisation (littéraux, IRIs),
+# commentaires et blancs à compacter
+_TOKEN_RE = re.compile(
+    r'"(?:[^"\\\n]|\\.)*"'
+    r"|'(?:[^'\\\n]|\\.)*'"
+    r'|<[^<>\s"]*>'
+    r'|#[^\n]*'
+    r'|\s+'
+)
+_PREFIX_DECL_RE = re.compile(r'PREFIX\s+([A-Za-z][\w.-]*)?:\s*<([^<>\s]*)>', re.IGNORECASE)
+_IRI_RE = re.compile(r'<([^<>\s"]*)>')
+_PREFIXED_NAME_RE = re.compile(r'(?<![\w?$:/#.-])([A-Za-z][\w.-]*)?:([A-Za-z_][\w-]*)')
+_A_KEYWORD_RE = re.compile(r'(?<![\w?$:])a(?![\w:])')
+_VARIABLE_RE = re.compile(r'[?$][A-Za-z_]\w*')
+# Motif "sujet ?p objet" : un prédicat variable peut correspondre à n'importe quel triplet
+_VARIABLE_PREDICATE_RE = re.compile(
+    r'(?:[?$]\w+|<[^<>]*>|[\w-]*:[\w-]*|[;\]])\s+[?$]\w+\s+'
+    r'(?:[?$]\w+|<|"|[\w-]*:|[\d+-]|\[|\(|true\b|false\b)'
+)
+# Motif "?x a ?type" : la requête dépend alors de tout rdf:type écrit
+_VARIABLE_TYPE_RE = re.compile(
+    r'(?:(?<![\w?$:])a|rdf:type|<http://www\.w3\.org/1999/02/22-rdf-syntax-ns#type>)\s+[?$]\w+'
+)
+
+RDF_TYPE = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#type'
+
+
+def normalize_query(query):
+    """Clé de cache : blancs compactés et commentaires retirés, littéraux et IRIs intacts"""
+    def _replace(match):
+        token = match.group(0)
+        if token[0] in '"\'<':
+            return token
+        return ' '
+    return _TOKEN_RE.sub(_replace, query).strip()
+
+
+def _strip_literals(text):
+    return re.sub(r'"(?:[^"\\\n]|\\.)*"' r"|'(?:[^'\\\n]|\\.)*'", '""', text)
+
+
+def extract_iris(text):
+    """IRIs (complètes ou préfixées, résolues via les PREFIX) mentionnées dans une requête"""
+    text = _strip_literals(text)
+    prefixes = {prefix or '': namespace for prefix, namespace in _PREFIX_DECL_RE.findall(text)}
+    body = _PREFIX_DECL_RE.sub(' ', text)
+
+    iris = set(_IRI_RE.findall(body))
+    body = _IRI_RE.sub(' ', body)
+    for prefix, local in _PREFIXED_NAME_RE.findall(body):
+        namespace = prefixes.get(prefix or '')
+        if namespace is not None:
+            iris.add(namespace + local)
+    if _A_KEYWORD_RE.search(body):
+        iris.add(RDF_TYPE)
+    return iris
+
+
+def query_dependencies(query):
+    """
+    Ensemble des IRIs dont dépend le résultat d'une requête, ou None si la requête
+    utilise un prédicat variable (elle dépend alors de n'importe quelle écriture).
+    """
+    text = _strip_literals(query)
+    where = text[text.find('{'):] if '{' in text else text
+    if _VARIABLE_PREDICATE_RE.search(where):
+        return None
+    dependencies = extract_iris(query)
+    # Pour un type fixe, l'IRI de la classe suffit à détecter les écritures concernées
+    if not _VARIABLE_TYPE_RE.search(where):
+        dependencies.discard(RDF_TYPE)
+    return frozenset(dependencies)
+
+
+def update_footprint(update_query):
+    """
+    IRIs touchées par une mise à jour. Seules les mises à jour sans variable
+    (INSERT DATA / DELETE DATA) ont une empreinte sûre ; sinon retourne None.
+    """
+    text = _IRI_RE.sub(' ', _strip_literals(update_query))
+    if _VARIABLE_RE.search(text):
+        return None
+    return frozenset(extract_iris(update_query))
+
+
+def _estimate_size(value):
+    """Estimation grossière de l'empreinte mémoire d'un résultat (listes/dicts/chaînes)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += sys.getsizeof(key) + _estimate_size(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += _estimate_size(item)
+    return size
+
+
+class QueryCache:
+    """
+    Cache LRU + TTL des résultats de requêtes SELECT, borné en nombre d'entrées
+    et en mémoire. Invalidé à chaque mise à jour réussie ; en mode fin, seules
+    les entrées dépendant des classes/prédicats touchés sont supprimées.
+    """
+
+    def __init__(self, ttl=60.0, max_entries=512, max_bytes=32 * 1024 * 1024, fine_invalidation=False):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.fine_invalidation = fine_invalidation
+
+        self._entries = OrderedDict()  # clé -> (valeur, expiration, taille, dépendances)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        # Incrémenté à chaque invalidation : un résultat calculé avant une écriture
+        # ne doit pas être mis en cache après celle-ci
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls):
+        """Construit le cache depuis les variables SPARQL_CACHE_* (None si désactivé)"""
+        if os.getenv('SPARQL_CACHE_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+            return None
+        return cls(
+            ttl=float(os.getenv('SPARQL_CACHE_TTL', '60')),
+            max_entries=int(os.getenv('SPARQL_CACHE_MAX_ENTRIES', '512')),
+            max_bytes=int(os.getenv('SPARQL_CACHE_MAX_MB', '32')) * 1024 * 1024,
+            fine_invalidation=os.getenv('SPARQL_CACHE_FINE_INVALIDATION', 'false').lower() in ('1', 'true', 'yes'),
+        )
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] < now:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, generation, query):
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        dependencies = query_dependencies(query) if self.fine_invalidation else None
+        with self._lock:
+            if generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl, size, dependencies)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, update_query=None):
+        """Invalide après une écriture : tout le cache, ou seulement les entrées concernées en mode fin"""
+        footprint = update_footprint(update_query) if (self.fine_invalidation and update_query) else None
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            if footprint is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            stale = [key for key, entry in self._entries.items()
+                     if entry[3] is None or entry[3] & footprint]
+            for key in stale:
+                self._remove(key)
+
+    def clear(self):
+        self.invalidate()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[2]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "fine_invalidation": self.fine_invalidation,
+            }
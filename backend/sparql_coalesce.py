@@ -0,0 +1,70 @@
+import os
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Coalescence des appels identiques simultanés : le premier appelant exécute la
+    requête, ceux qui arrivent pendant son exécution attendent le même résultat
+    (ou la même exception) au lieu d'envoyer un doublon à Fuseki.
+    """
+
+    def __init__(self):
+        self._inflight = {}  # clé -> Future du premier appelant
+        self._lock = threading.Lock()
+
+        self.executed = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_env(cls):
+        """None si SPARQL_COALESCE_ENABLED est désactivé"""
+        if os.getenv('SPARQL_COALESCE_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+            return None
+        return cls()
+
+    def run(self, key, func):
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def forget(self):
+        """
+        Après une écriture : les appels suivants ne rejoignent plus les requêtes
+        lancées avant elle (qui peuvent ignorer la modification).
+        """
+        with self._lock:
+            self._inflight.clear()
+
+    def stats(self):
+        with self._lock:
+            calls = self.executed + self.coalesced
+            return {
+                "in_flight": len(self._inflight),
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "coalesced_ratio": round(self.coalesced / calls, 3) if calls else 0.0,
+            }
@@ -0,0 +1,102 @@
+import csv
+import io
+import re
+
+SPARQL_RESULTS_TSV = 'text/tab-separated-values'
+SPARQL_RESULTS_CSV = 'text/csv'
+
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+
+# Séquences d'échappement Turtle utilisées dans les littéraux TSV
+_ESCAPE_RE = re.compile(r'\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))')
+_ECHARS = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+
+
+def _unescape(text):
+    def _replace(match):
+        code = match.group(1) or match.group(2)
+        if code:
+            return chr(int(code, 16))
+        return _ECHARS.get(match.group(3), match.group(3))
+    return _ESCAPE_RE.sub(_replace, text)
+
+
+def tsv_value(cell):
+    """Valeur lexicale d'un terme TSV (équivalent du champ `value` du format JSON)"""
+    first = cell[0]
+    if first == '<':
+        return cell[1:-1]
+    if first == '"':
+        lexical = cell[1:cell.rindex('"')]
+        return _unescape(lexical) if '\\' in lexical else lexical
+    if cell.startswith('_:'):
+        return cell[2:]
+    # Nombre ou booléen abrégé (syntaxe Turtle)
+    return cell
+
+
+def tsv_term(cell):
+    """Terme TSV typé, sous la même forme qu'une cellule SPARQL JSON"""
+    first = cell[0]
+    if first == '<':
+        return {'type': 'uri', 'value': cell[1:-1]}
+    if first == '"':
+        end = cell.rindex('"')
+        lexical = cell[1:end]
+        term = {'type': 'literal', 'value': _unescape(lexical) if '\\' in lexical else lexical}
+        suffix = cell[end + 1:]
+        if suffix.startswith('@'):
+            term['xml:lang'] = suffix[1:]
+        elif suffix.startswith('^^'):
+            term['datatype'] = suffix[3:-1] if suffix[2] == '<' else suffix[2:]
+        return term
+    if cell.startswith('_:'):
+        return {'type': 'bnode', 'value': cell[2:]}
+    if cell in ('true', 'false'):
+        datatype = XSD + 'boolean'
+    elif 'e' in cell or 'E' in cell:
+        datatype = XSD + 'double'
+    elif '.' in cell:
+        datatype = XSD + 'decimal'
+    else:
+        datatype = XSD + 'integer'
+    return {'type': 'literal', 'value': cell, 'datatype': datatype}
+
+
+def parse_tsv(text, typed=False):
+    """
+    Parse un résultat SELECT au format TSV. Retourne (variables, lignes) ; chaque
+    ligne est un dict variable -> valeur lexicale, ou -> terme typé si `typed`.
+    Les variables non liées sont absentes de la ligne, comme en JSON.
+    """
+    lines = text.split('\n')
+    header = lines[0].rstrip('\r')
+    variables = [name[1:] for name in header.split('\t')] if header else []
+    convert = tsv_term if typed else tsv_value
+
+    rows = []
+    for line in lines[1:]:
+        if not line:
+            continue
+        if line[-1] == '\r':
+            line = line[:-1]
+        row = {}
+        for name, cell in zip(variables, line.split('\t')):
+            if cell:
+                row[name] = convert(cell)
+        rows.append(row)
+    return variables, rows
+
+
+def parse_csv(text):
+    """
+    Parse un résultat SELECT au format CSV (valeurs lexicales uniquement : le format
+    ne distingue pas IRIs et littéraux). Les cellules vides sont traitées comme
+    des variables non liées.
+    """
+    reader = csv.reader(io.StringIO(text))
+    variables = next(reader, [])
+    rows = []
+    for record in reader:
+        rows.append({name: value for name, value in zip(variables, record) if value})
+    return variables, rows
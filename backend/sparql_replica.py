@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from rdflib import BNode, Graph, Literal, URIRef
+from sparql_cache import update_footprint
+
+
+def _term_json(term):
+    """Terme rdflib -> cellule au format SPARQL JSON (comme renvoyé par Fuseki)"""
+    if isinstance(term, URIRef):
+        return {'type': 'uri', 'value': str(term)}
+    if isinstance(term, BNode):
+        return {'type': 'bnode', 'value': str(term)}
+    cell = {'type': 'literal', 'value': str(term)}
+    if isinstance(term, Literal):
+        if term.language:
+            cell['xml:lang'] = term.language
+        elif term.datatype:
+            cell['datatype'] = str(term.datatype)
+    return cell
+
+
+class GraphReplica:
+    """
+    Réplique en lecture du graphe par défaut de Fuseki, chargée dans le processus
+    Flask (store rdflib Memory, indexé SPO/POS/OSP). Les SELECT/ASK sont évalués
+    localement ; les écritures vont toujours à Fuseki et sont rejouées sur la
+    réplique, qui est de plus rechargée périodiquement en arrière-plan pour
+    suivre les modifications externes (scripts/load_data.py).
+
+    Tant que la réplique n'est pas prête, ou si une requête ne peut pas être
+    évaluée localement, query() retourne None et l'appelant interroge Fuseki.
+
+    Seules les mises à jour INSERT DATA / DELETE DATA reçues pendant un
+    rechargement sont rejouées sur l'export : rejouées dans l'ordre, elles
+    donnent le même état que l'export les contienne déjà ou non. Une mise à
+    jour DELETE/INSERT ... WHERE n'a pas cette propriété (compteur, valeur
+    remplacée) : l'export est alors abandonné et un nouveau est demandé.
+    """
+
+    def __init__(self, transport, refresh_interval=300.0):
+        self.transport = transport
+        self.refresh_interval = refresh_interval
+
+        self.graph = None
+        self.loaded_at = None
+        # Le store Memory de rdflib ne supporte pas lectures et écritures concurrentes
+        self._lock = threading.RLock()
+        self._loading = False
+        # Mises à jour reçues pendant un rechargement, rejouées sur la nouvelle version
+        self._replay = None
+
+        self.local_queries = 0
+        self.fallbacks = 0
+        self.reloads = 0
+
+    @classmethod
+    def from_env(cls, transport):
+        """None sauf si SPARQL_REPLICA_ENABLED est activé"""
+        if os.getenv('SPARQL_REPLICA_ENABLED', 'false').lower() not in ('1', 'true', 'yes'):
+            return None
+        return cls(transport, refresh_interval=float(os.getenv('SPARQL_REPLICA_REFRESH', '300')))
+
+    def reload(self):
+        """Recharge la réplique depuis Fuseki ; l'ancienne version reste servie pendant le chargement"""
+        try:
+            with self._lock:
+                self._replay = []
+            graph = Graph(store='Memory')
+            graph.parse(data=self.transport.export().decode('utf-8'), format='nt')
+            with self._lock:
+                if any(update_footprint(update_query) is None for update_query in self._replay):
+                    # Effet inconnu sur l'export (déjà inclus ou non) : la version courante, à
+                    # laquelle la mise à jour a été appliquée, reste servie jusqu'au prochain export
+                    print("Mise à jour DELETE/INSERT WHERE pendant le rechargement de la réplique, nouvel export")
+                    self.loaded_at = None
+                    return
+                # INSERT DATA / DELETE DATA : sans effet si l'export les contenait déjà
+                for update_query in self._replay:
+                    graph.update(update_query)
+                self.graph = graph
+                self.loaded_at = time.monotonic()
+                self.reloads += 1
+            print(f"Réplique SPARQL chargée: {len(graph)} triplets")
+        except Exception as e:
+            print(f"Erreur chargement réplique SPARQL: {str(e)}")
+        finally:
+            with self._lock:
+                self._replay = None
+            self._loading = False
+
+    def _refresh_if_needed(self):
+        stale = self.loaded_at is None or time.monotonic() - self.loaded_at > self.refresh_interval
+        if stale and not self._loading:
+            with self._lock:
+                if self._loading:
+                    return
+                self._loading = True
+            threading.Thread(target=self.reload, name='sparql-replica', daemon=True).start()
+
+    def query(self, query):
+        """Document SPARQL JSON d'un SELECT/ASK évalué localement, ou None (requête à envoyer à Fuseki)"""
+        self._refresh_if_needed()
+        graph = self.graph
+        if graph is None:
+            self.fallbacks += 1
+            return None
+        try:
+            with self._lock:
+                result = graph.query(query)
+                if result.type == 'ASK':
+                    document = {'head': {}, 'boolean': bool(result.askAnswer)}
+                elif result.type == 'SELECT':
+                    variables = [str(var) for var in result.vars]
+                    document = {
+                        'head': {'vars': variables},
+                        'results': {'bindings': [
+                            {name: _term_json(term) for name, term in zip(variables, row) if term is not None}
+                            for row in result
+                        ]},
+                    }
+                else:
+                    document = None
+        except Exception as e:
+            print(f"Requête non évaluable par la réplique, envoyée à Fuseki: {str(e)}")
+            document = None
+
+        if document is None:
+            self.fallbacks += 1
+        else:
+            self.local_queries += 1
+        return document
+
+    def apply_update(self, update_query):
+        """Rejoue sur la réplique une mise à jour déjà acceptée par Fuseki"""
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append(update_query)
+        if self.graph is None:
+            return
+        try:
+            with self._lock:
+                self.graph.update(update_query)
+        except Exception as e:
+            # Réplique divergente : on la remplace par un rechargement complet
+            print(f"Mise à jour non rejouable sur la réplique, rechargement: {str(e)}")
+            with self._lock:
+                self.graph = None
+                self.loaded_at = None
+            self._refresh_if_needed()
+
+    def stats(self):
+        graph = self.graph
+        return {
+            "ready": graph is not None,
+            "triples": len(graph) if graph is not None else 0,
+            "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self.loaded_at else None,
+            "local_queries": self.local_queries,
+            "fallbacks": self.fallbacks,
+            "reloads": self.reloads,
+        }
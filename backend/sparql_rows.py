@@ -0,0 +1,147 @@
+import sys
+from datetime import date, datetime, time
+
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+
+_INTEGER_TYPES = frozenset(XSD + name for name in (
+    'integer', 'int', 'long', 'short', 'byte',
+    'nonNegativeInteger', 'positiveInteger', 'nonPositiveInteger', 'negativeInteger',
+    'unsignedLong', 'unsignedInt', 'unsignedShort', 'unsignedByte',
+))
+_FLOAT_TYPES = frozenset(XSD + name for name in ('decimal', 'double', 'float'))
+
+
+class IRI(str):
+    """
+    IRI complète, utilisable comme une chaîne. Le nom local (après '#' ou '/')
+    n'est calculé qu'à l'accès, au lieu d'être découpé pour chaque cellule.
+    """
+    __slots__ = ()
+
+    @property
+    def local(self):
+        if '#' in self:
+            return self.rsplit('#', 1)[-1]
+        if '/' in self:
+            return self.rsplit('/', 1)[-1]
+        return str(self)
+
+
+def _parse_datetime(lexical):
+    # fromisoformat n'accepte 'Z' qu'à partir de Python 3.11
+    if lexical.endswith('Z'):
+        lexical = lexical[:-1] + '+00:00'
+    return datetime.fromisoformat(lexical)
+
+
+def _parse_date(lexical):
+    # Un fuseau éventuel (2024-05-01Z, 2024-05-01+02:00) est ignoré
+    return date.fromisoformat(lexical[:10])
+
+
+def _parse_boolean(lexical):
+    return lexical in ('true', '1')
+
+
+_CONVERTERS = {XSD + 'boolean': _parse_boolean, XSD + 'date': _parse_date,
+               XSD + 'dateTime': _parse_datetime, XSD + 'time': time.fromisoformat}
+_CONVERTERS.update(dict.fromkeys(_INTEGER_TYPES, int))
+_CONVERTERS.update(dict.fromkeys(_FLOAT_TYPES, float))
+
+
+def term_value(term):
+    """Convertit un terme SPARQL JSON en valeur Python (IRI, int, float, bool, date, str)"""
+    kind = term.get('type')
+    value = term.get('value')
+    if kind == 'uri':
+        return IRI(value)
+    if kind == 'bnode':
+        return '_:' + value
+    converter = _CONVERTERS.get(term.get('datatype'))
+    if converter is not None:
+        try:
+            return converter(value)
+        except ValueError:
+            pass
+    return value
+
+
+class Columns:
+    """En-tête partagé par toutes les lignes d'un résultat : noms et positions des variables"""
+    __slots__ = ('names', 'index')
+
+    def __init__(self, names):
+        self.names = tuple(names)
+        self.index = {name: position for position, name in enumerate(self.names)}
+
+
+class Row:
+    """
+    Ligne de résultat compacte : un tuple de valeurs typées indexé par l'en-tête
+    partagé. Les variables non liées valent None et sont absentes de `keys()`.
+    """
+    __slots__ = ('columns', 'values')
+
+    def __init__(self, columns, values):
+        self.columns = columns
+        self.values = values
+
+    @classmethod
+    def from_binding(cls, columns, binding):
+        return cls(columns, tuple(
+            term_value(binding[name]) if name in binding else None for name in columns.names
+        ))
+
+    def __getitem__(self, name):
+        value = self.values[self.columns.index[name]]
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name):
+        position = self.columns.index.get(name)
+        return position is not None and self.values[position] is not None
+
+    def get(self, name, default=None):
+        position = self.columns.index.get(name)
+        if position is None:
+            return default
+        value = self.values[position]
+        return default if value is None else value
+
+    def keys(self):
+        return [name for name, value in zip(self.columns.names, self.values) if value is not None]
+
+    def items(self):
+        return [(name, value) for name, value in zip(self.columns.names, self.values) if value is not None]
+
+    def to_dict(self, shorten=True):
+        """Dict sérialisable en JSON : IRIs réduites à leur nom local (si `shorten`), dates en ISO 8601"""
+        result = {}
+        for name, value in self.items():
+            if isinstance(value, IRI):
+                value = value.local if shorten else str(value)
+            elif isinstance(value, (date, time)):
+                value = value.isoformat()
+            result[name] = value
+        return result
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sys.getsizeof(self.values) + sum(
+            sys.getsizeof(value) for value in self.values if value is not None)
+
+    def __eq__(self, other):
+        if isinstance(other, Row):
+            return self.items() == other.items()
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Row({dict(self.items())!r})"
+
+
+def build_rows(variables, bindings):
+    """Construit les lignes typées d'un résultat à partir de ses bindings (JSON ou TSV typé)"""
+    columns = Columns(variables)
+    return [Row.from_binding(columns, binding) for binding in bindings]
@@ -0,0 +1,79 @@
+import codecs
+import json
+import re
+
+_BINDINGS_START_RE = re.compile(r'"bindings"\s*:\s*\[')
+_SEPARATORS = ' \t\r\n,'
+# Au-delà, la partie déjà consommée du tampon est libérée
+_COMPACT_THRESHOLD = 1 << 16
+
+_decoder = json.JSONDecoder()
+
+
+def iter_json_bindings(chunks):
+    """
+    Décode au fil de l'eau le tableau results.bindings d'un document SPARQL JSON.
+    `chunks` est un itérable de blocs d'octets ; chaque binding est produit dès
+    qu'il est complet, sans jamais matérialiser le document entier.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buffer = ''
+
+    # Début du tableau des bindings
+    while True:
+        match = _BINDINGS_START_RE.search(buffer)
+        if match:
+            buffer = buffer[match.end():]
+            break
+        chunk = next(chunks, None)
+        if chunk is None:
+            # Document sans bindings (ASK, résultat vide mal formé...)
+            return
+        buffer += decoder.decode(chunk)
+
+    position = 0
+    while True:
+        # Sauter blancs et virgules entre deux bindings
+        while position < len(buffer) and buffer[position] in _SEPARATORS:
+            position += 1
+        if position >= len(buffer):
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise ValueError("Document SPARQL JSON tronqué")
+            buffer = buffer[position:] + decoder.decode(chunk)
+            position = 0
+            continue
+
+        if buffer[position] == ']':
+            return
+
+        try:
+            binding, end = _decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # Binding incomplet : lire la suite du flux
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise
+            buffer = buffer[position:] + decoder.decode(chunk)
+            position = 0
+            continue
+
+        yield binding
+        position = end
+        if position > _COMPACT_THRESHOLD:
+            buffer = buffer[position:]
+            position = 0
+
+
+def iter_json_array(items, dumps=json.dumps):
+    """Sérialise un itérable en tableau JSON, élément par élément (pour une réponse en streaming)"""
+    yield '['
+    first = True
+    for item in items:
+        if first:
+            first = False
+            yield dumps(item)
+        else:
+            yield ',' + dumps(item)
+    yield ']'
@@ -0,0 +1,99 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+SPARQL_RESULTS_JSON = 'application/sparql-results+json'
+
+
+class SPARQLTransportError(Exception):
+    """Erreur HTTP renvoyée par Fuseki (requête mal formée, endpoint absent, ...)."""
+
+    def __init__(self, status_code, message):
+        super().__init__(f"HTTP {status_code}: {message}")
+        self.status_code = status_code
+
+
+class SPARQLTransport:
+    """
+    Transport HTTP vers les endpoints /query et /update de Fuseki.
+    Les connexions keep-alive sont réutilisées via un pool borné : au-delà de
+    `pool_size` requêtes simultanées, les appelants attendent une connexion libre.
+
+    Aucun état propre à une requête n'est stocké sur l'instance : chaque thread
+    obtient sa propre `requests.Session`, toutes montées sur le même adaptateur
+    (dont le pool urllib3 est thread-safe).
+    """
+
+    def __init__(self, endpoint, pool_size=None, connect_timeout=None, read_timeout=None, gzip=None):
+        self.endpoint = endpoint.rstrip('/')
+        self.query_url = self.endpoint + '/query'
+        self.update_url = self.endpoint + '/update'
+        self.data_url = self.endpoint + '/data'
+
+        self.pool_size = int(pool_size or os.getenv('SPARQL_POOL_SIZE', '10'))
+        self.timeout = (
+            float(connect_timeout or os.getenv('SPARQL_CONNECT_TIMEOUT', '3')),
+            float(read_timeout or os.getenv('SPARQL_READ_TIMEOUT', '30')),
+        )
+        if gzip is None:
+            gzip = os.getenv('SPARQL_GZIP', 'true').lower() in ('1', 'true', 'yes')
+        self.gzip = gzip
+
+        # Un seul hôte (Fuseki) : un pool par schéma suffit
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        """Session HTTP du thread courant, partageant le pool de connexions"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+            session.headers['Accept-Encoding'] = 'gzip, deflate' if self.gzip else 'identity'
+            self._local.session = session
+        return session
+
+    def query(self, query, accept=SPARQL_RESULTS_JSON):
+        """Envoie une requête SELECT/ASK et retourne le document JSON décodé"""
+        response = self._post(self.query_url, {'query': query}, accept)
+        return response.json()
+
+    def query_text(self, query, accept):
+        """Envoie une requête SELECT dans un format texte (TSV, CSV) et retourne le corps décodé"""
+        response = self._post(self.query_url, {'query': query}, accept)
+        # text/csv n'annonce pas toujours de charset : les formats SPARQL sont en UTF-8
+        return response.content.decode('utf-8')
+
+    def query_stream(self, query, accept=SPARQL_RESULTS_JSON):
+        """
+        Envoie une requête SELECT et retourne la réponse HTTP sans lire le corps.
+        L'appelant doit fermer la réponse pour rendre la connexion au pool.
+        """
+        return self._post(self.query_url, {'query': query}, accept, stream=True)
+
+    def update(self, update_query):
+        """Envoie une requête SPARQL Update (INSERT/DELETE)"""
+        self._post(self.update_url, {'update': update_query})
+
+    def export(self, accept='application/n-triples'):
+        """Contenu du graphe par défaut (Graph Store Protocol), en octets"""
+        response = self.session.get(self.data_url, params={'default': ''},
+                                    headers={'Accept': accept}, timeout=self.timeout)
+        if response.status_code >= 400:
+            raise SPARQLTransportError(response.status_code, response.text.strip()[:500])
+        return response.content
+
+    def _post(self, url, data, accept=None, stream=False):
+        headers = {'Accept': accept} if accept else None
+        response = self.session.post(url, data=data, headers=headers, timeout=self.timeout, stream=stream)
+        if response.status_code >= 400:
+            message = response.text.strip()[:500]
+            response.close()
+            raise SPARQLTransportError(response.status_code, message)
+        return response
+
+    def close(self):
+        self.adapter.close()
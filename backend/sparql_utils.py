@@ -1,58 +1,246 @@
-from SPARQLWrapper import SPARQLWrapper, JSON, POST
-
-from SPARQLWrapper import SPARQLWrapper, JSON
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from sparql_transport import SPARQLTransport
+from sparql_cache import QueryCache, normalize_query
+from sparql_coalesce import SingleFlight
+from sparql_stream import iter_json_bindings
+from sparql_formats import SPARQL_RESULTS_CSV, SPARQL_RESULTS_TSV, parse_csv, parse_tsv
+from sparql_rows import build_rows
+from sparql_replica import GraphReplica
 
 load_dotenv()
 
+# Taille des blocs lus sur le flux HTTP lors du parsing incrémental
+STREAM_CHUNK_SIZE = 64 * 1024
+
+RESULT_FORMATS = ('json', 'tsv', 'csv')
+
+
+def clean_value(value):
+    """Nettoie les URLs pour un affichage plus lisible (nom local après '#' ou '/')"""
+    if '#' in value:
+        return value.split('#')[-1]
+    if '/' in value:
+        return value.split('/')[-1]
+    return value
+
+
+def format_binding(binding):
+    """Formate un binding SPARQL : valeurs seules, URLs réduites à leur nom local"""
+    formatted_result = {}
+    for key, value in binding.items():
+        if 'value' in value:
+            formatted_result[key] = clean_value(value['value'])
+    return formatted_result
+
+
 class SPARQLUtils:
     def __init__(self):
         self.endpoint = os.getenv('FUSEKI_ENDPOINT', 'http://localhost:3030/eco-ontology')
-        self.sparql = SPARQLWrapper(self.endpoint + "/query")
-        self.sparql.setReturnFormat(JSON)
-    
-    def execute_query(self, query):
-        """Exécute une requête SPARQL et retourne les résultats"""
+        self.transport = SPARQLTransport(self.endpoint)
+        self.cache = QueryCache.from_env()
+        self.coalescer = SingleFlight.from_env()
+        # Réplique en mémoire optionnelle : les lectures sont alors servies sans aller-retour réseau
+        self.replica = GraphReplica.from_env(self.transport)
+        # Appelés après chaque mise à jour réussie (caches dérivés des données)
+        self._update_listeners = []
+        # Format demandé à Fuseki pour execute_query : le JSON enveloppe chaque cellule
+        # de type/datatype, inutiles une fois les valeurs nettoyées
+        self.result_format = os.getenv('SPARQL_RESULTS_FORMAT', 'json').lower()
+        if self.result_format not in RESULT_FORMATS:
+            self.result_format = 'json'
+
+    def execute_raw_query(self, query):
+        """Exécute une requête SPARQL et retourne le document JSON brut (lève une exception en cas d'erreur)"""
+        return self._load(('raw',), query, lambda: self._local_select(query) or self.transport.query(query))
+
+    def execute_query(self, query, result_format=None):
+        """
+        Exécute une requête SPARQL et retourne les résultats.
+        `result_format` (json, tsv ou csv) remplace le format par défaut
+        SPARQL_RESULTS_FORMAT ; les lignes retournées sont identiques.
+        """
+        result_format = result_format or self.result_format
         try:
-            self.sparql.setQuery(query)
-            results = self.sparql.query().convert()
-            
-            # Formater les résultats
-            formatted_results = []
-            for result in results["results"]["bindings"]:
-                formatted_result = {}
-                for key, value in result.items():
-                    # Nettoyer les URLs pour un affichage plus lisible
-                    if 'value' in value:
-                        clean_value = value['value']
-                        if '#' in clean_value:
-                            clean_value = clean_value.split('#')[-1]
-                        elif '/' in clean_value:
-                            clean_value = clean_value.split('/')[-1]
-                        formatted_result[key] = clean_value
-                formatted_results.append(formatted_result)
-            
-            return formatted_results
-            
+            return self._load(('rows', result_format), query,
+                              lambda: self._fetch_formatted(query, result_format))
         except Exception as e:
             print(f"Erreur SPARQL: {str(e)}")
             print(f"Requête: {query}")
             return {"error": f"Erreur SPARQL: {str(e)}"}
 
+    def _fetch_formatted(self, query, result_format):
+        results = self._local_select(query)
+        if results is not None or result_format == 'json':
+            if results is None:
+                results = self.transport.query(query)
+
+            # Formater les résultats
+            return [format_binding(result) for result in results["results"]["bindings"]]
+        return [
+            {key: clean_value(value) for key, value in row.items()}
+            for row in self._fetch_rows(query, result_format)
+        ]
+
+    def _load(self, kind, query, fetch):
+        """
+        Résultat d'une requête de lecture : depuis le cache si possible, sinon via
+        `fetch`, en partageant l'appel avec les requêtes identiques déjà en cours.
+        """
+        key = kind + (normalize_query(query),)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            generation = self.cache.generation
+
+        def _fetch_and_store():
+            results = fetch()
+            if self.cache is not None:
+                self.cache.put(key, results, generation, query)
+            return results
+
+        if self.coalescer is None:
+            return _fetch_and_store()
+        return self.coalescer.run(key, _fetch_and_store)
+
+    def execute_bindings(self, query, result_format=None):
+        """
+        Mode typé : retourne les bindings avec leur type (uri, literal, bnode),
+        datatype et langue, sous la forme des bindings SPARQL JSON quel que soit
+        le format de transfert. Le CSV ne portant pas ces informations, il est
+        remplacé ici par le TSV. Lève une exception en cas d'erreur.
+        """
+        return self._fetch_bindings(query, result_format or self.result_format)[1]
+
+    def execute_rows(self, query, result_format=None):
+        """
+        Exécute une requête SELECT et retourne des lignes typées (sparql_rows.Row) :
+        IRIs complètes (nom local via `.local`), littéraux convertis selon leur
+        type XSD. Lève une exception en cas d'erreur.
+        """
+        result_format = result_format or self.result_format
+        # Les lignes sont immuables : elles peuvent être partagées depuis le cache
+        return self._load(('typed',), query,
+                          lambda: build_rows(*self._fetch_bindings(query, result_format)))
+
+    def _fetch_bindings(self, query, result_format):
+        """(variables, bindings typés) via la réplique locale, ou Fuseki en JSON ou TSV"""
+        results = self._local_select(query)
+        if results is not None or result_format == 'json':
+            if results is None:
+                results = self.transport.query(query)
+            return results["head"]["vars"], results["results"]["bindings"]
+        return parse_tsv(self.transport.query_text(query, SPARQL_RESULTS_TSV), typed=True)
+
+    def _local_select(self, query):
+        """Document SPARQL JSON évalué par la réplique en mémoire, ou None si elle ne peut pas répondre"""
+        if self.replica is None:
+            return None
+        return self.replica.query(query)
+
+    def _fetch_rows(self, query, result_format):
+        """Lignes variable -> valeur lexicale, via le format TSV ou CSV"""
+        if result_format == 'csv':
+            return parse_csv(self.transport.query_text(query, SPARQL_RESULTS_CSV))[1]
+        return parse_tsv(self.transport.query_text(query, SPARQL_RESULTS_TSV))[1]
+
+    def iter_bindings(self, query):
+        """
+        Exécute une requête SELECT et itère sur ses bindings bruts au fil de la
+        lecture du flux HTTP, sans matérialiser le document JSON (ni passer par le
+        cache). La requête est envoyée immédiatement : une erreur HTTP est levée
+        ici, une erreur de lecture pendant l'itération.
+        """
+        response = self.transport.query_stream(query)
+        return self._stream_bindings(response)
+
+    def iter_query(self, query):
+        """Comme iter_bindings, mais produit des lignes formatées comme execute_query"""
+        return map(format_binding, self.iter_bindings(query))
+
+    @staticmethod
+    def _stream_bindings(response):
+        try:
+            yield from iter_json_bindings(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+        finally:
+            # Rend la connexion au pool, même si l'itération est abandonnée
+            response.close()
+
     def execute_update(self, update_query):
         """Exécute une requête SPARQL Update (INSERT/DELETE)."""
         try:
-            update_endpoint = self.endpoint + "/update"
-            sparql_upd = SPARQLWrapper(update_endpoint)
-            sparql_upd.setMethod(POST)
-            sparql_upd.setQuery(update_query)
-            sparql_upd.query()
+            self.transport.update(update_query)
+            if self.replica is not None:
+                self.replica.apply_update(update_query)
+            if self.cache is not None:
+                self.cache.invalidate(update_query)
+            if self.coalescer is not None:
+                self.coalescer.forget()
+            for listener in self._update_listeners:
+                listener(update_query)
             return {"status": "success"}
         except Exception as e:
             print(f"Erreur SPARQL Update: {str(e)}")
             print(f"Update: {update_query}")
             return {"error": f"Erreur SPARQL Update: {str(e)}"}
 
-# Instance globale
-sparql_utils = SPARQLUtils()
\ No newline at end of file
+    def add_update_listener(self, listener):
+        """Enregistre une fonction appelée avec le texte de chaque mise à jour réussie"""
+        self._update_listeners.append(listener)
+
+    def stats(self):
+        """Compteurs du cache de requêtes, de la coalescence et de la réplique locale"""
+        return {
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "coalescing": self.coalescer.stats() if self.coalescer is not None else None,
+            "replica": self.replica.stats() if self.replica is not None else None
+        }
+
+
+class AsyncSPARQLUtils:
+    """
+    Pendant asyncio de SPARQLUtils. Les appels sont exécutés sur un pool de
+    threads dimensionné comme le pool de connexions, ce qui partage le
+    transport keep-alive et le cache du client synchrone et reste utilisable
+    depuis les vues async de Flask (une boucle d'événements par requête).
+    """
+
+    def __init__(self, utils):
+        self.utils = utils
+        self.executor = ThreadPoolExecutor(max_workers=utils.transport.pool_size,
+                                           thread_name_prefix='sparql')
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def execute_query(self, query):
+        """Exécute une requête SPARQL et retourne les résultats formatés"""
+        return await self._run(self.utils.execute_query, query)
+
+    async def execute_raw_query(self, query):
+        """Exécute une requête SPARQL et retourne le document JSON brut"""
+        return await self._run(self.utils.execute_raw_query, query)
+
+    async def execute_rows(self, query):
+        """Exécute une requête SPARQL et retourne des lignes typées"""
+        return await self._run(self.utils.execute_rows, query)
+
+    async def execute_update(self, update_query):
+        """Exécute une requête SPARQL Update (INSERT/DELETE)"""
+        return await self._run(self.utils.execute_update, update_query)
+
+    async def gather_queries(self, *queries):
+        """Exécute des requêtes indépendantes en parallèle, résultats dans l'ordre des requêtes"""
+        return await asyncio.gather(*(self.execute_query(query) for query in queries))
+
+    async def gather_rows(self, *queries):
+        """Comme gather_queries, avec des lignes typées (lève une exception si une requête échoue)"""
+        return await asyncio.gather(*(self.execute_rows(query) for query in queries))
+
+# Instances globales
+sparql_utils = SPARQLUtils()
+async_sparql_utils = AsyncSPARQLUtils(sparql_utils)
\ No newline at end of file
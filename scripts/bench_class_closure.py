@@ -0,0 +1,149 @@
+"""
+Benchmark : parcours `rdfs:subClassOf*` + UNION (avant) contre liste VALUES issue
+de la fermeture de classes précalculée (après), sur les requêtes de campRes.py
+et de /api/ontology/graph.
+
+Usage (Fuseki démarré et données chargées) :
+    python scripts/bench_class_closure.py [nombre_de_répétitions]
+"""
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+FUSEKI_ENDPOINT = os.getenv('FUSEKI_ENDPOINT', 'http://localhost:3030/eco-ontology')
+FUSEKI_QUERY = f"{FUSEKI_ENDPOINT}/query"
+ECO = 'http://www.semanticweb.org/eco-ontology#'
+
+PREFIXES = """
+PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+"""
+
+CAMPAIGNS_BODY = """
+    ?campaign eco:campaignName ?name .
+    OPTIONAL { ?campaign eco:campaignDescription ?description }
+    OPTIONAL { ?campaign eco:campaignStatus ?status }
+    OPTIONAL { ?campaign eco:startDate ?startDate }
+    OPTIONAL { ?campaign eco:endDate ?endDate }
+    OPTIONAL { ?campaign eco:goal ?goal }
+    OPTIONAL { ?campaign a ?type . FILTER(?type != eco:Campaign) }
+    OPTIONAL { ?campaign eco:requiresResource ?resource . ?resource eco:resourceName ?resourceName }
+}
+ORDER BY ?name
+"""
+
+RESOURCES_BODY = """
+    ?resource eco:resourceName ?name .
+    OPTIONAL { ?resource eco:resourceDescription ?description }
+    OPTIONAL { ?resource eco:resourceCategory ?category }
+    OPTIONAL { ?resource eco:quantityAvailable ?quantity }
+    OPTIONAL { ?resource eco:unitCost ?unitCost }
+    OPTIONAL { ?resource a ?type . FILTER(?type != eco:Resource) }
+    OPTIONAL { ?campaign eco:requiresResource ?resource . ?campaign eco:campaignName ?campaignName }
+}
+ORDER BY ?name
+"""
+
+GRAPH_BODY = """
+    OPTIONAL { ?s rdfs:label ?sLabel }
+    OPTIONAL {
+        ?s ?p ?o .
+        OPTIONAL { ?p rdfs:label ?pLabel }
+        OPTIONAL { ?o rdfs:label ?oLabel }
+    }
+}
+LIMIT 2000
+"""
+
+
+def sparql_select(query):
+    response = requests.post(FUSEKI_QUERY, data={'query': query},
+                             headers={'Accept': 'application/sparql-results+json'})
+    response.raise_for_status()
+    return response.json()['results']['bindings']
+
+
+def class_closure():
+    """Fermeture réflexive-transitive de rdfs:subClassOf (même calcul que backend/class_hierarchy.py)"""
+    children = {}
+    for b in sparql_select(PREFIXES + "SELECT ?sub ?sup WHERE { ?sub rdfs:subClassOf ?sup FILTER(isIRI(?sub) && isIRI(?sup)) }"):
+        children.setdefault(b['sup']['value'], set()).add(b['sub']['value'])
+
+    def descendants(cls):
+        seen, stack = {cls}, [cls]
+        while stack:
+            for child in children.get(stack.pop(), ()):
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        return seen
+    return descendants
+
+
+def values(descendants, *classes):
+    return ' '.join(f'<{c}>' for c in sorted(set().union(*(descendants(ECO + c) for c in classes))))
+
+
+def build_cases(descendants):
+    return {
+        'campaigns': (
+            PREFIXES + "SELECT ?campaign ?name ?description ?status ?startDate ?endDate ?goal ?type ?resource ?resourceName WHERE {\n"
+            "{ ?campaign a eco:Campaign . } UNION { ?subClass rdfs:subClassOf* eco:Campaign . ?campaign a ?subClass . }"
+            + CAMPAIGNS_BODY,
+            PREFIXES + "SELECT ?campaign ?name ?description ?status ?startDate ?endDate ?goal ?type ?resource ?resourceName WHERE {\n"
+            f"?campaign a ?campaignClass . VALUES ?campaignClass {{ {values(descendants, 'Campaign')} }}"
+            + CAMPAIGNS_BODY,
+        ),
+        'resources': (
+            PREFIXES + "SELECT ?resource ?name ?description ?category ?quantity ?unitCost ?type ?campaign ?campaignName WHERE {\n"
+            "{ ?resource a eco:Resource . } UNION { ?subClass rdfs:subClassOf* eco:Resource . ?resource a ?subClass . }"
+            + RESOURCES_BODY,
+            PREFIXES + "SELECT ?resource ?name ?description ?category ?quantity ?unitCost ?type ?campaign ?campaignName WHERE {\n"
+            f"?resource a ?resourceClass . VALUES ?resourceClass {{ {values(descendants, 'Resource')} }}"
+            + RESOURCES_BODY,
+        ),
+        'ontology graph': (
+            PREFIXES + "SELECT DISTINCT ?s ?sLabel ?type ?p ?pLabel ?o ?oLabel WHERE {\n"
+            "?s a ?type . ?type rdfs:subClassOf* ?superType . VALUES ?superType { eco:Sponsor eco:Donation eco:Event }"
+            + GRAPH_BODY,
+            PREFIXES + "SELECT DISTINCT ?s ?sLabel ?type ?p ?pLabel ?o ?oLabel WHERE {\n"
+            f"?s a ?type . VALUES ?type {{ {values(descendants, 'Sponsor', 'Donation', 'Event')} }}"
+            + GRAPH_BODY,
+        ),
+    }
+
+
+def timings(query, repeat):
+    sparql_select(query)  # échauffement
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = sparql_select(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return len(rows), statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+def bench(repeat):
+    start = time.perf_counter()
+    descendants = class_closure()
+    print(f"Fermeture de classes calculee en {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print(f"{'requete':<16} {'variante':<22} {'lignes':>7} {'mediane ms':>11} {'p95 ms':>8}")
+    for name, (before, after) in build_cases(descendants).items():
+        for label, query in (('subClassOf* + UNION', before), ('VALUES (fermeture)', after)):
+            rows, median, p95 = timings(query, repeat)
+            print(f"{name:<16} {label:<22} {rows:>7} {median:>11.2f} {p95:>8.2f}")
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    try:
+        requests.get(FUSEKI_ENDPOINT, timeout=3)
+    except requests.RequestException:
+        print("Veuillez demarrer Fuseki d'abord: ./fuseki-server")
+        sys.exit(1)
+    bench(repeat)
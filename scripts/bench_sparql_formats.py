@@ -0,0 +1,137 @@
+"""
+Benchmark des formats de résultats SPARQL (JSON, TSV, CSV) sur les plus grosses
+requêtes de liste : taille transférée et temps de parsing + formatage.
+
+Usage (Fuseki démarré et données chargées) :
+    python scripts/bench_sparql_formats.py [nombre_de_répétitions]
+"""
+import gzip
+import json
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from sparql_formats import SPARQL_RESULTS_CSV, SPARQL_RESULTS_TSV, parse_csv, parse_tsv  # noqa: E402
+from sparql_utils import clean_value, format_binding  # noqa: E402
+
+FUSEKI_ENDPOINT = os.getenv('FUSEKI_ENDPOINT', 'http://localhost:3030/eco-ontology')
+FUSEKI_QUERY = f"{FUSEKI_ENDPOINT}/query"
+
+PREFIXES = """
+PREFIX eco: <http://www.semanticweb.org/eco-ontology#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+"""
+
+# Requêtes reprises des endpoints de liste les plus volumineux
+QUERIES = {
+    'donations (limit 1000)': PREFIXES + """
+    SELECT ?donation ?type ?amount ?currency ?donorName ?date ?itemDescription ?estimatedValue ?hoursDonated ?eventTitle
+    WHERE {
+        ?donation a ?type .
+        OPTIONAL { ?donation eco:amount ?amount }
+        OPTIONAL { ?donation eco:currency ?currency }
+        OPTIONAL { ?donation eco:dateDonated ?date }
+        OPTIONAL { ?donation eco:itemDescription ?itemDescription }
+        OPTIONAL { ?donation eco:estimatedValue ?estimatedValue }
+        OPTIONAL { ?donation eco:hoursDonated ?hoursDonated }
+        OPTIONAL { ?donation eco:fundsEvent ?event . ?event eco:eventTitle ?eventTitle . }
+        OPTIONAL { ?donation ^eco:makesDonation ?donor . OPTIONAL { ?donor eco:companyName ?donorName } }
+        FILTER(?type = eco:Donation || ?type = eco:FinancialDonation || ?type = eco:MaterialDonation || ?type = eco:ServiceDonation)
+    }
+    ORDER BY DESC(?date)
+    LIMIT 1000
+    """,
+    'ontology graph (limit 2000)': PREFIXES + """
+    SELECT DISTINCT ?s ?sLabel ?type ?p ?pLabel ?o ?oLabel WHERE {
+        ?s a ?type .
+        ?type rdfs:subClassOf* ?superType .
+        VALUES ?superType { eco:Sponsor eco:Donation eco:Event }
+        OPTIONAL { ?s rdfs:label ?sLabel }
+        OPTIONAL {
+            ?s ?p ?o .
+            OPTIONAL { ?p rdfs:label ?pLabel }
+            OPTIONAL { ?o rdfs:label ?oLabel }
+        }
+    }
+    LIMIT 2000
+    """,
+    'events': PREFIXES + """
+    SELECT ?event ?title ?description ?date ?location ?locationName ?maxParticipants ?status ?duration ?images
+    WHERE {
+        ?event a eco:Event ;
+               eco:eventTitle ?title ;
+               eco:eventDate ?date ;
+               eco:isLocatedAt ?location ;
+               eco:maxParticipants ?maxParticipants .
+        OPTIONAL { ?event eco:eventDescription ?description . }
+        OPTIONAL { ?event eco:eventStatus ?status . }
+        OPTIONAL { ?event eco:duration ?duration . }
+        OPTIONAL { ?location eco:locationName ?locationName . }
+        OPTIONAL { ?event eco:eventImages ?images . }
+    }
+    ORDER BY ?date
+    """,
+    'all triples (limit 5000)': "SELECT ?s ?p ?o WHERE { ?s ?p ?o } LIMIT 5000",
+}
+
+
+def _parse_json(text):
+    return [format_binding(b) for b in json.loads(text)["results"]["bindings"]]
+
+
+def _parse_tsv(text):
+    return [{k: clean_value(v) for k, v in row.items()} for row in parse_tsv(text)[1]]
+
+
+def _parse_tsv_typed(text):
+    return parse_tsv(text, typed=True)[1]
+
+
+def _parse_csv(text):
+    return [{k: clean_value(v) for k, v in row.items()} for row in parse_csv(text)[1]]
+
+
+FORMATS = [
+    ('json', 'application/sparql-results+json', _parse_json),
+    ('tsv', SPARQL_RESULTS_TSV, _parse_tsv),
+    ('tsv typé', SPARQL_RESULTS_TSV, _parse_tsv_typed),
+    ('csv', SPARQL_RESULTS_CSV, _parse_csv),
+]
+
+
+def fetch(query, accept):
+    response = requests.post(FUSEKI_QUERY, data={'query': query},
+                             headers={'Accept': accept, 'Accept-Encoding': 'identity'})
+    response.raise_for_status()
+    return response.content
+
+
+def bench(repeat):
+    for name, query in QUERIES.items():
+        print(f"\n== {name}")
+        print(f"{'format':<10} {'lignes':>7} {'octets':>10} {'gzip':>9} {'parse ms':>9}")
+        for label, accept, parse in FORMATS:
+            body = fetch(query, accept)
+            text = body.decode('utf-8')
+            rows = parse(text)
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                parse(text)
+            elapsed = (time.perf_counter() - start) * 1000 / repeat
+
+            print(f"{label:<10} {len(rows):>7} {len(body):>10} {len(gzip.compress(body)):>9} {elapsed:>9.2f}")
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    try:
+        requests.get(FUSEKI_ENDPOINT, timeout=3)
+    except requests.RequestException:
+        print("Veuillez demarrer Fuseki d'abord: ./fuseki-server")
+        sys.exit(1)
+    bench(repeat)
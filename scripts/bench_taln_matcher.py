@@ -0,0 +1,82 @@
+"""
+Benchmark : repérage des mots-clés de l'analyse TALN locale, tests `in`
+successifs sur chaque mot-clé avec tables reconstruites à chaque appel (avant)
+contre le KeywordMatcher compilé une fois (après). Aucun serveur requis.
+
+Usage :
+    python scripts/bench_taln_matcher.py [nombre_de_questions]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from modules.keyword_matcher import KeywordMatcher  # noqa: E402
+from modules.taln_service import TALNService  # noqa: E402
+
+QUESTIONS = [
+    "Quels sont les événements à venir à Paris ?",
+    "Combien de volontaires sont inscrits ?",
+    "Liste des campagnes de sensibilisation actuelles",
+    "Montre-moi les ateliers passés à Tunis",
+    "Quels lieux en extérieur ont une capacité de plus de 100 personnes ?",
+    "Qui a fait des donations pour le festival de musique ?",
+    "Trouve les assignements approuvés avec une note supérieure à 4",
+    "Quelles certifications ont été émises cette année ?",
+    "What events are upcoming in Boston next week?",
+    "Nombre de réservations confirmées par événement",
+]
+
+
+def tables():
+    return {
+        'entity': TALNService.ENTITY_KEYWORDS,
+        'temporal': TALNService.TEMPORAL_KEYWORDS,
+        'location': {location: [location] for location in TALNService.LOCATION_KEYWORDS},
+        'intent': TALNService.INTENT_PATTERNS,
+    }
+
+
+def scan_naive(question):
+    """Ancienne méthode : tables reconstruites, puis un test `in` par mot-clé"""
+    question_lower = question.lower()
+    found = []
+    for table, labels in tables().items():
+        labels = {label: list(keywords) for label, keywords in labels.items()}
+        for label, keywords in labels.items():
+            for keyword in keywords:
+                if keyword in question_lower:
+                    found.append((table, label, keyword))
+    return found
+
+
+def throughput(scan, questions):
+    start = time.perf_counter()
+    for question in questions:
+        scan(question)
+    return len(questions) / (time.perf_counter() - start)
+
+
+def bench(count):
+    random.seed(0)
+    questions = [random.choice(QUESTIONS) for _ in range(count)]
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher(tables())
+    print(f"Matcher compile en {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Même ensemble de couples (table, étiquette, mot-clé) pour les deux méthodes
+    for question in QUESTIONS:
+        expected = set(scan_naive(question))
+        assert {(m.table, m.label, m.keyword) for m in matcher.find(question)} == expected, question
+
+    print(f"{'methode':<28} {'questions/s':>12}")
+    for label, scan in (("tests `in` (avant)", scan_naive), ("KeywordMatcher (apres)", matcher.find)):
+        scan(questions[0])  # échauffement
+        print(f"{label:<28} {throughput(scan, questions):>12,.0f}")
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
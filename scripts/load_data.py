@@ -1,89 +1,362 @@
 from rdflib import Graph
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import argparse
+import hashlib
+import threading
+import time
 import requests
 import os
 
 # Configuration Fuseki
-FUSEKI_ENDPOINT = "http://localhost:3030/eco-ontology"
+FUSEKI_ENDPOINT = os.getenv('FUSEKI_ENDPOINT', "http://localhost:3030/eco-ontology")
 FUSEKI_DATA = f"{FUSEKI_ENDPOINT}/data"
 FUSEKI_UPDATE = f"{FUSEKI_ENDPOINT}/update"
 
-def load_ontology_to_fuseki():
-    try:
-        # Charger l'ontologie en ignorant les erreurs de date
-        g = Graph()
-        print("Chargement du fichier RDF...")
-        
-        # Parser sans ignorer les erreurs pour ne pas perdre de données
-        g.parse("data/eco-ontology.rdf", format="xml")
-        print(f"Ontologie chargée: {len(g)} triplets trouvés")
-        
-        # Upload vers Fuseki par lots de triplets
-        print("Upload des données vers Fuseki...")
-        
-        # Méthode 1: Utiliser SPARQL INSERT pour chaque triplet
-        success_count = 0
-        error_count = 0
-        
-        for triple in g:
+RDF_SOURCE = "data/eco-ontology.rdf"
+# Triplets du dernier chargement réussi (N-Triples triés), base du rechargement différentiel
+SNAPSHOT_FILE = os.getenv('LOAD_SNAPSHOT', "data/.last_load.nt")
+# Résultat du parsing RDF/XML, indexé par le hash du fichier source
+PARSE_CACHE_DIR = os.getenv('LOAD_PARSE_CACHE', "data/.parse_cache")
+
+# Graphe nommé de préparation du mode --blue-green, invisible des requêtes de l'API
+STAGING_GRAPH = os.getenv('LOAD_STAGING_GRAPH', "http://www.semanticweb.org/eco-ontology/staging")
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+
+# Nombre de triplets par envoi et nombre d'envois simultanés
+BATCH_SIZE = int(os.getenv('LOAD_BATCH_SIZE', '5000'))
+WORKERS = int(os.getenv('LOAD_WORKERS', '4'))
+
+_local = threading.local()
+
+
+def _session():
+    """Session HTTP keep-alive propre à chaque thread d'envoi"""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        _local.session = session
+    return session
+
+
+def has_blank_node(line):
+    """Vrai si le sujet ou l'objet d'une ligne N-Triples est un nœud anonyme"""
+    subject, rest = line.split(' ', 1)
+    # Le prédicat est toujours une IRI : l'objet commence après son '>'
+    obj = rest[rest.index('>') + 2:]
+    return subject.startswith('_:') or obj.startswith('_:')
+
+
+def iter_chunks(lines, batch_size):
+    """
+    Découpe les triplets en documents N-Triples d'au plus `batch_size` lignes.
+    Les triplets contenant des nœuds anonymes sont regroupés dans un même
+    document : leurs identifiants n'ont de sens qu'à l'intérieur d'un envoi.
+    """
+    chunk = []
+    blank_chunk = []
+    for line in lines:
+        if has_blank_node(line):
+            blank_chunk.append(line)
+            continue
+        chunk.append(line)
+        if len(chunk) >= batch_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+    if blank_chunk:
+        yield blank_chunk
+
+
+def graph_lines(graph):
+    """Triplets d'un graphe, une ligne N-Triples par triplet (triées)"""
+    data = graph.serialize(format='nt', encoding='utf-8').decode('utf-8')
+    return sorted(line for line in data.split('\n') if line.strip())
+
+
+def source_hash(path=RDF_SOURCE):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_source():
+    """
+    Triplets du fichier RDF source (lignes N-Triples triées). Le parsing RDF/XML
+    n'est fait que si la source a changé depuis le dernier passage : sinon les
+    lignes sont relues depuis le cache PARSE_CACHE_DIR.
+    """
+    cache_path = os.path.join(PARSE_CACHE_DIR, source_hash() + '.nt')
+    lines = read_snapshot(cache_path)
+    if lines is not None:
+        print(f"Source inchangee, {len(lines)} triplets relus depuis le cache de parsing")
+        return lines
+
+    g = Graph()
+    print("Chargement du fichier RDF...")
+
+    # Parser sans ignorer les erreurs pour ne pas perdre de données
+    start = time.perf_counter()
+    g.parse(RDF_SOURCE, format="xml")
+    print(f"Ontologie chargée: {len(g)} triplets trouvés en {time.perf_counter() - start:.2f}s")
+    lines = graph_lines(g)
+
+    # Une seule entrée conservée : celle de la version courante de la source
+    os.makedirs(PARSE_CACHE_DIR, exist_ok=True)
+    for name in os.listdir(PARSE_CACHE_DIR):
+        if name.endswith('.nt'):
+            os.remove(os.path.join(PARSE_CACHE_DIR, name))
+    write_snapshot(lines, cache_path)
+    return lines
+
+
+def read_snapshot(path=SNAPSHOT_FILE):
+    """Triplets du dernier chargement, ou None si aucun instantané"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return [line.rstrip('\n') for line in f if line.strip()]
+
+
+def write_snapshot(lines, path=SNAPSHOT_FILE):
+    """Enregistre des triplets triés (écriture atomique : fichier temporaire puis renommage)"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for line in lines:
+            f.write(line + '\n')
+    os.replace(tmp_path, path)
+
+
+def fetch_store_lines():
+    """Contenu actuel du graphe par défaut de Fuseki"""
+    response = requests.get(FUSEKI_DATA, params={'default': ''}, headers={'Accept': 'application/n-triples'})
+    response.raise_for_status()
+    g = Graph()
+    g.parse(data=response.content.decode('utf-8'), format='nt')
+    return graph_lines(g)
+
+
+def upload_chunk(lines, graph=None):
+    """Ajoute un lot de triplets au graphe par défaut (ou au graphe nommé `graph`) via le Graph Store Protocol"""
+    response = _session().post(
+        FUSEKI_DATA,
+        params={'graph': graph} if graph else {'default': ''},
+        data="\n".join(lines).encode('utf-8'),
+        headers={'Content-Type': 'application/n-triples; charset=utf-8'},
+    )
+    if response.status_code not in [200, 201, 204]:
+        raise RuntimeError(f"HTTP {response.status_code}: {response.text.strip()[:300]}")
+    return len(lines)
+
+
+def upload_lines(lines, batch_size=BATCH_SIZE, workers=WORKERS, graph=None):
+    """Envoie les triplets par lots en parallèle ; retourne (triplets chargés, triplets en erreur)"""
+    total = len(lines)
+    print(f"Upload des données vers Fuseki (lots de {batch_size} triplets, {workers} envois simultanés)...")
+
+    success_count = 0
+    error_count = 0
+    start = time.perf_counter()
+
+    def report(done_futures):
+        nonlocal success_count, error_count
+        for future in done_futures:
+            size = pending.pop(future)
             try:
-                subject = triple[0].n3()
-                predicate = triple[1].n3()
-                obj = triple[2].n3()
-                
-                # Créer la requête INSERT
-                insert_query = f"""
-                INSERT DATA {{
-                    {subject} {predicate} {obj} .
-                }}
-                """
-                
-                headers = {
-                    'Content-Type': 'application/sparql-update'
-                }
-                
-                response = requests.post(FUSEKI_UPDATE, data=insert_query, headers=headers)
-                
-                if response.status_code in [200, 204]:
-                    success_count += 1
-                else:
-                    error_count += 1
-                    print(f"Erreur avec le triplet: {triple}")
-                    
+                success_count += future.result()
             except Exception as e:
-                error_count += 1
-                continue
-        
-        print(f"Upload termine: {success_count} triplets charges, {error_count} erreurs")
-        
+                error_count += size
+                print(f"Erreur avec un lot de {size} triplets: {str(e)}")
+
+            elapsed = time.perf_counter() - start
+            done = success_count + error_count
+            print(f"  {done}/{total} triplets ({done * 100 // max(total, 1)}%), "
+                  f"{success_count / elapsed if elapsed else 0:.0f} triplets/s")
+
+    # Fenêtre bornée de lots en cours : les documents à envoyer ne sont
+    # construits qu'au fur et à mesure
+    pending = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for chunk in iter_chunks(lines, batch_size):
+            if len(pending) >= workers * 2:
+                done_futures, _ = wait(pending, return_when=FIRST_COMPLETED)
+                report(done_futures)
+            pending[executor.submit(upload_chunk, chunk, graph)] = len(chunk)
+        report(list(wait(pending)[0]))
+
+    elapsed = time.perf_counter() - start
+    print(f"Upload termine: {success_count} triplets charges, {error_count} erreurs en {elapsed:.2f}s")
+    return success_count, error_count
+
+def load_ontology_to_fuseki(batch_size=BATCH_SIZE, workers=WORKERS):
+    try:
+        # Charger l'ontologie en ignorant les erreurs de date
+        lines = parse_source()
+
+        # Upload vers Fuseki par lots de triplets, envoyés en parallèle
+        _, error_count = upload_lines(lines, batch_size, workers)
+
         # Vérifier que les données sont bien chargées
-        test_query = "SELECT (COUNT(*) as ?count) WHERE { ?s ?p ?o }"
-        headers = {'Accept': 'application/json'}
-        response = requests.get(f"{FUSEKI_ENDPOINT}/query", params={'query': test_query}, headers=headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            count = data['results']['bindings'][0]['count']['value']
+        count = count_triples()
+        if count is not None:
             print(f"Total des triplets dans Fuseki: {count}")
-            
+
+        if error_count == 0:
+            write_snapshot(lines)
+
     except Exception as e:
         print(f"Erreur: {str(e)}")
 
+def reload_blue_green(batch_size=BATCH_SIZE, workers=WORKERS):
+    """
+    Rechargement sans interruption : la nouvelle version est chargée dans le graphe
+    nommé STAGING_GRAPH pendant que l'API continue de lire l'ancienne, vérifiée
+    (nombre de triplets et d'instances par classe), puis basculée dans le graphe
+    par défaut par un MOVE, exécuté par Fuseki en une seule transaction.
+    """
+    try:
+        lines = parse_source()
+
+        run_update(f"DROP SILENT GRAPH <{STAGING_GRAPH}>")
+        _, error_count = upload_lines(lines, batch_size, workers, graph=STAGING_GRAPH)
+        if error_count:
+            print("Chargement incomplet du graphe de preparation : bascule annulee")
+            return False
+
+        count = count_triples(STAGING_GRAPH)
+        if count != len(lines):
+            print(f"Graphe de preparation: {count} triplets au lieu de {len(lines)} : bascule annulee")
+            return False
+        expected_classes = source_class_counts(lines)
+        staged_classes = class_counts(STAGING_GRAPH)
+        if staged_classes != expected_classes:
+            differences = sorted(cls for cls in set(expected_classes) | set(staged_classes)
+                                 if expected_classes.get(cls) != staged_classes.get(cls))
+            print(f"Instances par classe differentes de la source ({', '.join(differences[:5])}) : bascule annulee")
+            return False
+        print(f"Verification OK: {count} triplets, {len(staged_classes)} classes")
+
+        start = time.perf_counter()
+        run_update(f"MOVE GRAPH <{STAGING_GRAPH}> TO DEFAULT")
+        print(f"Bascule effectuee en {time.perf_counter() - start:.2f}s")
+
+        write_snapshot(lines)
+        return True
+
+    except Exception as e:
+        print(f"Erreur: {str(e)}")
+        return False
+
+def source_class_counts(lines):
+    """Nombre d'instances par classe (triplets rdf:type) dans les lignes N-Triples de la source"""
+    counts = {}
+    type_predicate = f"<{RDF_TYPE}>"
+    for line in lines:
+        _, predicate, obj = line.split(' ', 2)
+        if predicate == type_predicate and obj.startswith('<'):
+            cls = obj[1:obj.index('>')]
+            counts[cls] = counts.get(cls, 0) + 1
+    return counts
+
+def class_counts(graph):
+    """Nombre d'instances par classe dans un graphe nommé de Fuseki"""
+    query = f"SELECT ?class (COUNT(*) AS ?count) WHERE {{ GRAPH <{graph}> {{ ?s a ?class }} FILTER(isIRI(?class)) }} GROUP BY ?class"
+    response = requests.post(f"{FUSEKI_ENDPOINT}/query", data={'query': query},
+                             headers={'Accept': 'application/sparql-results+json'})
+    response.raise_for_status()
+    return {b['class']['value']: int(b['count']['value'])
+            for b in response.json()['results']['bindings']}
+
+def run_update(update_query):
+    headers = {
+        'Content-Type': 'application/sparql-update; charset=utf-8'
+    }
+    response = requests.post(FUSEKI_UPDATE, data=update_query.encode('utf-8'), headers=headers)
+    if response.status_code not in [200, 204]:
+        raise RuntimeError(f"HTTP {response.status_code}: {response.text.strip()[:300]}")
+
+def reload_delta():
+    """
+    Rechargement différentiel : compare la source au dernier état chargé (instantané
+    sur disque, ou contenu de Fuseki à défaut) et n'applique que les triplets
+    retirés/ajoutés, en une seule requête Update (une transaction côté Fuseki).
+    Le dataset n'est jamais vide pendant le rechargement.
+    """
+    try:
+        lines = parse_source()
+        if any(has_blank_node(line) for line in lines):
+            print("La source contient des noeuds anonymes : relancer sans --delta (chargement complet)")
+            return False
+
+        previous = read_snapshot()
+        if previous is None:
+            print("Aucun instantane du dernier chargement : comparaison avec le contenu de Fuseki")
+            previous = fetch_store_lines()
+        if any(has_blank_node(line) for line in previous):
+            print("Le dernier etat charge contient des noeuds anonymes : relancer sans --delta (chargement complet)")
+            return False
+
+        source = set(lines)
+        previous = set(previous)
+        to_delete = previous - source
+        to_insert = source - previous
+        print(f"Delta: {len(to_delete)} triplets a supprimer, {len(to_insert)} a ajouter")
+
+        if to_delete or to_insert:
+            start = time.perf_counter()
+            apply_delta(to_delete, to_insert)
+            print(f"Delta applique en {time.perf_counter() - start:.2f}s")
+        else:
+            print("Dataset deja a jour")
+
+        write_snapshot(lines)
+        return True
+
+    except Exception as e:
+        print(f"Erreur: {str(e)}")
+        return False
+
+def apply_delta(to_delete, to_insert):
+    """Applique suppressions et ajouts dans une même requête SPARQL Update"""
+    operations = []
+    if to_delete:
+        operations.append("DELETE DATA {\n" + "\n".join(sorted(to_delete)) + "\n}")
+    if to_insert:
+        operations.append("INSERT DATA {\n" + "\n".join(sorted(to_insert)) + "\n}")
+
+    run_update(" ;\n".join(operations))
+
+def count_triples(graph=None):
+    """Nombre de triplets du graphe par défaut ou d'un graphe nommé (None si Fuseki ne répond pas)"""
+    test_query = "SELECT (COUNT(*) as ?count) WHERE { ?s ?p ?o }"
+    if graph:
+        test_query = f"SELECT (COUNT(*) as ?count) WHERE {{ GRAPH <{graph}> {{ ?s ?p ?o }} }}"
+    headers = {'Accept': 'application/json'}
+    response = requests.get(f"{FUSEKI_ENDPOINT}/query", params={'query': test_query}, headers=headers)
+
+    if response.status_code == 200:
+        data = response.json()
+        return int(data['results']['bindings'][0]['count']['value'])
+    return None
+
 def clear_dataset():
     """Vider le dataset avant de charger les nouvelles données"""
     try:
         clear_query = "CLEAR ALL"
-        
+
         headers = {
             'Content-Type': 'application/sparql-update'
         }
-        
+
         response = requests.post(FUSEKI_UPDATE, data=clear_query, headers=headers)
-        
+
         if response.status_code in [200, 204]:
             print("Dataset vide avec succes")
         else:
             print(f"Impossible de vider le dataset: {response.status_code}")
-            
+
     except Exception as e:
         print(f"Erreur lors du vidage: {str(e)}")
 
@@ -101,11 +374,31 @@ def test_fuseki_connection():
         print(f"Impossible de se connecter a Fuseki: {str(e)}")
         return False
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Charge data/eco-ontology.rdf dans Fuseki")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f"triplets par envoi (défaut {BATCH_SIZE})")
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help=f"envois simultanés (défaut {WORKERS})")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--delta', action='store_true',
+                      help="n'appliquer que le delta depuis le dernier chargement au lieu de vider le dataset "
+                           "et tout recharger (source sans nœuds anonymes uniquement)")
+    mode.add_argument('--blue-green', action='store_true',
+                      help="charger dans un graphe de préparation, vérifier, puis basculer d'un coup")
+    return parser.parse_args()
+
 if __name__ == '__main__':
+    args = parse_args()
     print("Debut du chargement des donnees...")
-    
+
     if test_fuseki_connection():
-        clear_dataset()
-        load_ontology_to_fuseki()
+        if args.delta:
+            reload_delta()
+        elif args.blue_green:
+            reload_blue_green(batch_size=args.batch_size, workers=args.workers)
+        else:
+            clear_dataset()
+            load_ontology_to_fuseki(batch_size=args.batch_size, workers=args.workers)
     else:
-        print("Veuillez demarrer Fuseki d'abord: ./fuseki-server")
\ No newline at end of file
+        print("Veuillez demarrer Fuseki d'abord: ./fuseki-server")
@@ -0,0 +1,25 @@
+import requests
+
+# Régression : deux lots identiques successifs sur /donations/batch doivent
+# renvoyer les mêmes lignes (le document SPARQL en cache ne doit pas être modifié).
+# Backend lancé avec SPARQL_CACHE_TTL > 0 (cache activé, défaut 60 s).
+BASE_URL = "http://localhost:5000/api"
+
+donations = requests.get(f"{BASE_URL}/donations", params={"limit": 5}).json()
+ids = [row["donation"] for row in donations if row.get("donation")]
+print(f"Donations testées: {len(ids)}")
+assert ids, "aucune donation dans le dataset"
+
+responses = []
+for attempt in (1, 2):
+    resp = requests.post(f"{BASE_URL}/donations/batch", json={"ids": ids})
+    data = resp.json()
+    print(f"  Appel {attempt}: HTTP {resp.status_code}, {len(data['results'])} résultats, "
+          f"{len(data['missing'])} absentes, {len(data['errors'])} erreurs")
+    assert resp.status_code == 200
+    assert not data["errors"], data["errors"]
+    responses.append(data)
+
+assert responses[0] == responses[1], "le second appel (servi par le cache) diffère du premier"
+assert all("id" not in row for row in responses[1]["results"].values())
+print("✅ Lots identiques, aucun IRI en erreur")
@@ -0,0 +1,37 @@
+import json
+from collections import Counter
+import requests
+
+# Régression : avec page_size=1, une entité sur plusieurs lignes (un événement à
+# plusieurs images) ne doit perdre aucune ligne d'une page à l'autre.
+BASE_URL = "http://localhost:5000/api"
+
+row_key = lambda row: json.dumps(row, sort_keys=True)
+
+all_rows = requests.get(f"{BASE_URL}/events").json()
+per_event = Counter(row["event"] for row in all_rows)
+multi = [event for event, count in per_event.items() if count > 1]
+print(f"Lignes sans pagination: {len(all_rows)}, événements: {len(per_event)}, sur plusieurs lignes: {len(multi)}")
+assert multi, "aucun événement sur plusieurs lignes (plusieurs eco:eventImages) dans le dataset"
+
+paged_rows, cursor, pages = [], None, 0
+while True:
+    params = {"page_size": 1}
+    if cursor:
+        params["cursor"] = cursor
+    resp = requests.get(f"{BASE_URL}/events", params=params)
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    pages += 1
+    events = {row["event"] for row in data["items"]}
+    # Une page ne contient qu'une entité, mais toutes ses lignes
+    assert len(events) == 1, events
+    paged_rows.extend(data["items"])
+    cursor = data["next_cursor"]
+    if not cursor:
+        break
+    assert pages <= len(all_rows), "la pagination ne progresse pas"
+
+print(f"Pages: {pages}, lignes paginées: {len(paged_rows)}")
+assert Counter(map(row_key, paged_rows)) == Counter(map(row_key, all_rows)), "lignes perdues ou dupliquées"
+print("✅ Toutes les lignes des entités multi-lignes sont servies")